@@ -0,0 +1,50 @@
+"""
+Compares the original recursive generator, the generic odometer iteration and
+generated functions (SGen.compile).
+
+Usage: python -m benchmarks.bench_codegen
+"""
+
+from timeit import default_timer
+
+from benchmarks.bench_generate import recursive_positive
+from sgen import SGen
+from sgen.fields import Integer
+from sgen.utils import Missing
+
+
+def make_schema(width, values):
+    attrs = {
+        f'field_{index:02}': Integer(positive_data_from=lambda: values)
+        for index in range(width)
+    }
+    return type(f'Schema{width}', (SGen,), attrs)
+
+
+def measure(datasets):
+    start = default_timer()
+    count = 0
+    for _ in datasets:
+        count += 1
+    return count, default_timer() - start
+
+
+def main():
+    print(
+        f"{'fields':>8} {'datasets':>10} {'original, s':>12} {'generic, s':>12} "
+        f"{'compiled, s':>12} {'vs original':>12} {'vs generic':>11}"
+    )
+
+    for width, values in ((6, (1, 2, 3, 4, 5, 6, 7, Missing())), (10, (1, 2, 3, Missing())), (20, (1, 2))):
+        schema = make_schema(width, values)
+        _, original = measure(recursive_positive(schema()))
+        count, generic = measure(schema().positive())
+        _, compiled = measure(schema().compile().positive())
+        print(
+            f"{width:>8} {count:>10} {original:>12.4f} {generic:>12.4f} {compiled:>12.4f} "
+            f"{original / compiled:>11.1f}x {generic / compiled:>10.1f}x"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Compares the recursive Cartesian product generator with the odometer engine
+on wide schemas.
+
+Usage: python -m benchmarks.bench_generate
+"""
+
+from itertools import islice
+from timeit import default_timer
+
+from sgen import SGen
+from sgen.fields import Integer
+from sgen.utils import Missing
+
+
+WIDTHS = (50, 200, 1000)
+DATASETS = 2000
+
+
+def recursive_generate(fields):
+    """The generator used by SGen before the odometer engine"""
+
+    if len(fields) == 1:
+        for value in fields[0].data_generator():
+            yield [(fields[0].attr_name, value)]
+    else:
+        for value in fields[0].data_generator():
+            for rest in recursive_generate(fields=fields[1:]):
+                yield [(fields[0].attr_name, value)] + rest
+
+
+def recursive_positive(schema):
+    for dataset in recursive_generate(schema.fields(is_positive=True)):
+        yield dict(filter(
+            lambda field_value: not isinstance(field_value[1], Missing),
+            dataset
+        ))
+
+
+def make_schema(width):
+    attrs = {
+        f'field_{index:04}': Integer(positive_data_from=lambda: (1, 2, Missing()))
+        for index in range(width)
+    }
+    return type(f'Wide{width}', (SGen,), attrs)()
+
+
+def measure(datasets):
+    start = default_timer()
+    try:
+        for _ in islice(datasets, DATASETS):
+            pass
+    except RecursionError:
+        return None
+    return default_timer() - start
+
+
+def main():
+    print(f"{'fields':>8} {'recursive, s':>14} {'odometer, s':>14} {'speedup':>8}")
+
+    for width in WIDTHS:
+        schema = make_schema(width)
+        recursive = measure(recursive_positive(schema))
+        iterative = measure(schema.positive())
+
+        if recursive is None:
+            print(f"{width:>8} {'RecursionError':>14} {iterative:>14.4f} {'-':>8}")
+        else:
+            print(f"{width:>8} {recursive:>14.4f} {iterative:>14.4f} {recursive / iterative:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
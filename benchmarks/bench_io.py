@@ -0,0 +1,66 @@
+"""
+Compares sgen.io.write with json.dumps and a write per dataset.
+
+Usage: python -m benchmarks.bench_io
+"""
+
+import json
+import os
+import tempfile
+from datetime import date, datetime
+from timeit import default_timer
+
+from sgen import SGen, Range
+from sgen.fields import Boolean, Date, DateTime, Float, Integer, String
+from sgen.io import write
+
+
+class Flat(SGen):
+    id = Integer(validate=Range(min=1, max=10 ** 9))
+    age = Integer(validate=Range(min=18, max=99))
+    score = Float(validate=Range(min=0, max=1))
+    name = String()
+    active = Boolean()
+    born = Date()
+    created = DateTime()
+
+
+def default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(value)
+
+
+def per_dataset(datasets, path):
+    with open(path, 'w') as fh:
+        for dataset in datasets:
+            fh.write(json.dumps(dataset, default=default) + '\n')
+
+
+def main():
+    datasets = Flat().negative()
+    count = datasets.count()
+    print(f"{count} datasets")
+    print(f"{'method':>22} {'seconds':>8} {'datasets/s':>12} {'MB/s':>8}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'out')
+
+        start = default_timer()
+        per_dataset(datasets, path)
+        elapsed = default_timer() - start
+        print(f"{'json.dumps per dataset':>22} {elapsed:>8.3f} {count / elapsed:>12,.0f} "
+              f"{os.path.getsize(path) / elapsed / 1e6:>8.1f}")
+
+        for format, compress, workers in (
+            ('jsonl', None, None), ('csv', None, None), ('binary', None, None),
+            ('jsonl', 'gzip', None), ('jsonl', None, 4),
+        ):
+            stats = write(datasets, path, format=format, compress=compress, workers=workers)
+            label = f"{format}{' gzip' if compress else ''}{f' x{workers}' if workers else ''}"
+            print(f"{label:>22} {stats.seconds:>8.3f} {stats.datasets_per_second:>12,.0f} "
+                  f"{stats.bytes_per_second / 1e6:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Compares SGen.negative_json with json.dumps of every dataset.
+
+Usage: python -m benchmarks.bench_json
+"""
+
+import json
+from datetime import date, datetime
+from timeit import default_timer
+
+from sgen import SGen, Length, Range
+from sgen.fields import Boolean, Date, DateTime, Float, Integer, Nested, String
+
+
+class Address(SGen):
+    city = String(validate=Length(min=1, max=20))
+    zip = Integer(validate=Range(min=10000, max=99999))
+
+
+class User(SGen):
+    id = Integer(validate=Range(min=1, max=10 ** 9))
+    age = Integer(validate=Range(min=18, max=99))
+    score = Float(validate=Range(min=0, max=1))
+    name = String(validate=Length(min=3, max=12))
+    active = Boolean()
+    born = Date()
+    created = DateTime()
+    address = Nested(Address())
+
+
+def default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(value)
+
+
+def measure(label, generate):
+    start = default_timer()
+    count = size = 0
+    for body in generate():
+        count += 1
+        size += len(body)
+    elapsed = default_timer() - start
+    print(f"{label:>12} {count:>10} {elapsed:>8.3f} {count / elapsed:>12,.0f}")
+    return elapsed
+
+
+def main():
+    datasets = User().negative(seed=1)
+    list(datasets.iter_json())  # Values are generated once for both methods
+
+    print(f"{'method':>12} {'datasets':>10} {'seconds':>8} {'datasets/s':>12}")
+    dumps = measure('json.dumps', lambda: (
+        json.dumps(dataset, default=default, separators=(',', ':')).encode() for dataset in datasets
+    ))
+    fragments = measure('fragments', datasets.iter_json)
+    print(f"speedup {dumps / fragments:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Measures SGen.records throughput for a flat schema of 10 fields.
+
+Usage: python -m benchmarks.bench_records
+"""
+
+from timeit import default_timer
+
+from sgen import SGen, Length, OneOf, Range
+from sgen.fields import Boolean, Date, DateTime, Float, Integer, String
+
+
+class Flat(SGen):
+    id = Integer(validate=Range(min=1, max=10 ** 9))
+    age = Integer(validate=Range(min=18, max=99))
+    score = Float(validate=Range(min=0, max=1))
+    balance = Float()
+    name = String(validate=Length(min=3, max=12))
+    country = String(validate=OneOf(choices=['DE', 'FR', 'US', 'JP']))
+    active = Boolean()
+    admin = Boolean()
+    born = Date()
+    created = DateTime()
+
+
+def main():
+    print(f"{'records':>10} {'chunk':>8} {'seconds':>8} {'records/s':>12}")
+
+    for n, chunk_size in ((1_000_000, 10_000), (1_000_000, 100_000)):
+        start = default_timer()
+        count = 0
+        for _ in Flat().records(n, chunk_size=chunk_size, seed=1):
+            count += 1
+        elapsed = default_timer() - start
+        print(f"{count:>10} {chunk_size:>8} {elapsed:>8.3f} {count / elapsed:>12,.0f}")
+
+
+if __name__ == '__main__':
+    main()
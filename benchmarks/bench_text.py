@@ -0,0 +1,28 @@
+"""
+Compares the shared random text engine with the generator expression it replaced.
+
+Usage: python -m benchmarks.bench_text
+"""
+
+from random import choice
+from string import ascii_letters
+from timeit import timeit
+
+from sgen.text import random_text
+
+
+def join_choice(length):
+    return ''.join(choice(ascii_letters) for _ in range(length))
+
+
+def main():
+    print(f"{'length':>10} {'calls':>8} {'join/choice, s':>15} {'engine, s':>10} {'speedup':>8}")
+
+    for length, calls in ((8, 100_000), (64, 20_000), (1024, 2_000), (1_000_000, 5)):
+        original = timeit(lambda: join_choice(length), number=calls)
+        engine = timeit(lambda: random_text(length), number=calls)
+        print(f"{length:>10} {calls:>8} {original:>15.4f} {engine:>10.4f} {original / engine:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,7 @@ from setuptools import setup, find_packages
 
 EXTRAS_REQUIRE = {
     "tests": ["pytest"],
+    "numpy": ["numpy"],
     "docs": [
         "sphinx==7.2.6",
         "sphinx-issues==3.0.1",
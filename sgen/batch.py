@@ -0,0 +1,113 @@
+from typing import Any, List
+
+from sgen.rng import get_random
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - NumPy is optional
+    numpy = None
+
+
+__all__ = ["integers", "uniform", "booleans", "grid", "NUMPY_THRESHOLD"]
+
+
+# Batches of this size and larger are generated with NumPy if it is installed
+NUMPY_THRESHOLD = 1024
+
+# random.choices picks an index with random() * len, exact up to 2 ** 53
+_CHOICES_LIMIT = 1 << 53
+_INT64 = 1 << 63
+
+
+def _numpy_generator():
+    """Returns a NumPy generator seeded from the current random number generator, so seeding still applies"""
+
+    return numpy.random.default_rng(get_random().getrandbits(64))
+
+
+def integers(low: int, high: int, n: int, step: int = 1) -> List[int]:
+    """
+    Returns n random integers low + k * step that are not greater than high.
+
+    :param low: Minimum value.
+    :param high: Maximum value.
+    :param n: Number of values.
+    :param step: Distance between possible values.
+    :return: List of integers.
+    """
+
+    if high < low:
+        raise ValueError("The minimum value cannot be greater than the maximum")
+
+    size = (high - low) // step + 1
+
+    if numpy is not None and n >= NUMPY_THRESHOLD and -_INT64 <= low and high - low < _INT64:
+        indexes = _numpy_generator().integers(0, size, n)
+        return (indexes * step + low).tolist()
+
+    rng = get_random()
+    if size <= _CHOICES_LIMIT:
+        return rng.choices(range(low, high + 1, step), k=n)
+
+    randrange = rng.randrange
+    return [randrange(low, high + 1, step) for _ in range(n)]
+
+
+def uniform(low: float, high: float, n: int) -> List[float]:
+    """
+    Returns n random floats between low and high inclusive.
+
+    :param low: Minimum value.
+    :param high: Maximum value.
+    :param n: Number of values.
+    :return: List of floats.
+    """
+
+    if high < low:
+        raise ValueError("The minimum value cannot be greater than the maximum")
+
+    if numpy is not None and n >= NUMPY_THRESHOLD:
+        return _numpy_generator().uniform(low, high, n).clip(low, high).tolist()
+
+    span = high - low
+    random = get_random().random
+    return [min(low + span * random(), high) for _ in range(n)]
+
+
+def grid(low: Any, high: Any, step: Any, n: int) -> List[Any]:
+    """
+    Returns n random values low + k * step that are not greater than high.
+
+    Works for any type with subtraction, floor division and multiplication
+    by an integer, such as datetime with a timedelta step.
+
+    :param low: Minimum value.
+    :param high: Maximum value.
+    :param step: Distance between possible values.
+    :param n: Number of values.
+    :return: List of values.
+    """
+
+    size = (high - low) // step + 1
+
+    if size <= n:
+        # Fewer possible values than needed, they are built once and picked by index
+        population = [low + step * k for k in range(size)]
+        return list(map(population.__getitem__, integers(0, size - 1, n)))
+
+    return [low + step * k for k in integers(0, size - 1, n)]
+
+
+def booleans(n: int) -> List[bool]:
+    """
+    Returns n random booleans.
+
+    :param n: Number of values.
+    :return: List of booleans.
+    """
+
+    if not n:
+        return []
+
+    # One random number for the whole batch, its binary digits are the values
+    return [digit == '1' for digit in format(get_random().getrandbits(n), f'0{n}b')]
@@ -0,0 +1,268 @@
+from collections.abc import Sequence
+from datetime import date, time
+from struct import Struct, error as StructError
+from typing import Any, Iterator, List, Tuple
+
+
+__all__ = ["pack", "pack_into", "unpack", "iter_unpack"]
+
+
+# Values are encoded in the MessagePack format, so files can be read by any
+# MessagePack library; dates are written as ISO 8601 strings, integers that
+# do not fit into 64 bits as decimal strings.
+
+_UINT8 = Struct('>B')
+_UINT16 = Struct('>H')
+_UINT32 = Struct('>I')
+_UINT64 = Struct('>Q')
+_INT8 = Struct('>b')
+_INT16 = Struct('>h')
+_INT32 = Struct('>i')
+_INT64 = Struct('>q')
+_FLOAT32 = Struct('>f')
+_FLOAT64 = Struct('>d')
+
+
+def _pack_int(value: int, parts: List[bytes]):
+    if 0 <= value < 0x80:
+        parts.append(_UINT8.pack(value))
+    elif -0x20 <= value < 0:
+        parts.append(_INT8.pack(value))
+    elif 0 <= value < 1 << 64:
+        if value < 1 << 8:
+            parts.append(b'\xcc' + _UINT8.pack(value))
+        elif value < 1 << 16:
+            parts.append(b'\xcd' + _UINT16.pack(value))
+        elif value < 1 << 32:
+            parts.append(b'\xce' + _UINT32.pack(value))
+        else:
+            parts.append(b'\xcf' + _UINT64.pack(value))
+    elif -(1 << 63) <= value < 0:
+        if value >= -(1 << 7):
+            parts.append(b'\xd0' + _INT8.pack(value))
+        elif value >= -(1 << 15):
+            parts.append(b'\xd1' + _INT16.pack(value))
+        elif value >= -(1 << 31):
+            parts.append(b'\xd2' + _INT32.pack(value))
+        else:
+            parts.append(b'\xd3' + _INT64.pack(value))
+    else:
+        _pack_str(str(value), parts)
+
+
+def _pack_str(value: str, parts: List[bytes]):
+    data = value.encode('utf-8', 'surrogatepass')
+    size = len(data)
+    if size < 32:
+        parts.append(_UINT8.pack(0xa0 | size))
+    elif size < 1 << 8:
+        parts.append(b'\xd9' + _UINT8.pack(size))
+    elif size < 1 << 16:
+        parts.append(b'\xda' + _UINT16.pack(size))
+    else:
+        parts.append(b'\xdb' + _UINT32.pack(size))
+    parts.append(data)
+
+
+def _pack_bytes(value: bytes, parts: List[bytes]):
+    size = len(value)
+    if size < 1 << 8:
+        parts.append(b'\xc4' + _UINT8.pack(size))
+    elif size < 1 << 16:
+        parts.append(b'\xc5' + _UINT16.pack(size))
+    else:
+        parts.append(b'\xc6' + _UINT32.pack(size))
+    parts.append(bytes(value))
+
+
+def _pack_header(size: int, fix: int, code16: bytes, code32: bytes, parts: List[bytes]):
+    if size < 16:
+        parts.append(_UINT8.pack(fix | size))
+    elif size < 1 << 16:
+        parts.append(code16 + _UINT16.pack(size))
+    else:
+        parts.append(code32 + _UINT32.pack(size))
+
+
+def _pack_none(value: None, parts: List[bytes]):
+    parts.append(b'\xc0')
+
+
+def _pack_bool(value: bool, parts: List[bytes]):
+    parts.append(b'\xc3' if value else b'\xc2')
+
+
+def _pack_float(value: float, parts: List[bytes]):
+    parts.append(b'\xcb' + _FLOAT64.pack(value))
+
+
+def _pack_dict(value: dict, parts: List[bytes]):
+    _pack_header(len(value), 0x80, b'\xde', b'\xdf', parts)
+    for key, item in value.items():
+        pack_into(key, parts)
+        pack_into(item, parts)
+
+
+def _pack_array(value: Any, parts: List[bytes]):
+    _pack_header(len(value), 0x90, b'\xdc', b'\xdd', parts)
+    for item in value:
+        pack_into(item, parts)
+
+
+# Exact types are dispatched with one lookup, subclasses go through isinstance checks
+_PACKERS = {
+    type(None): _pack_none, bool: _pack_bool, int: _pack_int, float: _pack_float, str: _pack_str,
+    bytes: _pack_bytes, dict: _pack_dict, list: _pack_array, tuple: _pack_array,
+}
+
+
+def pack_into(value: Any, parts: List[bytes]):
+    """
+    Appends the encoded value to parts.
+
+    :param value: None, bool, int, float, str, bytes, date, datetime, time,
+        dict or a sequence of them, other values are encoded as str(value).
+    :param parts: List of encoded pieces.
+    """
+
+    packer = _PACKERS.get(type(value))
+    if packer is not None:
+        packer(value, parts)
+    elif isinstance(value, bool):
+        _pack_bool(value, parts)
+    elif isinstance(value, int):
+        _pack_int(value, parts)
+    elif isinstance(value, float):
+        _pack_float(value, parts)
+    elif isinstance(value, str):
+        _pack_str(value, parts)
+    elif isinstance(value, (bytes, bytearray)):
+        _pack_bytes(value, parts)
+    elif isinstance(value, dict):
+        _pack_dict(value, parts)
+    elif isinstance(value, (Sequence, set, frozenset)):
+        _pack_array(value, parts)
+    elif isinstance(value, (date, time)):
+        _pack_str(value.isoformat(), parts)
+    else:
+        _pack_str(str(value), parts)
+
+
+def pack(value: Any) -> bytes:
+    """
+    Encodes a value, see pack_into.
+
+    :param value: Value.
+    :return: Encoded value.
+    """
+
+    parts = []
+    pack_into(value, parts)
+    return b''.join(parts)
+
+
+# Code -> struct of fixed size values
+_FIXED = {
+    0xca: _FLOAT32, 0xcb: _FLOAT64,
+    0xcc: _UINT8, 0xcd: _UINT16, 0xce: _UINT32, 0xcf: _UINT64,
+    0xd0: _INT8, 0xd1: _INT16, 0xd2: _INT32, 0xd3: _INT64,
+}
+
+# Code -> struct of the length of strings, binaries, arrays and maps
+_STR = {0xd9: _UINT8, 0xda: _UINT16, 0xdb: _UINT32}
+_BIN = {0xc4: _UINT8, 0xc5: _UINT16, 0xc6: _UINT32}
+_ARRAY = {0xdc: _UINT16, 0xdd: _UINT32}
+_MAP = {0xde: _UINT16, 0xdf: _UINT32}
+
+
+def unpack(data: Any, offset: int = 0) -> Tuple[Any, int]:
+    """
+    Decodes one value.
+
+    :param data: Bytes-like object, for example a memoryview or an mmap.
+    :param offset: Position of the value.
+    :raises ValueError: If the data is not a supported encoded value.
+    :return: Value, dates are returned as strings, and the position after it.
+    """
+
+    try:
+        return _unpack(data, offset)
+    except StructError:
+        raise ValueError(f"Unexpected end of data after {offset}") from None
+
+
+def _unpack(data: Any, offset: int) -> Tuple[Any, int]:
+    try:
+        code = data[offset]
+    except IndexError:
+        raise ValueError(f"Unexpected end of data at {offset}") from None
+    offset += 1
+
+    if code < 0x80:
+        return code, offset
+    if code >= 0xe0:
+        return code - 0x100, offset
+    if 0xa0 <= code < 0xc0:
+        end = offset + (code & 0x1f)
+        return str(data[offset:end], 'utf-8', 'surrogatepass'), end
+    if 0x90 <= code < 0xa0:
+        return _unpack_array(data, offset, code & 0x0f)
+    if 0x80 <= code < 0x90:
+        return _unpack_map(data, offset, code & 0x0f)
+    if code == 0xc0:
+        return None, offset
+    if code == 0xc2:
+        return False, offset
+    if code == 0xc3:
+        return True, offset
+    if code in _FIXED:
+        fixed = _FIXED[code]
+        return fixed.unpack_from(data, offset)[0], offset + fixed.size
+
+    for lengths, kind in ((_STR, 'str'), (_BIN, 'bin'), (_ARRAY, 'array'), (_MAP, 'map')):
+        if code in lengths:
+            length = lengths[code]
+            size = length.unpack_from(data, offset)[0]
+            offset += length.size
+            if kind == 'array':
+                return _unpack_array(data, offset, size)
+            if kind == 'map':
+                return _unpack_map(data, offset, size)
+            end = offset + size
+            if end > len(data):
+                raise ValueError(f"Unexpected end of data at {len(data)}")
+            if kind == 'str':
+                return str(data[offset:end], 'utf-8', 'surrogatepass'), end
+            return bytes(data[offset:end]), end
+
+    raise ValueError(f"Unsupported type code 0x{code:02x} at {offset - 1}")
+
+
+def _unpack_array(data: Any, offset: int, size: int) -> Tuple[list, int]:
+    items = []
+    for _ in range(size):
+        item, offset = _unpack(data, offset)
+        items.append(item)
+    return items, offset
+
+
+def _unpack_map(data: Any, offset: int, size: int) -> Tuple[dict, int]:
+    items = {}
+    for _ in range(size):
+        key, offset = _unpack(data, offset)
+        items[key], offset = _unpack(data, offset)
+    return items, offset
+
+
+def iter_unpack(data: Any) -> Iterator[Any]:
+    """
+    Decodes consecutive values.
+
+    :param data: Bytes-like object.
+    :return: Generator of values.
+    """
+
+    offset = 0
+    while offset < len(data):
+        value, offset = unpack(data, offset)
+        yield value
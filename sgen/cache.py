@@ -0,0 +1,194 @@
+import os
+import pickle
+import tempfile
+from hashlib import blake2b
+from os import PathLike
+from typing import Any, List, Optional, Tuple, Union
+
+from sgen.datasets import CompiledDatasets, Datasets
+from sgen.fingerprint import describe
+
+
+__all__ = ["DatasetCache", "MAX_SIZE"]
+
+
+MAX_SIZE = 1 << 30
+"""Default size limit of a cache directory in bytes"""
+
+
+class DatasetCache:
+    """
+    Stores compiled data sets in a directory, see Datasets.compile
+
+    Entries are keyed by a hash of the schema definition, the kind of the
+    data set, the seed, the clock and the sgen version. The definition includes
+    the code of its functions and custom classes, so editing them misses the
+    cache. Entries are written to a temporary file and renamed, so processes can
+    share the directory, and the least recently used entries are removed when
+    the directory exceeds max_size.
+
+    :note: Entries are pickles, use only directories that you trust.
+    """
+
+    SUFFIX = '.sgen'
+
+    def __init__(self, directory: Union[str, PathLike], max_size: int = MAX_SIZE):
+        """
+        :param directory: Cache directory, created if it does not exist.
+        :param max_size: Maximum total size of the entries in bytes.
+        """
+
+        if max_size < 0:
+            raise ValueError("The cache size cannot be negative")
+
+        self.directory = os.fspath(directory)
+        self.max_size = max_size
+
+    def key(self, schema: Any, datasets: Datasets, frozen_clock: bool) -> str:
+        """
+        Returns the key of the data set of a schema.
+
+        :param schema: SGen instance.
+        :param datasets: Data set of the schema, its seed, mode and kind are part of the key.
+        :param frozen_clock: True if the clock was passed, otherwise it is not part
+            of the key and cached values keep the time of the generation that stored them.
+        :raises ValueError: If the generation is not seeded.
+        :return: Hexadecimal digest.
+        """
+
+        from sgen import __version__
+
+        if datasets.seed is None:
+            raise ValueError("The cache requires a seeded generation, pass seed to positive or negative")
+
+        definition = (
+            __version__,
+            describe(schema, code=True),
+            datasets.is_positive,
+            datasets.mode,
+            repr(datasets.seed),
+            datasets.context.clock.isoformat() if frozen_clock else None,
+        )
+        return blake2b(repr(definition).encode(), digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def load(self, key: str) -> Optional[CompiledDatasets]:
+        """
+        Reads an entry and marks it as recently used.
+
+        :param key: Key of the entry.
+        :return: Compiled data set, None if there is no readable entry.
+        """
+
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as fh:
+                datasets = pickle.load(fh)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, IndexError, TypeError):
+            # Damaged or written by an incompatible version, it is replaced by the caller
+            return None
+
+        return datasets if isinstance(datasets, CompiledDatasets) else None
+
+    def store(self, key: str, datasets: CompiledDatasets):
+        """
+        Writes an entry atomically and evicts the least recently used entries.
+
+        :param key: Key of the entry.
+        :param datasets: Compiled data set.
+        """
+
+        os.makedirs(self.directory, exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=self.directory, prefix='.tmp-', suffix=self.SUFFIX)
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                pickle.dump(datasets, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, self._path(key))
+        except BaseException:
+            try:
+                os.unlink(temporary)
+            except FileNotFoundError:
+                pass
+            raise
+
+        self.evict()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """Returns the last use time, size and path of every entry"""
+
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return entries
+
+        for name in names:
+            if not name.endswith(self.SUFFIX) or name.startswith('.tmp-'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                # Removed by another process
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        return entries
+
+    def size(self) -> int:
+        """
+        Returns the total size of the entries.
+
+        :return: Number of bytes.
+        """
+
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Removes the least recently used entries until the total size does not exceed max_size"""
+
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Removes all entries"""
+
+        for _, _, path in self._entries():
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def compiled(self, schema: Any, datasets: Datasets, frozen_clock: bool) -> CompiledDatasets:
+        """
+        Returns the cached data set, compiling and storing it on a miss.
+
+        :param schema: SGen instance.
+        :param datasets: Data set of the schema.
+        :param frozen_clock: True if the clock was passed, see key.
+        :return: Compiled data set.
+        """
+
+        key = self.key(schema, datasets, frozen_clock)
+        compiled = self.load(key)
+        if compiled is None:
+            compiled = datasets.compile()
+            self.store(key, compiled)
+        return compiled
+
+    def __repr__(self):
+        return f"<DatasetCache {self.directory!r}>"
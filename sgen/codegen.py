@@ -0,0 +1,120 @@
+from functools import lru_cache
+from itertools import product
+from typing import Any, Callable, Iterator, List, Sequence, Tuple
+
+from sgen.utils import Missing
+
+
+__all__ = ["MISSING", "product_function", "row_function", "column_values", "generate"]
+
+
+MISSING = Missing()
+"""Shared Missing value, generated functions compare values with it by identity"""
+
+MAX_NESTED_LOOPS = 16
+"""CPython limits the number of statically nested blocks, outer fields are iterated with product"""
+
+
+def column_values(column: Sequence[Any]) -> Tuple[Any, ...]:
+    """
+    Converts a column of (name, value) pairs back to values, Missing values become MISSING.
+
+    :param column: Column of pairs, Missing values are None.
+    :return: Tuple of values.
+    """
+
+    return tuple(MISSING if cell is None else cell[1] for cell in column)
+
+
+@lru_cache(maxsize=None)
+def product_function(names: Tuple[str, ...], missing: Tuple[bool, ...]) -> Callable[..., Iterator[dict]]:
+    """
+    Generates a function that iterates over the Cartesian product of field values.
+
+    The function has an unrolled nested loop per field and builds every
+    dictionary with literal keys. Keys are removed only for the fields that
+    can be Missing.
+
+    :param names: Field names in the product order.
+    :param missing: True for the fields that can take a Missing value.
+    :return: Generator function that takes a tuple of values per field.
+    """
+
+    arguments = [f'v{index}' for index in range(len(names))]
+    variables = [f'x{index}' for index in range(len(names))]
+    nested = min(len(names), MAX_NESTED_LOOPS)
+    outer = len(names) - nested
+
+    lines = [f"def generate({', '.join(arguments)}):"]
+    indent = '    '
+
+    if outer:
+        lines.append(
+            f"{indent}for {', '.join(variables[:outer])}, in product({', '.join(arguments[:outer])}):"
+        )
+        indent += '    '
+
+    for index in range(outer, len(names)):
+        lines.append(f"{indent}for {variables[index]} in {arguments[index]}:")
+        indent += '    '
+
+    items = ', '.join(f"{name!r}: {variable}" for name, variable in zip(names, variables))
+    lines.append(f"{indent}dataset = {{{items}}}")
+
+    for name, variable, can_be_missing in zip(names, variables, missing):
+        if can_be_missing:
+            lines.append(f"{indent}if {variable} is MISSING:")
+            lines.append(f"{indent}    del dataset[{name!r}]")
+
+    lines.append(f"{indent}yield dataset")
+
+    namespace = {'product': product, 'MISSING': MISSING}
+    exec(compile('\n'.join(lines), f'<sgen generate {", ".join(names)}>', 'exec'), namespace)
+
+    return namespace['generate']
+
+
+@lru_cache(maxsize=None)
+def row_function(names: Tuple[str, ...], missing: Tuple[bool, ...]) -> Callable[..., dict]:
+    """
+    Generates a function that builds a dictionary from one value per field.
+
+    Mapped over columns, it builds rows without a zip and a dict call per row.
+
+    :param names: Field names.
+    :param missing: True for the fields that can take the MISSING value.
+    :return: Function that takes a value per field.
+    """
+
+    arguments = [f'v{index}' for index in range(len(names))]
+    items = ', '.join(f"{name!r}: {argument}" for name, argument in zip(names, arguments))
+
+    lines = [f"def row({', '.join(arguments)}):", f"    dataset = {{{items}}}"]
+    for name, argument, can_be_missing in zip(names, arguments, missing):
+        if can_be_missing:
+            lines.append(f"    if {argument} is MISSING:")
+            lines.append(f"        del dataset[{name!r}]")
+    lines.append("    return dataset")
+
+    namespace = {'MISSING': MISSING}
+    exec(compile('\n'.join(lines), f'<sgen row {", ".join(names)}>', 'exec'), namespace)
+
+    return namespace['row']
+
+
+def generate(names: List[str], columns: List[Sequence[Any]]) -> Iterator[dict]:
+    """
+    Iterates over the Cartesian product of columns with a generated function.
+
+    :param names: Field names.
+    :param columns: Columns of (name, value) pairs, Missing values are None.
+    :return: Dictionary generator.
+    """
+
+    values = [column_values(column) for column in columns]
+    function = product_function(
+        tuple(names),
+        tuple(any(value is MISSING for value in column_value) for column_value in values),
+    )
+
+    return function(*values)
@@ -0,0 +1,171 @@
+from array import array
+from functools import partial
+from itertools import islice
+from typing import Any, Iterator, List, Optional, Sequence
+
+from sgen.codegen import MISSING
+from sgen.dto import ColumnChunk
+from sgen.fields import Boolean, Field, Float, Integer, Nested
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - NumPy is optional
+    numpy = None
+
+
+__all__ = ["ColumnNode", "layout", "column_chunks", "ARRAYS"]
+
+
+ARRAYS = (None, 'array', 'numpy')
+"""Containers of numeric columns: lists, array.array or NumPy arrays"""
+
+# array.array type codes and fill values of numeric fields
+_NUMERIC = {Integer: ('q', 0), Float: ('d', 0.0), Boolean: ('b', False)}
+
+
+class ColumnNode:
+    """
+    Describes a field of the columnar layout
+
+    :note: Nested schemas are flattened: their fields become children with
+        dotted names, the node of the nested field has masks but no values.
+    """
+
+    def __init__(self, key: str, name: str, field: Field, children: Optional[List['ColumnNode']] = None):
+        """
+        :param key: Name of the field in its schema.
+        :param name: Dotted name of the field.
+        :param field: Field.
+        :param children: Nodes of the fields of a nested schema, None for a leaf.
+        """
+
+        self.key = key
+        self.name = name
+        self.field = field
+        self.children = children
+
+    def __repr__(self):
+        return f"<ColumnNode {self.name}>"
+
+
+def layout(schema: Any, prefix: str = '') -> List[ColumnNode]:
+    """
+    Returns the columnar layout of the positive datasets of a schema.
+
+    :param schema: SGen instance.
+    :param prefix: Dotted name of the nested field.
+    :return: Node per field.
+    """
+
+    from sgen.sgen import SGen
+
+    nodes = []
+    for schema_field in schema.fields(is_positive=True):
+        field = schema_field.field
+        name = prefix + schema_field.attr_name
+
+        if isinstance(field, Nested) and isinstance(field.data_type, SGen):
+            nodes.append(ColumnNode(schema_field.attr_name, name, field, layout(field.data_type, prefix=name + '.')))
+        else:
+            nodes.append(ColumnNode(schema_field.attr_name, name, field))
+
+    return nodes
+
+
+def _convert(node: ColumnNode, values: List[Any], valid: List[bool], arrays: Optional[str]) -> Sequence[Any]:
+    """
+    Converts a numeric column to an array, masked values are filled with zero.
+
+    :raises ValueError: If a value does not fit into the array type, a column is never
+        an array in one chunk and a list in another.
+    """
+
+    numeric = _NUMERIC.get(type(node.field))
+    if arrays is None or numeric is None:
+        return values
+
+    code, fill = numeric
+    filled = [value if is_valid else fill for value, is_valid in zip(values, valid)]
+
+    try:
+        if arrays == 'numpy':
+            return numpy.array(filled, dtype={'q': numpy.int64, 'd': numpy.float64, 'b': numpy.bool_}[code])
+        return array(code, filled)
+    except (OverflowError, TypeError, ValueError) as error:
+        # Values that do not fit into the array type, for example default values of other types
+        raise ValueError(
+            f"The values of the column {node.name} do not fit into {arrays} arrays, pass arrays=None"
+        ) from error
+
+
+def _flatten(nodes: List[ColumnNode], columns: Sequence[Sequence[Any]], chunk: ColumnChunk, arrays: Optional[str]):
+    """Fills the chunk with the values and masks of the nodes, MISSING marks absent values"""
+
+    for node, values in zip(nodes, columns):
+        present = [value is not MISSING for value in values]
+        valid = [value is not MISSING and value is not None for value in values]
+        chunk.present[node.name] = present
+        chunk.valid[node.name] = valid
+
+        if node.children is None:
+            plain = [None if value is MISSING else value for value in values]
+            chunk.columns[node.name] = _convert(node, plain, valid, arrays)
+            continue
+
+        children = [
+            [value.get(child.key, MISSING) if isinstance(value, dict) else MISSING for value in values]
+            for child in node.children
+        ]
+        _flatten(node.children, children, chunk, arrays)
+
+
+def _masks(chunk: ColumnChunk, arrays: Optional[str]) -> ColumnChunk:
+    """Converts the masks to arrays of the requested kind"""
+
+    if arrays == 'numpy':
+        convert = partial(numpy.array, dtype=numpy.bool_)
+    elif arrays == 'array':
+        convert = partial(array, 'b')
+    else:
+        return chunk
+
+    chunk.present = {name: convert(mask) for name, mask in chunk.present.items()}
+    chunk.valid = {name: convert(mask) for name, mask in chunk.valid.items()}
+    return chunk
+
+
+def column_chunks(
+    datasets: Any,
+    nodes: List[ColumnNode],
+    chunk_size: int,
+    arrays: Optional[str] = None,
+) -> Iterator[ColumnChunk]:
+    """
+    Generates the datasets in columnar chunks.
+
+    :param datasets: Datasets.
+    :param nodes: Layout of the datasets, see layout.
+    :param chunk_size: Maximum number of datasets in a chunk.
+    :param arrays: Container of numeric columns, one of ARRAYS.
+    :return: Generator of ColumnChunk.
+    """
+
+    if chunk_size < 1:
+        raise ValueError("The chunk size must be greater than or equal to 1")
+    if arrays not in ARRAYS:
+        raise ValueError(f"Unknown arrays {arrays!r}, expected one of {', '.join(map(str, ARRAYS))}")
+    if arrays == 'numpy' and numpy is None:
+        raise ValueError("NumPy is not installed, install it or pass arrays='array'")
+
+    return _chunks(datasets.iter_rows([node.key for node in nodes]), nodes, chunk_size, arrays)
+
+
+def _chunks(rows: Iterator[tuple], nodes: List[ColumnNode], chunk_size: int, arrays: Optional[str]) -> Iterator[ColumnChunk]:
+    while True:
+        chunk_rows = list(islice(rows, chunk_size))
+        if not chunk_rows:
+            return
+
+        chunk = ColumnChunk(size=len(chunk_rows), columns={}, present={}, valid={})
+        _flatten(nodes, list(zip(*chunk_rows)), chunk, arrays)
+        yield _masks(chunk, arrays)
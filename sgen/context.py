@@ -0,0 +1,155 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from sgen import rng
+from sgen.dto import SchemaField
+from sgen.fields import Field
+from sgen.sequences import LazyColumn, LazyValues, sequence_size
+from sgen.utils import Missing
+
+
+__all__ = ["GenerationContext", "PRODUCT", "ONE_FAULT", "MODES"]
+
+
+PRODUCT = 'product'
+"""Every negative value is combined with the Cartesian product of the positive values of the other fields"""
+
+ONE_FAULT = 'one_fault'
+"""Every negative value is placed into one baseline positive dataset"""
+
+MODES = (PRODUCT, ONE_FAULT)
+
+_active: ContextVar[Optional['GenerationContext']] = ContextVar('sgen_generation_context', default=None)
+
+
+class GenerationContext:
+    """
+    Stores field values generated during one positive()/negative() call
+
+    :note: Field values are generated once per call and reused by every
+        Cartesian product that includes the field, so inner fields are not
+        regenerated for each value of outer fields.
+    """
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        seed: Any = None,
+        clock: Union[datetime, Callable[[], datetime], None] = None,
+    ):
+        """
+        :param mode: Negative generation mode, one of MODES. If not passed, the mode
+            of the context that generates the current field values is used, so
+            nested schemas follow the mode of the outer schema.
+        :param seed: Seed of the generation. Every field gets its own random number
+            generator seeded with a seed derived from this one and the field name,
+            so values do not depend on the order in which fields are generated.
+            If not passed, the seed derived for the field that generates the nested
+            schema is used, or the module random if there is none.
+        :param clock: Current time or a function returning it, called once.
+            If not passed, the time of the outer generation or datetime.now() is used.
+        """
+
+        if mode is None:
+            parent = _active.get()
+            mode = parent.mode if parent is not None else PRODUCT
+        if mode not in MODES:
+            raise ValueError(f"Unknown generation mode {mode!r}, expected one of {', '.join(MODES)}")
+
+        state = rng.current()
+        if seed is None and state is not None:
+            seed = state.seed
+        if clock is None:
+            clock = state.clock if state is not None else datetime.now()
+        elif callable(clock):
+            clock = clock()
+
+        self.mode = mode
+        self.seed = seed
+        self.clock = clock
+        self._values: Dict[Callable[[], Iterable], Sequence[Any]] = {}
+        self._columns: Dict[Tuple[str, Callable[[], Iterable]], Union[List[Optional[Tuple[str, Any]]], LazyColumn]] = {}
+
+    def values(self, field: SchemaField) -> Sequence[Any]:
+        """
+        Returns the sequence of values of the field, generating it on first access.
+
+        :param field: Schema field.
+        :return: List of values or LazyValues for nested schemas.
+        """
+
+        values = self._values.get(field.data_generator)
+        if values is None:
+            with self._generating(field):
+                if field.field is None:
+                    values = list(field.data_generator())
+                else:
+                    values = field.field.value_sequence(field.is_positive)
+            self._values[field.data_generator] = values
+        return values
+
+    def column(self, field: SchemaField) -> Union[List[Optional[Tuple[str, Any]]], LazyColumn]:
+        """
+        Returns the field values as (name, value) pairs, Missing values are replaced with None.
+
+        :param field: Schema field.
+        :return: List of pairs or LazyColumn for nested schemas.
+        """
+
+        key = (field.attr_name, field.data_generator)
+        column = self._columns.get(key)
+        if column is None:
+            values = self.values(field)
+            if isinstance(values, LazyValues):
+                column = LazyColumn(name=field.attr_name, values=values)
+            else:
+                column = [
+                    None if isinstance(value, Missing) else (field.attr_name, value)
+                    for value in values
+                ]
+            self._columns[key] = column
+        return column
+
+    def count(self, field: SchemaField) -> int:
+        """
+        Returns the number of values of the field.
+
+        Values that are already generated are counted directly. Fields that
+        do not override Field.count are generated and stored, so the values
+        are the same when the datasets are built later.
+
+        :param field: Schema field.
+        :return: Number of values.
+        """
+
+        if field.data_generator in self._values or type(field.field).count is Field.count:
+            return sequence_size(self.values(field))
+
+        with self._generating(field):
+            return field.field.count(field.is_positive)
+
+    @contextmanager
+    def _generating(self, field: SchemaField) -> Iterator[rng.RandomState]:
+        """Activates the context and the random state of the field"""
+
+        if self.seed is None:
+            state = rng.RandomState(random, self.clock)
+        else:
+            seed = rng.derive_seed(self.seed, field.attr_name, field.is_positive)
+            state = rng.RandomState(random.Random(seed), self.clock, seed)
+
+        with self.activate(), rng.use(state):
+            yield state
+
+    @contextmanager
+    def activate(self) -> Iterator['GenerationContext']:
+        """Makes the context current, nested schemas generated meanwhile inherit its settings"""
+
+        token = _active.set(self)
+        try:
+            yield self
+        finally:
+            _active.reset(token)
@@ -0,0 +1,153 @@
+from itertools import combinations, product
+from math import prod
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+from sgen.sequences import sequence_size
+
+
+__all__ = ["covering_array", "CoveringSuite"]
+
+
+def covering_array(sizes: Sequence[int], strength: int) -> List[List[int]]:
+    """
+    Builds a covering array using the IPOG strategy.
+
+    Every combination of values of any strength columns appears in at least
+    one row. The first strength columns (in descending order of size) are
+    combined completely, the rest are added one by one: each existing row
+    gets the value that covers the most uncovered combinations (horizontal
+    growth) and the remaining combinations are placed into rows with free
+    positions or into new rows (vertical growth).
+
+    :param sizes: Number of values in each column.
+    :param strength: Strength of the array, 1 means each value at least once.
+    :return: List of rows, each row holds value indexes in the order of sizes.
+    """
+
+    if strength < 1:
+        raise ValueError("The strength must be greater than or equal to 1")
+
+    if not all(sizes):
+        return []
+
+    if strength >= len(sizes):
+        return [list(row) for row in product(*(range(size) for size in sizes))]
+
+    if strength == 1:
+        return [[index % size for size in sizes] for index in range(max(sizes))]
+
+    order = sorted(range(len(sizes)), key=lambda column: -sizes[column])
+    ordered_sizes = [sizes[column] for column in order]
+
+    rows: List[List[Optional[int]]] = [
+        list(row) for row in product(*(range(size) for size in ordered_sizes[:strength]))
+    ]
+
+    for column in range(strength, len(ordered_sizes)):
+        groups = list(combinations(range(column), strength - 1))
+        uncovered = {
+            (group, values, value)
+            for group in groups
+            for values in product(*(range(ordered_sizes[index]) for index in group))
+            for value in range(ordered_sizes[column])
+        }
+
+        # Horizontal growth
+        for row in rows:
+            keys = [(group, tuple(row[index] for index in group)) for group in groups]
+            best_value, best_gain = 0, -1
+            for value in range(ordered_sizes[column]):
+                gain = sum((group, values, value) in uncovered for group, values in keys)
+                if gain > best_gain:
+                    best_value, best_gain = value, gain
+
+            row.append(best_value)
+            uncovered.difference_update((group, values, best_value) for group, values in keys)
+
+        # Vertical growth
+        for group, values, value in sorted(uncovered):
+            for row in rows:
+                if row[column] not in (None, value):
+                    continue
+                if all(row[index] in (None, item) for index, item in zip(group, values)):
+                    break
+            else:
+                row = [None] * (column + 1)
+                rows.append(row)
+
+            row[column] = value
+            for index, item in zip(group, values):
+                row[index] = item
+
+    result = []
+    for row in rows:
+        original = [0] * len(sizes)
+        for position, column in enumerate(order):
+            original[column] = row[position] or 0  # Free positions can take any value
+        result.append(original)
+
+    return result
+
+
+class CoveringSuite:
+    """
+    Datasets built from covering arrays instead of full Cartesian products
+
+    :note: Arrays are built block by block while iterating, so the first
+        datasets are available before the whole suite is computed.
+    """
+
+    def __init__(self, blocks: List[List[List[Optional[Tuple[str, Any]]]]], strength: int):
+        """
+        :param blocks: Cartesian product blocks, each block is a list of columns
+            of (name, value) pairs where Missing values are None.
+        :param strength: Strength of the covering arrays.
+        """
+
+        self.blocks = blocks
+        self.strength = strength
+        self._rows: List[Optional[List[List[int]]]] = [None] * len(blocks)
+        self._iterator: Optional[Iterator[dict]] = None
+
+    def _block_rows(self, index: int) -> List[List[int]]:
+        if self._rows[index] is None:
+            sizes = [sequence_size(column) for column in self.blocks[index]]
+            self._rows[index] = covering_array(sizes, self.strength)
+        return self._rows[index]
+
+    def __iter__(self) -> Iterator[dict]:
+        """Iterates over the datasets from the first one, after next() continues the shared iterator"""
+
+        if self._iterator is not None:
+            return self._iterator
+        return self._iterate()
+
+    def _iterate(self) -> Iterator[dict]:
+        for index, columns in enumerate(self.blocks):
+            for row in self._block_rows(index):
+                yield dict(filter(None, map(lambda column, item: column[item], columns, row)))
+
+    def __next__(self) -> dict:
+        """Returns the next dataset of an iterator shared by all next() calls, see Datasets.__next__"""
+
+        if self._iterator is None:
+            self._iterator = self._iterate()
+        return next(self._iterator)
+
+    def __len__(self) -> int:
+        return sum(len(self._block_rows(index)) for index in range(len(self.blocks)))
+
+    @property
+    def total(self) -> int:
+        """Number of datasets in the full Cartesian product"""
+
+        return sum(prod(sequence_size(column) for column in columns) for columns in self.blocks)
+
+    @property
+    def saved(self) -> int:
+        """Number of datasets saved compared with the full Cartesian product"""
+
+        return self.total - len(self)
+
+    def __repr__(self):
+        return f"<CoveringSuite strength={self.strength} datasets={len(self)} saved={self.saved}>"
@@ -0,0 +1,898 @@
+from array import array
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import accumulate, chain, cycle, islice, product, repeat
+from math import prod
+from operator import index as as_index
+from random import Random
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from sgen import codegen
+from sgen.context import GenerationContext, ONE_FAULT, PRODUCT
+from sgen.dto import EncodedSegment, SchemaField
+from sgen.encoded import EncodedDatasets, column_dictionary, typecode
+from sgen.fingerprint import format_dataset_id
+from sgen.fragments import compose, fragment_column
+from sgen.product import decode, odometer, prefix_cost
+from sgen.sequences import ChainedSequence, LazyColumn, LazyFragments, RepeatedSequence, sequence_size
+from sgen.utils import estimate_cost
+
+
+__all__ = ["Datasets", "CompiledDatasets"]
+
+
+Column = List[Optional[Tuple[str, Any]]]
+
+
+class Datasets:
+    """
+    Represents a set of test data: one or several blocks of combinations of field values
+
+    In the PRODUCT mode every block is a Cartesian product of its columns. In
+    the ONE_FAULT mode the first column of a block holds negative values and
+    each of them is placed into one baseline positive dataset: baseline r
+    takes value r % len(column) of every other column.
+
+    :note: Field values are generated on first access and stored in the
+        context, so the data set can be iterated several times.
+    """
+
+    def __init__(
+        self,
+        blocks: List[List[SchemaField]],
+        context: GenerationContext,
+        codegen: bool = False,
+        mode: str = PRODUCT,
+        fingerprint: Optional[str] = None,
+        is_positive: bool = True,
+    ):
+        """
+        :param blocks: Fields of every block.
+        :param context: Generation context that stores field values.
+        :param codegen: True if products must be iterated with generated functions, see sgen.codegen.
+        :param mode: PRODUCT or ONE_FAULT, see sgen.context.
+        :param fingerprint: Fingerprint of the schema, see dataset_id.
+        :param is_positive: True if the datasets are positive, see dataset_id.
+        """
+
+        self.blocks = blocks
+        self.context = context
+        self.codegen = codegen
+        self.mode = mode
+        self.fingerprint = fingerprint
+        self.is_positive = is_positive
+        self._cumulative_costs: Dict[int, List[int]] = {}
+        self._fragment_columns: Dict[int, Sequence[bytes]] = {}
+        self._iterator: Optional[Iterator[dict]] = None
+
+    @property
+    def seed(self) -> Optional[Union[int, str]]:
+        """Seed of the generation, None if it is not seeded"""
+
+        return self.context.seed
+
+    def _columns(self, fields: List[SchemaField]) -> List[Column]:
+        return [self.context.column(field) for field in fields]
+
+    def _names(self, fields: List[SchemaField]) -> List[str]:
+        return [field.attr_name for field in fields]
+
+    def _block_size(self, columns: List[Column]) -> int:
+        """Returns the number of datasets in the block"""
+
+        if self.mode == ONE_FAULT:
+            return sequence_size(columns[0]) if columns and all(map(sequence_size, columns)) else 0
+        return prod(sequence_size(column) for column in columns)
+
+    def _positions(self, columns: List[Column], index: int) -> List[int]:
+        """Returns positions of values of the dataset with the index in the block"""
+
+        if self.mode == ONE_FAULT:
+            baseline = index % max(map(sequence_size, columns[1:]), default=1)
+            return [index] + [baseline % sequence_size(column) for column in columns[1:]]
+        return decode(index, [sequence_size(column) for column in columns])
+
+    def _iterate_block(self, columns: List[Column], start: int = 0) -> Iterator[List[Optional[Tuple[str, Any]]]]:
+        """Iterates over the value combinations of the block starting from the index start"""
+
+        if self.mode == ONE_FAULT:
+            for index in range(start, self._block_size(columns)):
+                yield [column[position] for column, position in zip(columns, self._positions(columns, index))]
+            return
+
+        yield from odometer(columns, start=self._positions(columns, start) if start else None)
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        """
+        Finds the block that contains the dataset.
+
+        :param index: Index of the dataset, not negative.
+        :return: Index of the block, index of the dataset in the block.
+        """
+
+        for block, fields in enumerate(self.blocks):
+            size = self._block_size(self._columns(fields))
+            if index < size:
+                return block, index
+            index -= size
+
+        raise IndexError("Dataset index out of range")
+
+    def __iter__(self) -> Iterator[dict]:
+        """
+        Iterates over the datasets from the first one.
+
+        :note: Once next() was called, the shared iterator is returned, so
+            for loops and islice continue after the datasets it consumed.
+        """
+
+        if self._iterator is not None:
+            return self._iterator
+        return self._iterate()
+
+    def _iterate(self) -> Iterator[dict]:
+        for fields in self.blocks:
+            columns = self._columns(fields)
+
+            # Generated functions need stored values, lazy nested columns are iterated by index
+            if self.codegen and self.mode == PRODUCT and not any(isinstance(column, LazyColumn) for column in columns):
+                yield from codegen.generate(self._names(fields), columns)
+                continue
+
+            for dataset in self._iterate_block(columns):
+                yield dict(filter(None, dataset))
+
+    def __next__(self) -> dict:
+        """
+        Returns the next dataset of an iterator shared by all next() calls.
+
+        :note: Keeps next(schema.positive()) working as with generators, the
+            data set is consumed like a generator from then on, see __iter__.
+        """
+
+        if self._iterator is None:
+            self._iterator = self._iterate()
+        return next(self._iterator)
+
+    def iter_range(self, start: int, stop: int) -> Iterator[dict]:
+        """
+        Generates datasets with indexes from start to stop without generating the previous ones.
+
+        :param start: Index of the first dataset.
+        :param stop: Index of the dataset after the last one.
+        :return: Dictionary generator.
+        """
+
+        remaining = stop - start
+        if remaining <= 0:
+            return
+
+        block, offset = self._locate(start)
+
+        for fields in self.blocks[block:]:
+            for dataset in self._iterate_block(self._columns(fields), start=offset):
+                yield dict(filter(None, dataset))
+
+                remaining -= 1
+                if not remaining:
+                    return
+
+            offset = 0
+
+    def iter_rows(self, names: List[str]) -> Iterator[Tuple[Any, ...]]:
+        """
+        Iterates over the datasets as tuples of values without building dictionaries.
+
+        :param names: Field names, one value per name is returned.
+        :return: Generator of tuples, codegen.MISSING for Missing values and absent fields.
+        """
+
+        for fields in self.blocks:
+            block_names = self._names(fields)
+            positions = [block_names.index(name) if name in block_names else None for name in names]
+
+            for cells in self._iterate_block(self._columns(fields)):
+                yield tuple(
+                    codegen.MISSING if position is None or cells[position] is None else cells[position][1]
+                    for position in positions
+                )
+
+    def _fragments(self, fields: List[SchemaField]) -> List[Sequence[bytes]]:
+        """Returns the columns of the block as JSON fragments, every value is encoded once"""
+
+        columns = []
+        for column in self._columns(fields):
+            fragments = self._fragment_columns.get(id(column))
+            if fragments is None:
+                fragments = self._fragment_columns[id(column)] = fragment_column(column)
+            columns.append(fragments)
+        return columns
+
+    def iter_json(self) -> Iterator[bytes]:
+        """
+        Iterates over the datasets as compact JSON objects.
+
+        Every field value is encoded once, a dataset is a concatenation of the
+        encoded "key":value fragments of its values, see sgen.fragments.
+
+        :return: Generator of UTF-8 bytes, equal to the JSON encoding of the dictionaries.
+        """
+
+        for fields in self.blocks:
+            columns = self._fragments(fields)
+
+            if self.mode == PRODUCT and not any(isinstance(column, LazyFragments) for column in columns):
+                yield from map(compose, product(*columns))
+                continue
+
+            yield from map(compose, self._iterate_block(columns))
+
+    def json_at(self, index: int) -> bytes:
+        """
+        Returns a dataset by index as a compact JSON object, see iter_json.
+
+        :param index: Index of the dataset.
+        :return: UTF-8 bytes.
+        """
+
+        index = as_index(index)
+        if index < 0:
+            index += self.count()
+        if index < 0:
+            raise IndexError("Dataset index out of range")
+
+        block, offset = self._locate(index)
+        columns = self._fragments(self.blocks[block])
+        return compose(map(lambda column, position: column[position], columns, self._positions(columns, offset)))
+
+    def __getitem__(self, item: Union[int, slice]) -> Union[dict, List[dict]]:
+        """
+        Returns a dataset by index or a list of datasets by slice.
+
+        The index is decoded into positions of field values, so the cost does
+        not depend on the index.
+        """
+
+        if isinstance(item, slice):
+            indexes = range(self.count())[item]
+            if indexes.step == 1:
+                return list(self.iter_range(indexes.start, indexes.stop))
+            return [self[index] for index in indexes]
+
+        item = as_index(item)
+        if item < 0:
+            item += self.count()
+        if item < 0:
+            raise IndexError("Dataset index out of range")
+
+        block, offset = self._locate(item)
+        columns = self._columns(self.blocks[block])
+        positions = self._positions(columns, offset)
+
+        return dict(filter(None, map(lambda column, position: column[position], columns, positions)))
+
+    def dataset_id(self, index: int) -> str:
+        """
+        Returns a compact id of the dataset that SGen.replay rebuilds it from.
+
+        :param index: Index of the dataset.
+        :raises ValueError: If the generation is not seeded or the schema is unknown.
+        :return: Id in the form <fingerprint>:<seed>:<kind><index>, see sgen.fingerprint.
+        """
+
+        if self.fingerprint is None:
+            raise ValueError("Dataset ids are available only for datasets of a schema")
+        if self.seed is None:
+            raise ValueError("Dataset ids require a seeded generation, pass seed to positive or negative")
+
+        index = as_index(index)
+        count = self.count()
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("Dataset index out of range")
+
+        kind = 'p' if self.is_positive else ('o' if self.mode == ONE_FAULT else 'n')
+        return format_dataset_id(self.fingerprint, self.seed, kind, index)
+
+    def encode(self, start: int = 0, stop: Optional[int] = None) -> EncodedDatasets:
+        """
+        Encodes datasets as indexes into the values of their fields, see sgen.encoded.
+
+        The dictionaries are the field values the datasets are built from, so
+        every value is stored once however many datasets use it.
+
+        :param start: Index of the first dataset.
+        :param stop: Index of the dataset after the last one, by default all datasets.
+        :return: EncodedDatasets.
+        """
+
+        count = self.count()
+        start = max(start, 0)
+        stop = count if stop is None else min(stop, count)
+
+        dictionaries = []
+        encoded_columns = {}
+        blocks = []
+
+        for fields in self.blocks:
+            columns = self._columns(fields)
+            block = []
+            for column in columns:
+                if id(column) not in encoded_columns:
+                    dictionary, indexes, present = column_dictionary(column)
+                    encoded_columns[id(column)] = (len(dictionaries), indexes, present)
+                    dictionaries.append(dictionary)
+                block.append(encoded_columns[id(column)])
+            blocks.append((self._names(fields), block, self._block_size(columns)))
+
+        width = max((len(block) for _, block, _ in blocks), default=0)
+        can_be_missing = any(False in present for _, block, _ in blocks for _, _, present in block)
+        stride = (width + 7) // 8 if can_be_missing else 0
+
+        # Dictionaries of huge nested schemas get 64-bit indexes, extend fails if an index does not fit
+        indexes = array(typecode(min(max(map(sequence_size, dictionaries), default=0), 1 << 64)))
+        presence = bytearray()
+        segments = []
+        first = encoded = 0
+
+        for names, block, size in blocks:
+            begin, end = max(start - first, 0), min(stop - first, size)
+            first += size
+            if begin >= end:
+                continue
+
+            segments.append(EncodedSegment(
+                start=encoded,
+                size=end - begin,
+                offset=len(indexes),
+                names=tuple(names),
+                dictionaries=tuple(dictionary for dictionary, _, _ in block),
+            ))
+            encoded += end - begin
+
+            # Indexes are stored field by field, runs of repeated values compress well
+            positions = [column_indexes for _, column_indexes, _ in block]
+            try:
+                if self.mode == PRODUCT:
+                    for field in range(len(positions)):
+                        indexes.extend(_product_column(positions, field, begin, end))
+                else:
+                    for column in zip(*self._iterate_positions(positions, begin, end)):
+                        indexes.extend(column)
+            except OverflowError:
+                raise ValueError("Too many values in a dictionary") from None
+
+            if stride:
+                # Bit i of a bitmap row is set if field i of the block is present
+                bits = [_shifted(present, field) for field, (_, _, present) in enumerate(block)]
+                presence += b''.join(
+                    sum(row).to_bytes(stride, 'little') for row in self._iterate_positions(bits, begin, end)
+                )
+
+        return EncodedDatasets(encoded, dictionaries, segments, indexes, bytes(presence), stride)
+
+    def _iterate_positions(self, columns: List[Sequence[int]], begin: int, end: int) -> Iterator[Sequence[int]]:
+        """Iterates over the combinations of integer columns of a block from begin to end"""
+
+        if self.mode == PRODUCT and not begin and all(isinstance(column, list) for column in columns):
+            return islice(product(*columns), end)
+        if self.mode == PRODUCT:
+            return zip(*(_product_column(columns, field, begin, end) for field in range(len(columns))))
+        return islice(self._iterate_block(columns, start=begin), end - begin)
+
+    def find(self, dataset: Any) -> Iterator[int]:
+        """
+        Returns the indexes of the datasets equal to dataset without generating the others.
+
+        Values are matched field by field in the columns of every block and
+        the positions of the matches are combined into indexes, values of
+        nested schemas are searched in their datasets.
+
+        :param dataset: Dictionary.
+        :return: Generator of indexes.
+        """
+
+        if not isinstance(dataset, dict):
+            return
+
+        offset = 0
+        for fields in self.blocks:
+            columns = self._columns(fields)
+            names = self._names(fields)
+            size = self._block_size(columns)
+
+            if size and set(dataset) <= set(names):
+                matches = [list(_matching_positions(column, name, dataset)) for column, name in zip(columns, names)]
+                if self.mode == PRODUCT:
+                    sizes = [sequence_size(column) for column in columns]
+                    for positions in product(*matches):
+                        index = 0
+                        for position, column_size in zip(positions, sizes):
+                            index = index * column_size + position
+                        yield offset + index
+                else:
+                    for index in matches[0]:
+                        positions = self._positions(columns, index)
+                        if all(position in match for position, match in zip(positions[1:], matches[1:])):
+                            yield offset + index
+
+            offset += size
+
+    def count(self) -> int:
+        """
+        Returns the exact number of datasets without generating them.
+
+        :note: Unlike len(), the result is not limited by sys.maxsize.
+
+        :return: Number of datasets.
+        """
+
+        if self.mode == ONE_FAULT:
+            return sum(
+                self.context.count(fields[0]) if all(map(self.context.count, fields)) else 0
+                for fields in self.blocks
+            )
+
+        return sum(
+            prod(self.context.count(field) for field in fields)
+            for fields in self.blocks
+        )
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def _cumulative_cost(self, column: Column) -> List[int]:
+        """Returns the cumulative costs of the column values, Missing values cost nothing"""
+
+        if isinstance(column, LazyColumn):
+            return column.cumulative_costs()
+
+        costs = self._cumulative_costs.get(id(column))
+        if costs is None:
+            costs = self._cumulative_costs[id(column)] = list(accumulate(
+                (0 if cell is None else estimate_cost(cell[1]) for cell in column),
+                initial=0,
+            ))
+        return costs
+
+    def cost(self, index: int) -> int:
+        """
+        Returns the estimated cost of generating the first index datasets.
+
+        Every dataset costs 1 plus the estimated costs of its values, so
+        datasets with big nested values cost more.
+
+        :param index: Number of datasets.
+        :return: Estimated cost.
+        """
+
+        total = 0
+
+        for fields in self.blocks:
+            columns = self._columns(fields)
+            size = self._block_size(columns)
+            cumulative = [self._cumulative_cost(column) for column in columns]
+            stop = min(index, size)
+
+            if self.mode == ONE_FAULT:
+                # Blocks are linear in the number of negative values, costs are summed directly
+                total += stop + sum(
+                    cumulative[column][position + 1] - cumulative[column][position]
+                    for offset in range(stop)
+                    for column, position in enumerate(self._positions(columns, offset))
+                )
+            else:
+                total += stop + prefix_cost(stop, [sequence_size(column) for column in columns], cumulative)
+
+            if index < size:
+                return total
+            index -= size
+
+        return total
+
+    def shard_bounds(self, shard: int, num_shards: int) -> Tuple[int, int]:
+        """
+        Returns the range of dataset indexes of the shard.
+
+        Shards are contiguous, disjoint and balanced by estimated cost, so
+        together they produce exactly the datasets of the whole set in the same order.
+
+        :param shard: Index of the shard, from 0 to num_shards - 1.
+        :param num_shards: Number of shards.
+        :return: Index of the first dataset and index of the dataset after the last one.
+        """
+
+        if num_shards < 1:
+            raise ValueError("The number of shards must be greater than or equal to 1")
+        if not 0 <= shard < num_shards:
+            raise ValueError("The shard index must be from 0 to num_shards - 1")
+
+        count = self.count()
+        total = self.cost(count)
+
+        def bound(part: int) -> int:
+            """Returns the smallest index whose cost reaches part / num_shards of the total"""
+
+            low, high = 0, count
+            while low < high:
+                middle = (low + high) // 2
+                if self.cost(middle) * num_shards >= total * part:
+                    high = middle
+                else:
+                    low = middle + 1
+            return low
+
+        start = 0 if shard == 0 else bound(shard)
+        stop = count if shard == num_shards - 1 else bound(shard + 1)
+
+        return start, stop
+
+    def shard(self, shard: int, num_shards: int) -> Iterator[dict]:
+        """
+        Generates only the datasets of the shard, see shard_bounds.
+
+        :param shard: Index of the shard, from 0 to num_shards - 1.
+        :param num_shards: Number of shards.
+        :return: Dictionary generator.
+        """
+
+        return self.iter_range(*self.shard_bounds(shard, num_shards))
+
+    def sample(self, k: int, seed: Any = None, stratified: bool = False) -> List[dict]:
+        """
+        Returns k distinct datasets chosen uniformly at random.
+
+        Indexes are drawn and decoded, so the other datasets are not generated.
+
+        :param k: Number of datasets.
+        :param seed: Seed of the random number generator.
+        :param stratified: True if every Cartesian product (every negative
+            field of a negative data set) must be represented by at least one dataset.
+        :return: List of dictionaries in the serial order.
+        """
+
+        rng = Random(seed)
+
+        if not stratified:
+            return [self[index] for index in sorted(_sample_indexes(rng, self.count(), k))]
+
+        sizes = [self._block_size(self._columns(fields)) for fields in self.blocks]
+        result = []
+        offset = 0
+
+        for size, quota in zip(sizes, _stratify(k, sizes)):
+            result += [self[offset + index] for index in sorted(_sample_indexes(rng, size, quota))]
+            offset += size
+
+        return result
+
+    def compile(self) -> 'CompiledDatasets':
+        """
+        Generates the values of all fields and returns them without the schema.
+
+        The result holds only field values, so it can be pickled and sent to
+        worker processes even if validators or data_from callables cannot.
+
+        :return: CompiledDatasets.
+        """
+
+        return CompiledDatasets(
+            blocks=[
+                (
+                    self._names(fields),
+                    [
+                        column.compile() if isinstance(column, LazyColumn) else column
+                        for column in self._columns(fields)
+                    ],
+                )
+                for fields in self.blocks
+            ],
+            codegen=self.codegen,
+            mode=self.mode,
+            fingerprint=self.fingerprint,
+            is_positive=self.is_positive,
+            seed=self.seed,
+        )
+
+    def parallel(
+        self,
+        workers: int,
+        ordered: bool = True,
+        chunk_size: int = 10_000,
+        start: int = 0,
+        stop: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """
+        Generates datasets in a pool of worker processes.
+
+        The index range is split into chunks that are generated by the workers
+        from the compiled data set.
+
+        :param workers: Number of worker processes.
+        :param ordered: True if datasets must be returned in the serial order,
+            otherwise chunks are returned as they are completed.
+        :param chunk_size: Number of datasets generated by a worker at once.
+        :param start: Index of the first dataset.
+        :param stop: Index of the dataset after the last one, by default all datasets.
+        :return: Dictionary generator.
+        """
+
+        return chain.from_iterable(self.parallel_map(list, workers, ordered, chunk_size, start, stop))
+
+    def parallel_map(
+        self,
+        task: Callable[[Iterator[dict]], Any],
+        workers: int,
+        ordered: bool = True,
+        chunk_size: int = 10_000,
+        start: int = 0,
+        stop: Optional[int] = None,
+    ) -> Iterator[Any]:
+        """
+        Applies task to chunks of datasets in a pool of worker processes.
+
+        Workers generate the datasets of a chunk themselves, only the results
+        of task are sent back, for example serialized chunks.
+
+        :param task: Picklable function that takes an iterator of the datasets of a chunk.
+        :param workers: Number of worker processes.
+        :param ordered: True if results must be returned in the order of chunks,
+            otherwise they are returned as they are completed.
+        :param chunk_size: Number of datasets in a chunk.
+        :param start: Index of the first dataset.
+        :param stop: Index of the dataset after the last one, by default all datasets.
+        :return: Generator of results of task.
+        """
+
+        if workers < 1:
+            raise ValueError("The number of workers must be greater than or equal to 1")
+        if chunk_size < 1:
+            raise ValueError("The chunk size must be greater than or equal to 1")
+
+        compiled = self.compile()
+        if stop is None:
+            stop = compiled.count()
+
+        return _parallel(compiled, workers, ordered, chunk_size, start, stop, task)
+
+    def names(self) -> List[str]:
+        """
+        Returns the names of the fields of all products in the order of their first appearance.
+
+        :return: List of names.
+        """
+
+        names = {}
+        for fields in self.blocks:
+            names.update(dict.fromkeys(self._names(fields)))
+        return list(names)
+
+    def __repr__(self):
+        return f"<Datasets products={len(self.blocks)}>"
+
+
+class CompiledDatasets(Datasets):
+    """
+    Represents a set of test data whose field values are already generated
+
+    :note: Blocks are pairs of field names and columns of (name, value)
+        pairs instead of schema fields, so the object can be pickled.
+    """
+
+    def __init__(
+        self,
+        blocks: List[Tuple[List[str], List[Column]]],
+        codegen: bool = False,
+        mode: str = PRODUCT,
+        fingerprint: Optional[str] = None,
+        is_positive: bool = True,
+        seed: Optional[Union[int, str]] = None,
+    ):
+        """
+        :param blocks: Field names and columns of every block.
+        :param codegen: True if products must be iterated with generated functions.
+        :param mode: PRODUCT or ONE_FAULT, see Datasets.
+        :param fingerprint: Fingerprint of the schema, see dataset_id.
+        :param is_positive: True if the datasets are positive, see dataset_id.
+        :param seed: Seed of the generation that produced the values, see dataset_id.
+        """
+
+        super().__init__(
+            blocks=blocks, context=None, codegen=codegen, mode=mode, fingerprint=fingerprint, is_positive=is_positive,
+        )
+        self._seed = seed
+
+    @property
+    def seed(self) -> Optional[Union[int, str]]:
+        return self._seed
+
+    def _columns(self, block: Tuple[List[str], List[Column]]) -> List[Column]:
+        return block[1]
+
+    def _names(self, block: Tuple[List[str], List[Column]]) -> List[str]:
+        return block[0]
+
+    def count(self) -> int:
+        return sum(self._block_size(columns) for _, columns in self.blocks)
+
+    def compile(self) -> 'CompiledDatasets':
+        return self
+
+    def __getstate__(self):
+        return {
+            'blocks': self.blocks,
+            'codegen': self.codegen,
+            'mode': self.mode,
+            'fingerprint': self.fingerprint,
+            'is_positive': self.is_positive,
+            'seed': self._seed,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __repr__(self):
+        return f"<CompiledDatasets products={len(self.blocks)}>"
+
+
+def _sample_indexes(rng: Random, population: int, k: int) -> set:
+    """
+    Chooses k distinct indexes from range(population) using Floyd's algorithm.
+
+    Takes O(k) time and memory regardless of the population size.
+    """
+
+    if not 0 <= k <= population:
+        raise ValueError("Sample larger than population or is negative")
+
+    selected = set()
+    for index in range(population - k, population):
+        candidate = rng.randrange(index + 1)
+        selected.add(index if candidate in selected else candidate)
+
+    return selected
+
+
+def _stratify(k: int, sizes: List[int]) -> List[int]:
+    """
+    Splits k between products in proportion to their sizes, each non-empty product gets at least one.
+
+    :param k: Number of datasets.
+    :param sizes: Number of datasets in every product.
+    :return: Number of datasets to choose from every product.
+    """
+
+    if k > sum(sizes):
+        raise ValueError("Sample larger than population")
+
+    quotas = [int(bool(size)) for size in sizes]
+    if k < sum(quotas):
+        raise ValueError("The sample must contain at least one dataset of every product")
+
+    remaining = k - sum(quotas)
+    while remaining:
+        capacity = [size - quota for size, quota in zip(sizes, quotas)]
+        shares = [remaining * free // sum(capacity) for free in capacity]
+
+        if not any(shares):
+            # Fewer datasets left than products, the largest products get them
+            for index in sorted(range(len(sizes)), key=lambda item: -capacity[item])[:remaining]:
+                shares[index] = 1
+
+        quotas = [quota + share for quota, share in zip(quotas, shares)]
+        remaining -= sum(shares)
+
+    return quotas
+
+
+_worker_datasets: Optional[CompiledDatasets] = None
+
+
+def _set_worker_datasets(datasets: CompiledDatasets) -> None:
+    """Stores the data set in the worker process, so it is sent once instead of with every chunk"""
+
+    global _worker_datasets
+    _worker_datasets = datasets
+
+
+def _matching_positions(column: Column, name: str, dataset: dict) -> Iterator[int]:
+    """Returns the positions of the column whose values are the value of the field in the dataset"""
+
+    present = name in dataset
+    value = dataset.get(name)
+
+    def matches(cell: Optional[Tuple[str, Any]]) -> bool:
+        if cell is None:
+            return not present
+        return present and type(cell[1]) == type(value) and cell[1] == value
+
+    if not isinstance(column, LazyColumn):
+        yield from (position for position, cell in enumerate(column) if matches(cell))
+        return
+
+    head = column.values.head
+    yield from (position for position, item in enumerate(head) if matches(column._cell(item)))
+    if present:
+        yield from (len(head) + index for index in column.values.datasets.find(value))
+
+
+def _shifted(present: Sequence[bool], field: int) -> Sequence[int]:
+    """Returns the presence flags of a column as the bits of field in bitmap rows"""
+
+    if isinstance(present, ChainedSequence):
+        tail = RepeatedSequence(1 << field, present.tail_size)
+        return ChainedSequence(_shifted(present.head, field), tail, present.tail_size)
+    return [is_present << field for is_present in present]
+
+
+def _product_column(columns: List[Sequence[int]], field: int, begin: int, end: int) -> Iterator[int]:
+    """Returns the values of one column in the combinations of a Cartesian product from begin to end"""
+
+    column = columns[field]
+    size = sequence_size(column)
+    inner = prod(map(sequence_size, columns[field + 1:]))
+    if inner == 1:
+        if isinstance(column, list):
+            return islice(cycle(column), begin % size, begin % size + end - begin)
+        return (column[index % size] for index in range(begin, end))
+
+    def runs() -> Iterator[Iterator[int]]:
+        index = begin
+        while index < end:
+            run = min(inner - index % inner, end - index)
+            yield repeat(column[index // inner % size], run)
+            index += run
+
+    return chain.from_iterable(runs())
+
+
+def _run_chunk(task: Callable[[Iterator[dict]], Any], start: int, stop: int) -> Any:
+    return task(_worker_datasets.iter_range(start, stop))
+
+
+def _parallel(
+    datasets: CompiledDatasets,
+    workers: int,
+    ordered: bool,
+    chunk_size: int,
+    start: int,
+    stop: int,
+    task: Callable[[Iterator[dict]], Any] = list,
+) -> Iterator[Any]:
+    """Applies task to chunks of datasets in a process pool, see Datasets.parallel_map"""
+
+    chunks = ((index, min(index + chunk_size, stop)) for index in range(start, stop, chunk_size))
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_set_worker_datasets,
+        initargs=(datasets,),
+    )
+    pending = deque()
+
+    def submit() -> bool:
+        chunk = next(chunks, None)
+        if chunk is not None:
+            pending.append(executor.submit(_run_chunk, task, *chunk))
+        return chunk is not None
+
+    try:
+        # A limited number of chunks is submitted at once to keep memory bounded
+        for _ in range(workers * 2):
+            if not submit():
+                break
+
+        while pending:
+            if ordered:
+                future = pending.popleft()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = done.pop()
+                pending.remove(future)
+
+            submit()
+            yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Union
+from typing import Any, Dict, Sequence, Tuple, Type, Union
 
 from sgen.fields import Field
 
@@ -8,3 +8,44 @@ from sgen.fields import Field
 class SchemaField:
     attr_name: str
     data_generator: Union[Field.positive, Field.negative]
+    field: Field = None
+    is_positive: bool = True
+
+
+@dataclass(frozen=True)
+class SchemaPlan:
+    positive: Tuple[SchemaField, ...]
+    negative: Tuple[SchemaField, ...]
+    kinds: Tuple[Tuple[str, Type[Field]], ...]
+
+
+@dataclass
+class ColumnChunk:
+    size: int
+    columns: Dict[str, Sequence[Any]]  # Dotted name of a leaf field -> values, None where absent
+    present: Dict[str, Sequence[bool]]  # Dotted name of a field -> False where the value is Missing
+    valid: Dict[str, Sequence[bool]]  # Dotted name of a field -> False where the value is None or Missing
+
+
+@dataclass(frozen=True)
+class EncodedSegment:
+    start: int  # Index of the first dataset of the segment
+    size: int  # Number of datasets of the segment
+    offset: int  # Position of the first value index of the segment, indexes are stored field by field
+    names: Tuple[str, ...]  # Field names in the order of the datasets
+    dictionaries: Tuple[int, ...]  # Dictionary of every field
+
+
+@dataclass
+class WriteStats:
+    datasets: int
+    bytes: int  # Size of the serialized datasets before compression
+    seconds: float
+
+    @property
+    def datasets_per_second(self) -> float:
+        return self.datasets / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.0
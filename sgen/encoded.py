@@ -0,0 +1,296 @@
+import pickle
+import zlib
+from array import array
+from bisect import bisect_right
+from operator import index as as_index
+from os import PathLike
+from typing import Any, Callable, Iterator, List, Sequence, Tuple, Union
+
+from sgen.codegen import MISSING, row_function
+from sgen.dto import EncodedSegment
+from sgen.sequences import ChainedSequence, LazyColumn, LazyValues, RepeatedSequence
+from sgen.utils import Missing
+
+
+__all__ = ["EncodedDatasets", "column_dictionary", "typecode"]
+
+
+_MAGIC = b'SGENDICT1'
+
+
+class _CachedValues:
+    """Values of a nested schema that are decoded once, up to LIMIT of them"""
+
+    LIMIT = 1 << 16
+
+    def __init__(self, values: LazyValues):
+        self.values = values
+        self._cache = {}
+
+    def __getitem__(self, index: int) -> Any:
+        value = self._cache.get(index, MISSING)
+        if value is MISSING:
+            value = self.values[index]
+            if len(self._cache) < self.LIMIT:
+                self._cache[index] = value
+        return value
+
+
+class EncodedDatasets:
+    """
+    Represents datasets as indexes into per-field value dictionaries
+
+    Every dataset is a vector of value indexes, one per field, and a row of a
+    presence bitmap whose zero bits mark Missing values. Indexes are stored
+    field by field, so the repeating patterns of a product compress well. Datasets are decoded
+    on access, so loading an encoded suite only reads the dictionaries and
+    two flat buffers.
+
+    :note: Fields of a negative data set have two dictionaries: negative and
+        positive values. Datasets keep the field order of their product.
+    """
+
+    def __init__(
+        self,
+        count: int,
+        dictionaries: List[Sequence[Any]],
+        segments: List[EncodedSegment],
+        indexes: array,
+        presence: bytes,
+        stride: int,
+    ):
+        """
+        :param count: Number of datasets.
+        :param dictionaries: Values of the fields without Missing values.
+        :param segments: Runs of datasets with the same fields, see EncodedSegment.
+        :param indexes: Value indexes of all datasets.
+        :param presence: Presence bitmap, stride bytes per dataset, bit i is field i of the segment.
+        :param stride: Number of bytes of a bitmap row, 0 if no value is Missing.
+        """
+
+        self._count = count
+        self.dictionaries = dictionaries
+        self.segments = segments
+        self.indexes = indexes
+        self.presence = presence
+        self.stride = stride
+        self._starts = [segment.start for segment in segments]
+        self._lookups = [
+            _CachedValues(dictionary) if isinstance(dictionary, LazyValues) else dictionary
+            for dictionary in dictionaries
+        ]
+        # (segment start, presence mask) -> row function and (field, dictionary) of the present fields
+        self._decoders = {}
+
+    def count(self) -> int:
+        """
+        Returns the number of datasets.
+
+        :return: Number of datasets.
+        """
+
+        return self._count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _decoder(self, segment: EncodedSegment, mask: int) -> Tuple[Callable[..., dict], List[Tuple[int, int]]]:
+        """Returns a function building datasets of the segment with the present fields of the mask"""
+
+        fields = [
+            (field, dictionary)
+            for field, dictionary in enumerate(segment.dictionaries)
+            if mask >> field & 1
+        ]
+        names = tuple(segment.names[field] for field, _ in fields)
+        decoder = self._decoders[segment.start, mask] = (row_function(names, (False,) * len(names)), fields)
+        return decoder
+
+    def _decode(self, segment: EncodedSegment, index: int) -> dict:
+        position = segment.offset + index - segment.start
+
+        if self.stride:
+            mask = int.from_bytes(self.presence[index * self.stride:(index + 1) * self.stride], 'little')
+        else:
+            mask = -1
+
+        decoder = self._decoders.get((segment.start, mask))
+        if decoder is None:
+            decoder = self._decoder(segment, mask)
+
+        function, fields = decoder
+        lookups, indexes, size = self._lookups, self.indexes, segment.size
+        return function(*[lookups[dictionary][indexes[position + field * size]] for field, dictionary in fields])
+
+    def __getitem__(self, item: Union[int, slice]) -> Union[dict, List[dict]]:
+        """Returns a dataset by index or a list of datasets by slice"""
+
+        if isinstance(item, slice):
+            indexes = range(self._count)[item]
+            if indexes.step == 1:
+                return list(self.iter_range(indexes.start, indexes.stop))
+            return [self[index] for index in indexes]
+
+        item = as_index(item)
+        if item < 0:
+            item += self._count
+        if not 0 <= item < self._count:
+            raise IndexError("Dataset index out of range")
+
+        return self._decode(self.segments[bisect_right(self._starts, item) - 1], item)
+
+    def iter_range(self, start: int, stop: int) -> Iterator[dict]:
+        """
+        Decodes the datasets with indexes from start to stop.
+
+        :param start: Index of the first dataset.
+        :param stop: Index of the dataset after the last one.
+        :return: Dictionary generator.
+        """
+
+        start, stop = max(start, 0), min(stop, self._count)
+        if start >= stop:
+            return
+
+        first = bisect_right(self._starts, start) - 1
+        bounds = self._starts[first + 1:] + [self._count]
+
+        for segment, end in zip(self.segments[first:], bounds):
+            for index in range(max(start, segment.start), min(stop, end)):
+                yield self._decode(segment, index)
+            if end >= stop:
+                return
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.iter_range(0, self._count)
+
+    def to_bytes(self, level: int = 6) -> bytes:
+        """
+        Serializes the encoded datasets.
+
+        :param level: zlib compression level from 0 to 9, value indexes repeat in
+            regular patterns and compress well.
+        :return: Bytes for from_bytes.
+        """
+
+        state = pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+        return _MAGIC + zlib.compress(state, level)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'EncodedDatasets':
+        """
+        Restores encoded datasets serialized with to_bytes.
+
+        :param data: Serialized datasets, from a trusted source only, they are unpickled.
+        :raises ValueError: If the data was not produced by to_bytes.
+        :return: EncodedDatasets.
+        """
+
+        if not data.startswith(_MAGIC):
+            raise ValueError("The data is not encoded datasets")
+
+        try:
+            encoded = pickle.loads(zlib.decompress(data[len(_MAGIC):]))
+        except (zlib.error, pickle.UnpicklingError, EOFError):
+            raise ValueError("The data is not encoded datasets") from None
+
+        if not isinstance(encoded, cls):
+            raise ValueError("The data is not encoded datasets")
+        return encoded
+
+    def save(self, path: Union[str, PathLike], level: int = 6):
+        """
+        Writes the encoded datasets to a file, see to_bytes.
+
+        :param path: Path of the file.
+        :param level: zlib compression level.
+        """
+
+        with open(path, 'wb') as fh:
+            fh.write(self.to_bytes(level))
+
+    @classmethod
+    def load(cls, path: Union[str, PathLike]) -> 'EncodedDatasets':
+        """
+        Reads encoded datasets written by save.
+
+        :param path: Path of the file.
+        :return: EncodedDatasets.
+        """
+
+        with open(path, 'rb') as fh:
+            return cls.from_bytes(fh.read())
+
+    def __getstate__(self):
+        return {
+            'count': self._count,
+            'dictionaries': self.dictionaries,
+            'segments': self.segments,
+            'indexes': self.indexes,
+            'presence': self.presence,
+            'stride': self.stride,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __repr__(self):
+        return f"<EncodedDatasets datasets={self._count} dictionaries={len(self.dictionaries)}>"
+
+
+def column_dictionary(column: Any) -> Tuple[Sequence[Any], Sequence[int], Sequence[bool]]:
+    """
+    Builds the dictionary of a column.
+
+    :param column: Column of (name, value) pairs, see GenerationContext.column.
+    :return: Values without Missing ones, dictionary index of every position, presence of every position.
+        Positions of the datasets of a nested schema are computed on access, see ChainedSequence.
+    """
+
+    if isinstance(column, LazyColumn):
+        # The datasets of a nested schema stay lazy, only the special values are kept
+        head = column.values.head
+        nested = column.values.datasets.compile()
+        skipped = column.values.skipped
+        dictionary = LazyValues(
+            head=[value for value in head if not isinstance(value, Missing)], datasets=nested, skipped=skipped,
+        )
+        head_present = [not isinstance(value, Missing) for value in head]
+        head_indexes = _indexes(head_present)
+        # Nested values follow the present special values in the same order as in the column
+        size = nested.count() - len(skipped)
+        first = len(dictionary.head)
+        return (
+            dictionary,
+            ChainedSequence(head_indexes, range(first, first + size), size),
+            ChainedSequence(head_present, RepeatedSequence(True, size), size),
+        )
+
+    dictionary = [cell[1] for cell in column if cell is not None]
+    present = [cell is not None for cell in column]
+    return dictionary, _indexes(present), present
+
+
+def _indexes(present: List[bool]) -> List[int]:
+    """Numbers the present positions in order, missing positions get 0"""
+
+    indexes = []
+    next_index = 0
+    for is_present in present:
+        indexes.append(next_index if is_present else 0)
+        next_index += is_present
+    return indexes
+
+
+def typecode(size: int) -> str:
+    """
+    Returns the smallest unsigned array type that holds indexes of a dictionary.
+
+    :param size: Number of values in the dictionary.
+    :return: array type code.
+    """
+
+    for code in 'BHIQ':
+        if size <= 1 << (8 * array(code).itemsize):
+            return code
+    raise ValueError("Too many values in a dictionary")
@@ -1,9 +1,13 @@
-from typing import Iterable, Callable, Any, List, Union, Optional
-from string import ascii_letters
-from random import choice, randint
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterable, Iterator, Callable, Any, Dict, List, Union, Optional, Sequence, Tuple
 from datetime import datetime, date, timedelta
 
+from sgen import batch
 from sgen.base import FieldABC, ValidatorABC
+from sgen.sequences import LazyValues, RepeatedSequence, LAZY_LENGTH
+from sgen.rng import get_random, now, today
+from sgen.text import random_text
 from sgen.utils import is_iterable_but_not_string, Missing, ValuesStorage
 
 
@@ -20,6 +24,22 @@ __all__ = [
 ]
 
 
+class _Collected:
+    """Values registered by one call of Field.positive or Field.negative"""
+
+    __slots__ = ('values', 'inner_values')
+
+    def __init__(self):
+        self.values = ValuesStorage()
+        self.inner_values = []
+
+
+# Id of a field -> values of its running positive or negative call. Every call
+# collects into its own storage, so threads and tasks generating the same
+# field do not share it. The mapping is replaced, never changed.
+_collected: ContextVar[Dict[int, _Collected]] = ContextVar('sgen_collected_values', default={})
+
+
 class Field(FieldABC):
     """Base class for data types"""
 
@@ -53,16 +73,62 @@ class Field(FieldABC):
         self.default = default
         self.allow_none = allow_none
         self.required = required
-        self.values = ValuesStorage()
-        self.inner_values = []  # Only for Collections
+        self._values = ValuesStorage()
+        self._inner_values = []
 
-    def positive(self):
-        self.values = ValuesStorage()
+    @property
+    def values(self) -> ValuesStorage:
+        """Values of the running positive or negative call, outside of it the last generated values"""
 
+        collected = _collected.get().get(id(self))
+        return self._values if collected is None else collected.values
+
+    @values.setter
+    def values(self, values: ValuesStorage):
+        collected = _collected.get().get(id(self))
+        if collected is None:
+            self._values = values
+        else:
+            collected.values = values
+
+    @property
+    def inner_values(self) -> Iterable[Any]:
+        """Values of the data type of a Collection, stored like values"""
+
+        collected = _collected.get().get(id(self))
+        return self._inner_values if collected is None else collected.inner_values
+
+    @inner_values.setter
+    def inner_values(self, inner_values: Iterable[Any]):
+        collected = _collected.get().get(id(self))
+        if collected is None:
+            self._inner_values = inner_values
+        else:
+            collected.inner_values = inner_values
+
+    @contextmanager
+    def _collecting(self) -> Iterator[_Collected]:
+        """Makes values and inner_values refer to the storage of the current call"""
+
+        collected = _Collected()
+        token = _collected.set({**_collected.get(), id(self): collected})
+        try:
+            yield collected
+        finally:
+            _collected.reset(token)
+            self._values, self._inner_values = collected.values, collected.inner_values
+
+    def positive(self):
         if self.positive_data_from is not None:
             yield from self.positive_data_from()
             return
 
+        with self._collecting() as collected:
+            self._collect_positive()
+
+        yield from collected.values
+
+    def _collect_positive(self):
         for validator in self.validators:
             if isinstance(self, Collection):
                 self.inner_values = list(self.data_type.positive())
@@ -72,27 +138,23 @@ class Field(FieldABC):
             else:
                 self._register(validator.positive(self))
 
-        if self.allow_none:
-            self._register(None)
-
-        if self.default is not None:
-            self._register(self.default)
-
-        if not self.required:
-            self._register(Missing())
+        for value in self._special_values(is_positive=True):
+            self._register(value)
 
         if self.positive_data_from is None and not self.validators:
             self.set_positive_values()
 
-        yield from self.values
-
     def negative(self):
-        self.values = ValuesStorage()
-
         if self.negative_data_from is not None:
             yield from self.negative_data_from()
             return
 
+        with self._collecting() as collected:
+            self._collect_negative()
+
+        yield from collected.values
+
+    def _collect_negative(self):
         for validator in self.validators:
             if isinstance(self, Collection):
                 self.inner_values = list(self.data_type.positive())
@@ -107,16 +169,152 @@ class Field(FieldABC):
             else:
                 self._register(validator.negative(self))
 
-        if not self.allow_none:
-            self._register(None)
-
-        if self.required:
-            self._register(Missing())
+        for value in self._special_values(is_positive=False):
+            self._register(value)
 
         if self.positive_data_from is None:
             self.set_negative_values()
 
-        yield from self.values
+    def _special_values(self, is_positive: bool) -> List[Any]:
+        """
+        Returns None, default and Missing values if the field settings allow them.
+
+        :param is_positive: True if positive values are needed.
+        :return: List of values.
+        """
+
+        values = []
+
+        if is_positive:
+            if self.allow_none:
+                values.append(None)
+            if self.default is not None:
+                values.append(self.default)
+            if not self.required:
+                values.append(Missing())
+        else:
+            if not self.allow_none:
+                values.append(None)
+            if self.required:
+                values.append(Missing())
+
+        return values
+
+    def _has_missing(self, is_positive: bool) -> bool:
+        """Returns True if Missing is one of the positive or negative values of the field"""
+
+        data_from = self.positive_data_from if is_positive else self.negative_data_from
+        values = data_from() if data_from is not None else self._special_values(is_positive)
+
+        return any(isinstance(value, Missing) for value in values)
+
+    def value_sequence(self, is_positive: bool) -> Sequence[Any]:
+        """
+        Returns the positive or negative values of the field as a sequence.
+
+        :note: Override this method if values can be generated on access by
+            index instead of being stored in a list, as Nested does.
+
+        :param is_positive: True if positive values are needed.
+        :return: Sequence of values.
+        """
+
+        return list(self.positive() if is_positive else self.negative())
+
+    def count(self, is_positive: bool) -> int:
+        """
+        Returns the number of positive or negative values of the field.
+
+        :note: Override this method if the number of values can be computed
+            without generating them, as Nested and Collection do.
+
+        :param is_positive: True if positive values are needed.
+        :return: Number of values.
+        """
+
+        return len(list(self.positive() if is_positive else self.negative()))
+
+    def generate_batch(self, n: int) -> List[Any]:
+        """
+        Generates n random positive values at once.
+
+        Values satisfy the validator of the field: Range and Length bounds are
+        passed to random_batch, Equal and OneOf values are repeated and chosen,
+        NoneOf values are replaced. None, default and Missing are not generated.
+
+        :param n: Number of values.
+        :raises NotImplementedError: If the data type does not implement random_batch.
+        :return: List of values.
+        """
+
+        from sgen.validate import Equal, OneOf, NoneOf
+
+        if n < 0:
+            raise ValueError("The number of values cannot be negative")
+
+        validator = self.validators[0] if self.validators else None
+
+        if isinstance(validator, Equal):
+            return [validator.comparable] * n
+        if isinstance(validator, OneOf):
+            return get_random().choices(validator.choices, k=n)
+
+        values = self.random_batch(n)
+
+        if isinstance(validator, NoneOf):
+            invalid = ValuesStorage(validator.invalid_values)
+            for index, value in enumerate(values):
+                while value in invalid:
+                    value = self.random_batch(1)[0]
+                values[index] = value
+
+        return values
+
+    def random_batch(self, n: int) -> List[Any]:
+        """
+        Generates n random values of the data type within the Range or Length bounds of the field.
+
+        :note: Implement this method in your data type to support generate_batch.
+
+        :param n: Number of values.
+        :return: List of values.
+        """
+
+        raise NotImplementedError(f'{type(self).__name__} does not support batch generation')
+
+    def supports_batch(self) -> bool:
+        """Returns True if the data type implements random_batch"""
+
+        return type(self).random_batch is not Field.random_batch
+
+    def _range_bounds(self, low: Any, high: Any) -> Tuple[Any, Any]:
+        """
+        Returns the positive bounds of the Range validator of the field.
+
+        A missing bound is placed at the distance of the default bounds from the other one.
+
+        :param low: Default minimum value.
+        :param high: Default maximum value.
+        :return: Minimum and maximum values.
+        """
+
+        from sgen.validate import Range
+
+        for validator in self.validators:
+            if not isinstance(validator, Range):
+                continue
+
+            span = high - low
+            if validator.min is not None:
+                low = validator._get_min(self, positive=True)
+            if validator.max is not None:
+                high = validator._get_max(self, positive=True)
+            if validator.min is None:
+                low = high - span
+            if validator.max is None:
+                high = low + span
+
+        return low, high
 
     def set_positive_values(self):
         raise NotImplementedError('Implement this method in your data type')
@@ -151,33 +349,66 @@ class Field(FieldABC):
     def _register(self, for_register: Union[Any, List[Any]]):
         """Adds a new value/values to the field's list of values if it is not already present"""
 
+        values = self.values
         if isinstance(for_register, list):
             for value in for_register:
-                if value not in self.values:
-                    self.values.append(value)
+                if value not in values:
+                    values.append(value)
         else:
-            if for_register not in self.values:
-                self.values.append(for_register)
+            if for_register not in values:
+                values.append(for_register)
+
+
+def _check_memory_limit(length: int, memory_limit: Optional[int]) -> None:
+    """Raises ValueError if a value of the length built in memory exceeds memory_limit, None means no limit"""
+
+    if memory_limit is not None and length > memory_limit:
+        raise ValueError(f"The length {length} exceeds the memory limit {memory_limit}")
 
 
 class String(Field):
     """String representation"""
 
     def set_positive_values(self) -> None:
-        self._register(self.generate(length=randint(1, 10)))
+        self._register(self.generate(length=get_random().randint(1, 10)))
 
     def set_negative_values(self) -> None:
-        self._register(randint(-100, 100))
+        self._register(get_random().randint(-100, 100))
 
-    def generate(self, length: int):
+    def generate(self, length: int, memory_limit: Optional[int] = None):
         """
         Generates a string of the specified length.
 
         :param length: String length.
+        :param memory_limit: Maximum string length, no limit if None.
+        :raises ValueError: If the length exceeds the memory limit.
         :return: String.
         """
 
-        return ''.join(choice(ascii_letters) for _ in range(length))
+        _check_memory_limit(length, memory_limit)
+
+        return random_text(length)
+
+    def random_batch(self, n: int) -> List[str]:
+        from sgen.validate import Length
+
+        low, high = 1, 10
+        for validator in self.validators:
+            if isinstance(validator, Length):
+                low = validator.min or 0
+                high = validator.max if validator.max is not None else low + 10
+                _check_memory_limit(high, validator.memory_limit)
+
+        lengths = batch.integers(low, high, n)
+        text = random_text(sum(lengths))
+
+        # All strings are cut from one random text
+        values = []
+        start = 0
+        for length in lengths:
+            values.append(text[start:start + length])
+            start += length
+        return values
 
     def get_other_value(self, value: Optional[str]) -> str:
         """Returns an object of type str and not equal to value"""
@@ -195,22 +426,26 @@ class Integer(Field):
         self.step = step
 
     def set_positive_values(self) -> None:
-        self._register(randint(-100, 100))
+        self._register(get_random().randint(-100, 100))
 
     def set_negative_values(self) -> None:
         self._register(
-            ''.join(choice(ascii_letters) for _ in range(randint(5, 10)))
+            random_text(get_random().randint(5, 10))
         )
 
     def get_step(self):
         return self.step
 
+    def random_batch(self, n: int) -> List[int]:
+        low, high = self._range_bounds(-100, 100)
+        return batch.integers(low, high, n, step=self.step)
+
     def get_other_value(self, value: Optional[int]) -> int:
         """Returns an object of type int and not equal to value"""
 
         if value is None:
-            return randint(10, 100000)
-        return value + randint(10, 100000)
+            return get_random().randint(10, 100000)
+        return value + get_random().randint(10, 100000)
 
 
 class Float(Field):
@@ -221,22 +456,26 @@ class Float(Field):
         self.step = step
 
     def set_positive_values(self) -> None:
-        self._register(randint(-10000, 10000) / 100)
+        self._register(get_random().randint(-10000, 10000) / 100)
 
     def set_negative_values(self) -> None:
         self._register(
-            ''.join(choice(ascii_letters) for _ in range(randint(5, 10)))
+            random_text(get_random().randint(5, 10))
         )
 
     def get_step(self):
         return self.step
 
+    def random_batch(self, n: int) -> List[float]:
+        low, high = self._range_bounds(-100.0, 100.0)
+        return batch.uniform(low, high, n)
+
     def get_other_value(self, value: Optional[float]) -> float:
         """Returns an object of type float and not equal to value"""
 
         if value is None:
-            return randint(1000000, 100000000) / 100
-        return value + randint(1000000, 100000000) / 100
+            return get_random().randint(1000000, 100000000) / 100
+        return value + get_random().randint(1000000, 100000000) / 100
 
 
 class Boolean(Field):
@@ -247,9 +486,12 @@ class Boolean(Field):
 
     def set_negative_values(self) -> None:
         self._register(
-            ''.join(choice(ascii_letters) for _ in range(randint(5, 10)))
+            random_text(get_random().randint(5, 10))
         )
 
+    def random_batch(self, n: int) -> List[bool]:
+        return batch.booleans(n)
+
     def get_other_value(self, value: Optional[bool]) -> bool:
         """Returns an object of type bool and not equal to value"""
 
@@ -266,7 +508,7 @@ class DateTime(Field):
         self.step = step
 
     def set_positive_values(self) -> None:
-        self._register(datetime.now())
+        self._register(now())
 
     def set_negative_values(self) -> None:
         self._register('not_datetime')
@@ -274,12 +516,18 @@ class DateTime(Field):
     def get_step(self) -> timedelta:
         return self.step
 
+    def random_batch(self, n: int) -> List[datetime]:
+        clock = now()
+        low, high = self._range_bounds(clock - timedelta(days=365), clock + timedelta(days=365))
+        return batch.grid(low, high, self.step, n)
+
     def get_other_value(self, value: Optional[datetime]) -> datetime:
         """Returns an object of type datetime and not equal to value"""
 
         if value is None:
-            return datetime.now()
-        return value + timedelta(days=randint(1, 365), minutes=randint(1, 60))
+            return now()
+        rng = get_random()
+        return value + timedelta(days=rng.randint(1, 365), minutes=rng.randint(1, 60))
 
 
 class Date(Field):
@@ -290,7 +538,7 @@ class Date(Field):
         self.step = step
 
     def set_positive_values(self) -> None:
-        self._register(datetime.now().date())
+        self._register(today())
 
     def set_negative_values(self) -> None:
         self._register('not_date')
@@ -298,13 +546,18 @@ class Date(Field):
     def get_step(self):
         return self.step
 
+    def random_batch(self, n: int) -> List[date]:
+        day = today()
+        low, high = self._range_bounds(day - timedelta(days=365), day + timedelta(days=365))
+        return batch.grid(low, high, self.step, n)
+
     def get_other_value(self, value: date) -> date:
         """Returns an object of type date and not equal to value"""
 
         if value is None:
-            return datetime.now().date()
+            return today()
 
-        return value + timedelta(days=randint(1, 365))
+        return value + timedelta(days=get_random().randint(1, 365))
 
 
 class Collection(Field):
@@ -330,27 +583,60 @@ class Collection(Field):
 
         if isinstance(for_register, list):
             self.values.extend([
-                list(filter(lambda item: not isinstance(item, Missing), value))  # Filtering Missing within lists
+                self._without_missing(value)
                 for value in for_register
-                if list(filter(lambda item: not isinstance(item, Missing), value)) or not self.validators
+                if self._without_missing(value) or not self.validators
             ])
         else:
             if for_register not in self.values:
                 self.values.append(for_register)
 
+    @staticmethod
+    def _without_missing(value: Sequence[Any]) -> Sequence[Any]:
+        """Filters Missing within a list, a repeated Missing becomes an empty list"""
+
+        if isinstance(value, RepeatedSequence):
+            return [] if isinstance(value.value, Missing) else value
+        return list(filter(lambda item: not isinstance(item, Missing), value))
+
     def set_positive_values(self) -> None:
         self.inner_values = self.data_type.positive()
 
         for value in self.inner_values:
-            self._register([[value for _ in range(randint(1, 5))]])
+            self._register([[value for _ in range(get_random().randint(1, 5))]])
 
     def set_negative_values(self) -> None:
         self.inner_values = self.data_type.negative()
 
         for value in self.inner_values:
-            self._register([[value for _ in range(randint(1, 5))]])
+            self._register([[value for _ in range(get_random().randint(1, 5))]])
+
+    def generate(
+            self,
+            length: int,
+            memory_limit: Optional[int] = None,
+            lazy: bool = False,
+    ) -> List[Sequence[Any]]:
+        """
+        Generates a list of the specified length for each inner value.
+
+        If lazy, lists longer than LAZY_LENGTH are RepeatedSequence views, so a boundary
+        of any length costs the same memory.
+
+        :param length: List length.
+        :param memory_limit: Maximum length of a materialized list, no limit if None.
+        :param lazy: True to generate lists longer than LAZY_LENGTH as RepeatedSequence.
+        :raises ValueError: If a list built in memory exceeds the memory limit.
+        :return: Lists of inner values.
+        """
+
+        if lazy and length > LAZY_LENGTH:
+            return [
+                RepeatedSequence(allowed_value, length, memory_limit=memory_limit)
+                for allowed_value in self.inner_values
+            ]
 
-    def generate(self, length: int) -> List[Any]:
+        _check_memory_limit(length, memory_limit)
         return [
             [allowed_value for _ in range(length)]
             for allowed_value in self.inner_values
@@ -363,6 +649,67 @@ class Collection(Field):
             return [self.data_type.get_other_value(value=value)]
         return value * 2
 
+    def _inner_count(self, is_positive: bool) -> Tuple[int, int]:
+        """
+        Returns the number of inner values and the number of Missing values among them.
+
+        :param is_positive: True if positive inner values are needed.
+        :return: Number of values, number of Missing values.
+        """
+
+        if not isinstance(self.data_type, Field):
+            count = self.data_type.count_positive() if is_positive else self.data_type.count_negative()
+            return count, 0
+
+        return self.data_type.count(is_positive), int(self.data_type._has_missing(is_positive))
+
+    def count(self, is_positive: bool) -> int:
+        """
+        Returns the number of positive or negative values of the collection.
+
+        Computed from the number of inner values, so nested schemas are not generated.
+
+        :param is_positive: True if positive values are needed.
+        :return: Number of values.
+        """
+
+        from sgen.validate import Length
+
+        data_from = self.positive_data_from if is_positive else self.negative_data_from
+        if data_from is not None:
+            return len(list(data_from()))
+
+        if not all(isinstance(validator, Length) for validator in self.validators):
+            return super().count(is_positive)
+
+        # Lists of Missing become empty after filtering, empty lists are dropped if there are validators
+        positive_count, positive_missing = self._inner_count(is_positive=True)
+        present_positive = positive_count - positive_missing
+        count = len(self._special_values(is_positive))
+
+        if is_positive:
+            for validator in self.validators:
+                count += sum(bool(length) * present_positive for length in (validator.min, validator.max))
+            if not self.validators:
+                count += positive_count
+            return count
+
+        negative_count, negative_missing = self._inner_count(is_positive=False)
+        present_negative = negative_count - negative_missing
+
+        for validator in self.validators:
+            lengths = (
+                None if validator.min is None else validator.min - 1,
+                None if validator.max is None else validator.max + 1,
+            )
+            count += sum(bool(length) * present_positive for length in lengths)
+            count += sum(bool(length) * present_negative for length in (validator.min, validator.max))
+
+        if self.positive_data_from is None:
+            count += present_negative if self.validators else negative_count
+
+        return count
+
 
 class Nested(Field):
     """Entity View"""
@@ -377,8 +724,82 @@ class Nested(Field):
         super().__init__(*args, **kwargs)
         self.data_type = data_type
 
+    def _is_lazy(self, is_positive: bool) -> bool:
+        """Returns True if values are the special values and the datasets of the nested schema only"""
+
+        data_from = self.positive_data_from if is_positive else self.negative_data_from
+        return data_from is None and self.positive_data_from is None and not self.validators
+
+    def positive(self):
+        if self._is_lazy(is_positive=True):
+            yield from self.value_sequence(is_positive=True)
+        else:
+            yield from super().positive()
+
+    def negative(self):
+        if self._is_lazy(is_positive=False):
+            yield from self.value_sequence(is_positive=False)
+        else:
+            yield from super().negative()
+
+    def value_sequence(self, is_positive: bool) -> Sequence[Any]:
+        """
+        Returns the values of the field without generating the datasets of the nested schema.
+
+        Datasets are built on access, so memory does not depend on the size of the nested product.
+
+        :param is_positive: True if positive values are needed.
+        :return: LazyValues or list if values come from data_from or validators.
+        """
+
+        if not self._is_lazy(is_positive):
+            return super().value_sequence(is_positive)
+
+        datasets = self.data_type.positive() if is_positive else self.data_type.negative()
+        head = self._head(is_positive)
+        return LazyValues(head=head, datasets=datasets, skipped=self._skipped(head, datasets))
+
+    def _head(self, is_positive: bool) -> List[Any]:
+        """Returns the distinct None, default and Missing values"""
+
+        head = ValuesStorage()
+        for value in self._special_values(is_positive):
+            if value not in head:
+                head.append(value)
+        return list(head)
+
+    @staticmethod
+    def _skipped(head: List[Any], datasets: Any) -> List[int]:
+        """Returns the sorted indexes of the nested datasets that equal a special value, such as the default"""
+
+        return sorted({index for value in head for index in datasets.find(value)})
+
     def set_positive_values(self) -> None:
         self._register(list(self.data_type.positive()))
 
     def set_negative_values(self) -> None:
         self._register(list(self.data_type.negative()))
+
+    def count(self, is_positive: bool) -> int:
+        """
+        Returns the number of positive or negative values of the nested schema.
+
+        Computed from the number of datasets of the schema, so they are not generated.
+
+        :param is_positive: True if positive values are needed.
+        :return: Number of values.
+        """
+
+        data_from = self.positive_data_from if is_positive else self.negative_data_from
+        if data_from is not None:
+            return len(list(data_from()))
+
+        if self.validators:
+            return super().count(is_positive)
+
+        if is_positive or self.positive_data_from is None:
+            datasets = self.data_type.positive() if is_positive else self.data_type.negative()
+            head = self._head(is_positive)
+            return len(head) + datasets.count() - len(self._skipped(head, datasets))
+
+        return len(self._special_values(is_positive))
@@ -0,0 +1,171 @@
+import re
+from hashlib import blake2b
+from types import CodeType, FunctionType, MethodType
+from typing import Any, Optional, Tuple, Union
+
+from sgen.base import FieldABC, ValidatorABC
+
+
+__all__ = ["describe", "fingerprint", "format_dataset_id", "parse_dataset_id", "KINDS"]
+
+
+KINDS = ('p', 'n', 'o')
+"""Kinds of dataset ids: positive, negative and negative in the one_fault mode"""
+
+_INTEGER = re.compile(r'-?\d+')
+
+
+# Attributes that are filled during generation and do not define the field
+_RUNTIME_ATTRIBUTES = {'_values', '_inner_values'}
+
+
+def _name(obj: Any) -> str:
+    return f"{getattr(obj, '__module__', '')}.{getattr(obj, '__qualname__', type(obj).__qualname__)}"
+
+
+def _code(code: CodeType) -> Any:
+    """Describes compiled code by its bytecode and constants, nested functions included"""
+
+    return (code.co_code, code.co_names, tuple(
+        _code(constant) if isinstance(constant, CodeType) else repr(constant)
+        for constant in code.co_consts
+    ))
+
+
+def _function(function: FunctionType, seen: set) -> Any:
+    """Describes a function by its code, defaults and the values of its closure"""
+
+    return (
+        _code(function.__code__),
+        describe(function.__defaults__, code=True, seen=seen),
+        tuple(_cell(cell, seen) for cell in function.__closure__ or ()),
+    )
+
+
+def _cell(cell: Any, seen: set) -> Any:
+    try:
+        contents = cell.cell_contents
+    except ValueError:
+        # The variable is not assigned yet
+        return 'empty'
+    return describe(contents, code=True, seen=seen)
+
+
+def _class(owner: type) -> Any:
+    """Describes the methods of a class and its bases that are not defined in sgen"""
+
+    return tuple(
+        (cls.__qualname__, name, _code(attribute.__code__))
+        for cls in owner.__mro__
+        if cls.__module__ != 'builtins' and cls.__module__.split('.')[0] != 'sgen'
+        for name, attribute in sorted(vars(cls).items())
+        if isinstance(attribute, FunctionType)
+    )
+
+
+def describe(value: Any, code: bool = False, seen: Optional[set] = None) -> Any:
+    """
+    Returns a description of a schema, field or validator built of strings, tuples and numbers.
+
+    Equal definitions get equal descriptions in every process: objects are
+    described by their type and attributes, functions by their qualified
+    names, so memory addresses never get into the result.
+
+    :param value: Schema, field, validator or a value of their attribute.
+    :param code: True if functions and the methods of custom classes must be described
+        by their code too, so editing them changes the description.
+    :param seen: Ids of the objects being described, guards against cycles.
+    :return: Description.
+    """
+
+    from sgen.sgen import SGen
+
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 'cycle'
+
+    if isinstance(value, (SGen, FieldABC, ValidatorABC, FunctionType)) or (
+        isinstance(value, (list, tuple, dict)) and value
+    ):
+        seen = seen | {id(value)}
+
+    if isinstance(value, SGen):
+        plan = value._get_plan()
+        description = ('schema', _name(type(value)), tuple(
+            (field.attr_name, describe(field.field, code, seen)) for field in plan.positive
+        ))
+        return description + (_class(type(value)),) if code else description
+    if isinstance(value, (FieldABC, ValidatorABC)):
+        description = (_name(type(value)), tuple(
+            (name, describe(item, code, seen))
+            for name, item in sorted(vars(value).items())
+            if name not in _RUNTIME_ATTRIBUTES
+        ))
+        return description + (_class(type(value)),) if code else description
+    if isinstance(value, (list, tuple)):
+        return tuple(describe(item, code, seen) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((repr(key), describe(item, code, seen)) for key, item in value.items()))
+    if callable(value):
+        if code and isinstance(value, FunctionType):
+            return ('callable', _name(value), _function(value, seen))
+        if code and isinstance(value, MethodType) and isinstance(value.__func__, FunctionType):
+            return ('callable', _name(value), _function(value.__func__, seen))
+        return ('callable', _name(value))
+    if type(value).__repr__ is object.__repr__:
+        return ('object', _name(type(value)))
+    return repr(value)
+
+
+def fingerprint(schema: Any) -> str:
+    """
+    Returns a short stable hash of the schema definition.
+
+    :param schema: SGen instance.
+    :return: 12 hexadecimal digits.
+    """
+
+    return blake2b(repr(describe(schema)).encode(), digest_size=6).hexdigest()
+
+
+def format_dataset_id(fingerprint: str, seed: Union[int, str], kind: str, index: int) -> str:
+    """
+    Returns the id of a dataset: <fingerprint>:<seed>:<kind><index>.
+
+    :param fingerprint: Schema fingerprint.
+    :param seed: Seed of the generation, an int or a string that is not an integer.
+    :param kind: One of KINDS.
+    :param index: Index of the dataset.
+    :raises ValueError: If the seed cannot be restored from the id.
+    :return: Dataset id.
+    """
+
+    if isinstance(seed, bool) or not isinstance(seed, (int, str)) or (
+        isinstance(seed, str) and _INTEGER.fullmatch(seed)
+    ):
+        raise ValueError(f"The seed {seed!r} cannot be stored in a dataset id, use an int or a non-numeric str")
+
+    return f"{fingerprint}:{seed}:{kind}{index}"
+
+
+def parse_dataset_id(dataset_id: str) -> Tuple[str, Union[int, str], str, int]:
+    """
+    Splits a dataset id into its parts, see format_dataset_id.
+
+    :param dataset_id: Dataset id.
+    :raises ValueError: If the id is malformed.
+    :return: Fingerprint, seed, kind and index.
+    """
+
+    try:
+        fingerprint, rest = dataset_id.split(':', 1)
+        seed, position = rest.rsplit(':', 1)
+        kind, index = position[0], int(position[1:])
+    except (ValueError, IndexError):
+        raise ValueError(f"Malformed dataset id {dataset_id!r}") from None
+
+    if kind not in KINDS or index < 0 or not seed:
+        raise ValueError(f"Malformed dataset id {dataset_id!r}")
+
+    return fingerprint, int(seed) if _INTEGER.fullmatch(seed) else seed, kind, index
@@ -0,0 +1,87 @@
+import json
+from collections.abc import Sequence
+from datetime import date, time
+from typing import Any, Iterable, List, Union
+
+from sgen.sequences import LazyColumn, LazyFragments
+from sgen.utils import Missing
+
+
+__all__ = ["JSON_ENCODER", "json_default", "encode", "fragment_column", "compose"]
+
+
+def json_default(value: Any) -> Any:
+    """
+    Converts values that JSON does not support.
+
+    :param value: Value that is not a JSON type.
+    :return: ISO 8601 string for dates and times, list for sequences and sets, str(value) otherwise.
+    """
+
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, (Sequence, set, frozenset)) and not isinstance(value, (str, bytes)):
+        return list(value)
+    return str(value)
+
+
+JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=json_default)
+"""Compact encoder shared by the JSON outputs, so they produce identical bytes"""
+
+
+def encode(value: Any) -> bytes:
+    """
+    Encodes a value as compact JSON.
+
+    :param value: Value.
+    :return: UTF-8 bytes.
+    """
+
+    return JSON_ENCODER.encode(value).encode('utf-8', 'surrogatepass')
+
+
+# A fragment is ',"name":value', so a dataset is its fragments joined
+# without the first comma; Missing values have empty fragments.
+
+def fragment_column(column: Union[List[Any], LazyColumn]) -> Union[List[bytes], LazyFragments]:
+    """
+    Encodes every value of a column once.
+
+    :param column: Column of (name, value) pairs, Missing values are None, see GenerationContext.column.
+    :return: List of fragments or LazyFragments for nested schemas.
+    """
+
+    if isinstance(column, LazyColumn):
+        prefix = b',' + encode(column.name) + b':'
+        head = [
+            b'' if isinstance(value, Missing) else prefix + encode(value)
+            for value in column.values.head
+        ]
+        return LazyFragments(prefix, head, column.values.datasets, column.values.skipped)
+
+    prefixes = {}
+    fragments = []
+    for cell in column:
+        if cell is None:
+            fragments.append(b'')
+            continue
+
+        name, value = cell
+        prefix = prefixes.get(name)
+        if prefix is None:
+            prefix = prefixes[name] = b',' + encode(name) + b':'
+        fragments.append(prefix + encode(value))
+
+    return fragments
+
+
+def compose(fragments: Iterable[bytes]) -> bytes:
+    """
+    Builds the JSON object of a dataset from the fragments of its values.
+
+    :param fragments: Fragment per field.
+    :return: UTF-8 bytes.
+    """
+
+    joined = b''.join(fragments)
+    return b'{' + joined[1:] + b'}' if joined else b'{}'
@@ -0,0 +1,307 @@
+import csv
+import gzip
+import io
+from collections import deque
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import date, time
+from functools import partial
+from itertools import islice
+from os import PathLike
+from time import perf_counter
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+from sgen.binary import pack_into
+from sgen.fragments import JSON_ENCODER
+from sgen.dto import WriteStats
+
+
+__all__ = ["write", "FORMATS", "COMPRESSIONS"]
+
+
+FORMATS = ('jsonl', 'csv', 'binary')
+"""Output formats: JSON lines, CSV with a header and a stream of MessagePack maps"""
+
+COMPRESSIONS = (None, 'gzip')
+
+Target = Union[str, PathLike, BinaryIO, io.TextIOBase]
+
+# Encoded chunk: number of datasets and their bytes
+Chunk = Tuple[int, bytes]
+
+
+def _encode_jsonl(datasets: Iterable[dict]) -> Chunk:
+    lines = list(map(JSON_ENCODER.encode, datasets))
+    if not lines:
+        return 0, b''
+    return len(lines), ('\n'.join(lines) + '\n').encode('utf-8', 'surrogatepass')
+
+
+def _join_lines(lines: List[bytes]) -> Chunk:
+    return len(lines), b'\n'.join(lines) + b'\n'
+
+
+def _encode_binary(datasets: Iterable[dict]) -> Chunk:
+    parts = []
+    count = 0
+    for dataset in datasets:
+        pack_into(dataset, parts)
+        count += 1
+    return count, b''.join(parts)
+
+
+def _csv_cell(value: Any) -> Any:
+    """Converts a value to a CSV cell: None is empty, booleans are lowercase, containers are JSON"""
+
+    if value is None:
+        return ''
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if isinstance(value, (str, int, float)):
+        return value
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, (dict, Sequence, set, frozenset)) and not isinstance(value, bytes):
+        return JSON_ENCODER.encode(value)
+    return str(value)
+
+
+def _encode_csv(fieldnames: List[str], datasets: Iterable[dict]) -> Chunk:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    known = frozenset(fieldnames)
+    count = 0
+
+    for dataset in datasets:
+        if not known.issuperset(dataset):
+            unknown = ', '.join(sorted(map(str, set(dataset) - known)))
+            raise ValueError(f"The fields {unknown} are not in the CSV header, pass fieldnames")
+        # Absent fields are written as empty cells, like None
+        writer.writerow([_csv_cell(dataset.get(name)) for name in fieldnames])
+        count += 1
+
+    return count, buffer.getvalue().encode('utf-8', 'surrogatepass')
+
+
+def _encode(format: str, fieldnames: Optional[List[str]], datasets: Iterable[dict]) -> Chunk:
+    """Encodes a chunk of datasets, module level so it can be sent to worker processes"""
+
+    if format == 'jsonl':
+        return _encode_jsonl(datasets)
+    if format == 'csv':
+        return _encode_csv(fieldnames, datasets)
+    return _encode_binary(datasets)
+
+
+def _pool_map(function: Callable[[List[dict]], Chunk], chunks: Iterator[List[dict]], workers: int) -> Iterator[Chunk]:
+    """Applies function to chunks in a process pool, keeping the order and a bounded number of chunks in flight"""
+
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            for chunk in chunks:
+                pending.append(executor.submit(function, chunk))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _chunks(datasets: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+    datasets = iter(datasets)
+    while True:
+        chunk = list(islice(datasets, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _fieldnames(chunk: List[dict]) -> List[str]:
+    """Returns the names of the fields of a chunk in the order of their first appearance"""
+
+    names = {}
+    for dataset in chunk:
+        names.update(dict.fromkeys(dataset))
+    return list(names)
+
+
+def _encoded(
+    datasets: Iterable[dict],
+    format: str,
+    fieldnames: Optional[List[str]],
+    workers: Optional[int],
+    chunk_size: int,
+) -> Tuple[Optional[List[str]], Iterator[Chunk]]:
+    """Returns the CSV header and the encoded chunks of the datasets"""
+
+    if workers is not None and hasattr(datasets, 'parallel_map'):
+        # Workers generate their chunks from the compiled data set, only bytes are sent back
+        if format == 'csv' and fieldnames is None:
+            fieldnames = datasets.names()
+        return fieldnames, datasets.parallel_map(
+            partial(_encode, format, fieldnames), workers=workers, chunk_size=chunk_size,
+        )
+
+    if format == 'jsonl' and workers is None and hasattr(datasets, 'iter_json'):
+        # Every field value is encoded once instead of once per dataset
+        return fieldnames, map(_join_lines, _chunks(datasets.iter_json(), chunk_size))
+
+    chunks = _chunks(datasets, chunk_size)
+    if format == 'csv' and fieldnames is None:
+        if hasattr(datasets, 'names'):
+            fieldnames = datasets.names()
+        else:
+            first = next(chunks, [])
+            fieldnames = _fieldnames(first)
+            chunks = _prepend(first, chunks)
+
+    function = partial(_encode, format, fieldnames)
+    if workers is None:
+        return fieldnames, map(function, chunks)
+    return fieldnames, _pool_map(function, chunks, workers)
+
+
+def _prepend(first: List[dict], chunks: Iterator[List[dict]]) -> Iterator[List[dict]]:
+    if first:
+        yield first
+    yield from chunks
+
+
+class _TextWriter:
+    """Writes the encoded chunks to a text file object that has no binary buffer"""
+
+    def __init__(self, target: io.TextIOBase):
+        self.target = target
+
+    def write(self, data: bytes) -> int:
+        return self.target.write(data.decode('utf-8', 'surrogatepass'))
+
+    def flush(self):
+        self.target.flush()
+
+
+@contextmanager
+def _open(target: Target, compress: Optional[str], compresslevel: int) -> Iterator[BinaryIO]:
+    """Opens a path or wraps a file object, file objects passed by the caller are not closed"""
+
+    if isinstance(target, (str, bytes, PathLike)):
+        if compress == 'gzip':
+            with gzip.open(target, 'wb', compresslevel=compresslevel) as fh:
+                yield fh
+        else:
+            with open(target, 'wb') as fh:
+                yield fh
+        return
+
+    if isinstance(target, io.TextIOBase) and not hasattr(target, 'buffer'):
+        # In-memory text such as io.StringIO, chunks hold whole rows, so they are decoded one by one
+        if compress is not None:
+            raise ValueError("Compressed output requires a binary file or a path")
+        yield _TextWriter(target)
+        return
+
+    if isinstance(target, io.TextIOBase):
+        # Text already written to the file must precede the bytes
+        target.flush()
+        fh = target.buffer
+    else:
+        fh = target
+    if compress == 'gzip':
+        with gzip.GzipFile(fileobj=fh, mode='wb', compresslevel=compresslevel) as compressed:
+            yield compressed
+    else:
+        yield fh
+    fh.flush()
+
+
+def write(
+    datasets: Iterable[dict],
+    target: Target,
+    format: str = 'jsonl',
+    compress: Optional[str] = None,
+    compresslevel: int = 6,
+    buffer_size: int = 1 << 20,
+    workers: Optional[int] = None,
+    chunk_size: int = 10_000,
+    fieldnames: Optional[List[str]] = None,
+) -> WriteStats:
+    """
+    Serializes datasets to a file.
+
+    Datasets are encoded in chunks and written in buffers of about buffer_size
+    bytes. date, datetime and time values are written as ISO 8601 strings.
+
+    jsonl writes a compact JSON object per line, sequences become arrays and
+    other unsupported values strings. csv writes a header and a row per dataset,
+    absent and None values are empty, dictionaries and lists are JSON. binary
+    writes a MessagePack map per dataset, see sgen.binary.
+
+    :param datasets: Datasets, for example schema.negative() or any iterable of dictionaries.
+    :param target: Path or a file object opened for writing, text files are written through their buffer,
+        in-memory text files such as io.StringIO get decoded text.
+    :param format: One of FORMATS.
+    :param compress: One of COMPRESSIONS.
+    :param compresslevel: gzip compression level from 0 to 9.
+    :param buffer_size: Number of bytes collected before a write.
+    :param workers: If passed, chunks are serialized in a pool of this many processes.
+        Datasets are generated by the workers too, other iterables are sent to them in chunks.
+    :param chunk_size: Number of datasets serialized at once.
+    :param fieldnames: CSV header, by default the names of the fields of the datasets.
+    :raises ValueError: If an argument is not valid, binary or compressed output goes to a text file
+        without a buffer or a CSV dataset has fields missing in the header.
+    :return: Number of datasets and bytes written and the time it took.
+    """
+
+    if format not in FORMATS:
+        raise ValueError(f"Unknown format {format!r}, expected one of {', '.join(FORMATS)}")
+    if format == 'binary' and isinstance(target, io.TextIOBase) and not hasattr(target, 'buffer'):
+        raise ValueError("The binary format requires a binary file or a path")
+    if compress not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression {compress!r}, expected one of {', '.join(map(str, COMPRESSIONS))}")
+    if chunk_size < 1:
+        raise ValueError("The chunk size must be greater than or equal to 1")
+    if workers is not None and workers < 1:
+        raise ValueError("The number of workers must be greater than or equal to 1")
+
+    started = perf_counter()
+    total_datasets = total_bytes = 0
+
+    with _open(target, compress, compresslevel) as fh:
+        fieldnames, chunks = _encoded(datasets, format, fieldnames, workers, chunk_size)
+
+        parts = []
+        buffered = 0
+        if format == 'csv':
+            parts.append(_csv_header(fieldnames))
+            buffered = len(parts[0])
+
+        for count, data in chunks:
+            total_datasets += count
+            parts.append(data)
+            buffered += len(data)
+            if buffered >= buffer_size:
+                fh.write(b''.join(parts))
+                total_bytes += buffered
+                parts, buffered = [], 0
+
+        if parts:
+            fh.write(b''.join(parts))
+            total_bytes += buffered
+
+    return WriteStats(datasets=total_datasets, bytes=total_bytes, seconds=perf_counter() - started)
+
+
+def _csv_header(fieldnames: List[str]) -> bytes:
+    if not fieldnames:
+        return b''
+
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerow(fieldnames)
+    return buffer.getvalue().encode('utf-8')
@@ -0,0 +1,114 @@
+from typing import Any, Iterator, List, Optional, Sequence
+
+from sgen.sequences import sequence_size
+
+
+__all__ = ["odometer", "decode", "prefix_cost"]
+
+
+def decode(index: int, sizes: Sequence[int]) -> List[int]:
+    """
+    Converts the index of a combination into positions of values in the columns.
+
+    The index is treated as a mixed-radix number whose last digit changes
+    fastest, as in odometer.
+
+    :param index: Index of the combination.
+    :param sizes: Number of values in each column.
+    :return: Position of the value in each column.
+    """
+
+    digits = [0] * len(sizes)
+
+    for position in range(len(sizes) - 1, -1, -1):
+        index, digits[position] = divmod(index, sizes[position])
+
+    if index:
+        raise IndexError("Combination index out of range")
+
+    return digits
+
+
+def odometer(columns: Sequence[Sequence[Any]], start: Optional[Sequence[int]] = None) -> Iterator[List[Any]]:
+    """
+    Iterates over the Cartesian product of columns without recursion.
+
+    The combinations are produced in the same order as itertools.product:
+    the last column changes fastest. Between two combinations only the
+    positions whose digits have changed are rewritten.
+
+    :note: The same list is yielded on every step and is updated in place,
+        copy it if it has to outlive the step.
+
+    :param columns: Sequences of values, one per position.
+    :param start: Positions of values of the first combination, see decode.
+    :return: Generator of combinations.
+    """
+
+    sizes = [sequence_size(column) for column in columns]
+
+    if not all(sizes):
+        return
+
+    digits = list(start) if start is not None else [0] * len(columns)
+    current = [column[digit] for column, digit in zip(columns, digits)]
+    last = len(columns) - 1
+
+    while True:
+        yield current
+
+        position = last
+        while position >= 0:
+            digit = digits[position] + 1
+            if digit < sizes[position]:
+                digits[position] = digit
+                current[position] = columns[position][digit]
+                break
+
+            digits[position] = 0
+            current[position] = columns[position][0]
+            position -= 1
+        else:
+            return
+
+
+def prefix_cost(index: int, sizes: Sequence[int], cumulative: Sequence[Sequence[int]]) -> int:
+    """
+    Returns the total cost of the first index combinations of the Cartesian product.
+
+    The cost of a combination is the sum of the costs of its values. The
+    result is computed from the digits of the index, so the combinations are
+    not enumerated.
+
+    :param index: Number of combinations, from 0 to the size of the product.
+    :param sizes: Number of values in each column.
+    :param cumulative: Cumulative costs of each column, cumulative[i][v] is
+        the total cost of the first v values of column i.
+    :return: Total cost.
+    """
+
+    # suffix_count[p] and suffix_cost[p] describe the product of columns p, p+1, ...
+    suffix_count = [1] * (len(sizes) + 1)
+    suffix_cost = [0] * (len(sizes) + 1)
+    for position in range(len(sizes) - 1, -1, -1):
+        suffix_count[position] = suffix_count[position + 1] * sizes[position]
+        suffix_cost[position] = (
+            suffix_cost[position + 1] * sizes[position]
+            + cumulative[position][-1] * suffix_count[position + 1]
+        )
+
+    if index >= suffix_count[0]:
+        return suffix_cost[0]
+
+    total = 0
+    fixed = 0  # Cost of the values of the columns to the left of position
+    for position, digit in enumerate(decode(index, sizes)):
+        rest_count = suffix_count[position + 1]
+        total += (
+            digit * rest_count * fixed
+            + cumulative[position][digit] * rest_count
+            + digit * suffix_cost[position + 1]
+        )
+        fixed += cumulative[position][digit + 1] - cumulative[position][digit]
+
+    return total
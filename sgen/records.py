@@ -0,0 +1,163 @@
+import random
+from datetime import datetime
+from typing import Any, Callable, List, Tuple, Union
+
+from sgen import batch, codegen, rng
+from sgen.codegen import MISSING
+from sgen.fields import Collection, Field, Nested
+from sgen.utils import Missing
+from sgen.validate import Length
+
+
+__all__ = ["RecordGenerator"]
+
+
+ColumnFunction = Callable[[int], List[Any]]
+
+
+class RecordGenerator:
+    """
+    Generates random positive records of a schema column by column
+
+    Unlike positive(), values are drawn from the valid domain of every field
+    (Range, Length, OneOf and so on, see Field.generate_batch) instead of the
+    boundary values, so any number of records can be generated.
+
+    :note: Fields without batch support draw from their positive values,
+        fields with positive_data_from draw from its values.
+    """
+
+    def __init__(
+        self,
+        schema: Any,
+        seed: Any = None,
+        clock: Union[datetime, Callable[[], datetime], None] = None,
+    ):
+        """
+        :param schema: SGen instance.
+        :param seed: Seed of the generation, every field gets a generator seeded with
+            a seed derived from it and the field name, see sgen.rng.
+        :param clock: Current time or a function returning it, called once.
+        """
+
+        if clock is None:
+            clock = datetime.now()
+        elif callable(clock):
+            clock = clock()
+
+        self.seed = seed
+        self.clock = clock
+
+        fields = schema.fields(is_positive=True)
+        self.names: Tuple[str, ...] = tuple(field.attr_name for field in fields)
+        self._columns: List[ColumnFunction] = []
+        missing = []
+
+        for field in fields:
+            column, can_be_missing = self._column(field.field, field.attr_name)
+            self._columns.append(column)
+            missing.append(can_be_missing)
+
+        self._row = codegen.row_function(self.names, tuple(missing))
+
+    def _state(self, name: str) -> rng.RandomState:
+        if self.seed is None:
+            return rng.RandomState(random, self.clock)
+
+        seed = rng.derive_seed(self.seed, name, 'records')
+        return rng.RandomState(random.Random(seed), self.clock, seed)
+
+    def _column(self, field: Field, name: str, allow_missing: bool = True) -> Tuple[ColumnFunction, bool]:
+        """
+        Returns a function generating n values of the field and whether they can be MISSING.
+
+        :param field: Field of the schema or data type of a collection.
+        :param name: Path of the field, seeds are derived from it.
+        :param allow_missing: False if Missing values must not be drawn.
+        :return: Column function, True if the column can contain MISSING.
+        """
+
+        state = self._state(name)
+
+        if field.positive_data_from is not None:
+            generate, can_be_missing = self._population(list(field.positive_data_from()), name, allow_missing)
+        elif isinstance(field, Nested) and not field.validators:
+            generate, can_be_missing = RecordGenerator(field.data_type, state.seed, self.clock).rows, False
+        elif isinstance(field, Collection) and all(isinstance(validator, Length) for validator in field.validators):
+            generate, can_be_missing = self._collection(field, name, state.seed), False
+        elif field.supports_batch():
+            generate, can_be_missing = field.generate_batch, False
+        else:
+            with rng.use(state):
+                values = [value for value in field.positive() if value is not None]
+            generate, can_be_missing = self._population(values, name, allow_missing)
+
+        def column(n: int) -> List[Any]:
+            with rng.use(state):
+                return generate(n)
+
+        return column, can_be_missing
+
+    def _population(self, values: List[Any], name: str, allow_missing: bool) -> Tuple[ColumnFunction, bool]:
+        """Returns a function choosing n values from values, Missing values become MISSING"""
+
+        population = [
+            MISSING if isinstance(value, Missing) else value
+            for value in values
+            if allow_missing or not isinstance(value, Missing)
+        ]
+        if not population:
+            raise ValueError(f"The field {name} has no positive values to draw from")
+
+        def generate(n: int) -> List[Any]:
+            return rng.get_random().choices(population, k=n)
+
+        return generate, MISSING in population
+
+    def _collection(self, field: Collection, name: str, seed: Any) -> ColumnFunction:
+        """Returns a function generating n lists whose lengths satisfy the Length validator"""
+
+        low, high = 1, 5
+        for validator in field.validators:
+            low = validator.min or 0
+            high = validator.max if validator.max is not None else low + 5
+
+        if isinstance(field.data_type, Field):
+            inner, _ = self._column(field.data_type, f'{name}[]', allow_missing=False)
+        else:
+            inner = RecordGenerator(field.data_type, seed, self.clock).rows
+
+        def generate(n: int) -> List[List[Any]]:
+            lengths = batch.integers(low, high, n)
+            items = inner(sum(lengths))
+
+            values = []
+            start = 0
+            for length in lengths:
+                values.append(items[start:start + length])
+                start += length
+            return values
+
+        return generate
+
+    def columns(self, n: int) -> List[List[Any]]:
+        """
+        Generates n values of every field.
+
+        :param n: Number of values.
+        :return: Column per field in the order of names, Missing values are codegen.MISSING.
+        """
+
+        return [column(n) for column in self._columns]
+
+    def rows(self, n: int) -> List[dict]:
+        """
+        Generates n records.
+
+        :param n: Number of records.
+        :return: List of dictionaries.
+        """
+
+        if not self._columns:
+            return [{} for _ in range(n)]
+        return list(map(self._row, *self.columns(n)))
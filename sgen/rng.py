@@ -0,0 +1,89 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime
+from hashlib import blake2b
+from typing import Any, Iterator, Optional
+
+
+__all__ = ["RandomState", "current", "get_random", "now", "today", "use", "derive_seed"]
+
+
+class RandomState:
+    """
+    Random number generator and clock used by fields while their values are generated
+
+    :note: Fields do not keep generators, they take them from the current
+        state, so one schema can be generated concurrently with different seeds.
+    """
+
+    def __init__(self, rng: Any, clock: datetime, seed: Optional[int] = None):
+        """
+        :param rng: random.Random instance or the module random if the generation is not seeded.
+        :param clock: Frozen current time.
+        :param seed: Seed of rng, nested schemas derive their seeds from it.
+        """
+
+        self.random = rng
+        self.clock = clock
+        self.seed = seed
+        self.text = None  # RandomText bound to rng, created by sgen.text on first use
+
+    def __repr__(self):
+        return f"<RandomState seed={self.seed} clock={self.clock.isoformat()}>"
+
+
+_current: ContextVar[Optional[RandomState]] = ContextVar('sgen_random_state', default=None)
+
+
+def current() -> Optional[RandomState]:
+    """Returns the current random state or None outside of generation"""
+
+    return _current.get()
+
+
+def get_random() -> Any:
+    """Returns the current random number generator, the module random outside of generation"""
+
+    state = _current.get()
+    return random if state is None else state.random
+
+
+def now() -> datetime:
+    """Returns the frozen time of the current generation or the current time outside of it"""
+
+    state = _current.get()
+    return datetime.now() if state is None else state.clock
+
+
+def today() -> date:
+    """Returns the date of now()"""
+
+    return now().date()
+
+
+@contextmanager
+def use(state: RandomState) -> Iterator[RandomState]:
+    """Makes the random state current"""
+
+    token = _current.set(state)
+    try:
+        yield state
+    finally:
+        _current.reset(token)
+
+
+def derive_seed(seed: Any, *parts: Any) -> int:
+    """
+    Derives an independent seed from a seed and a path, for example the name of a field.
+
+    :note: The result does not depend on hash randomization, so it is the
+        same in every process.
+
+    :param seed: Parent seed.
+    :param parts: Path components, their repr is hashed.
+    :return: 64-bit seed.
+    """
+
+    digest = blake2b(repr((seed,) + parts).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
@@ -0,0 +1,319 @@
+from collections.abc import Sequence
+from itertools import repeat
+from operator import index as as_index
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+from sgen.utils import Missing, estimate_cost, structural_hash
+
+
+__all__ = [
+    "LazyValues", "LazyColumn", "LazyFragments", "RepeatedSequence", "ChainedSequence", "sequence_size",
+    "LAZY_LENGTH", "MEMORY_LIMIT",
+]
+
+
+# Collections longer than this are built as RepeatedSequence instead of lists
+LAZY_LENGTH = 10_000
+
+# Maximum number of items or characters of a value built in memory by Length
+MEMORY_LIMIT = 64 * 1024 * 1024
+
+
+def _normalize(index: int, length: int) -> int:
+    index = as_index(index)
+    if index < 0:
+        index += length
+    if not 0 <= index < length:
+        raise IndexError("Sequence index out of range")
+    return index
+
+
+def sequence_size(sequence) -> int:
+    """
+    Returns the number of items of a list or a lazy sequence.
+
+    :note: Unlike len(), the result is not limited by sys.maxsize.
+    """
+
+    if isinstance(sequence, (LazyValues, LazyColumn, LazyFragments, ChainedSequence)):
+        return sequence.count()
+    return len(sequence)
+
+
+def _nested_index(index: int, skipped: Sequence[int]) -> int:
+    """Converts the position of a value among the nested datasets that are not skipped into a dataset index"""
+
+    for skipped_index in skipped:
+        if skipped_index > index:
+            break
+        index += 1
+    return index
+
+
+def _without_skipped(datasets: Iterable[Any], skipped: Sequence[int]) -> Iterator[Any]:
+    if not skipped:
+        return iter(datasets)
+    skipped = frozenset(skipped)
+    return (dataset for index, dataset in enumerate(datasets) if index not in skipped)
+
+
+class LazyValues:
+    """
+    Represents values of a Nested field: special values followed by the datasets of the nested schema
+
+    :note: Datasets are built on access by index or while iterating, so only
+        the field values of the nested schema are kept in memory, not its product.
+        Datasets equal to a special value, such as the default, are skipped.
+    """
+
+    def __init__(self, head: List[Any], datasets, skipped: Sequence[int] = ()):
+        """
+        :param head: None, default and Missing values of the field.
+        :param datasets: Datasets of the nested schema.
+        :param skipped: Sorted indexes of the datasets equal to a value of the head.
+        """
+
+        self.head = head
+        self.datasets = datasets
+        self.skipped = skipped
+
+    def count(self) -> int:
+        """Returns the number of values, see Datasets.count"""
+
+        return len(self.head) + self.datasets.count() - len(self.skipped)
+
+    def __len__(self) -> int:
+        return len(self.head) + len(self.datasets) - len(self.skipped)
+
+    def __getitem__(self, index: int) -> Any:
+        index = _normalize(index, self.count())
+        if index < len(self.head):
+            return self.head[index]
+        return self.datasets[_nested_index(index - len(self.head), self.skipped)]
+
+    def __iter__(self) -> Iterator[Any]:
+        yield from self.head
+        yield from _without_skipped(self.datasets, self.skipped)
+
+    def cost(self, stop: int) -> int:
+        """Returns the estimated cost of the first stop values, see Datasets.cost"""
+
+        head = sum(
+            estimate_cost(value)
+            for value in self.head[:stop]
+            if not isinstance(value, Missing)
+        )
+        nested = max(stop - len(self.head), 0)
+        return head + self.datasets.cost(_nested_index(nested - 1, self.skipped) + 1 if nested else 0)
+
+    def compile(self) -> 'LazyValues':
+        """Returns the values with compiled nested datasets, see Datasets.compile"""
+
+        return LazyValues(head=self.head, datasets=self.datasets.compile(), skipped=self.skipped)
+
+    def __repr__(self):
+        return f"<LazyValues head={self.head!r} datasets={self.datasets!r}>"
+
+
+class LazyColumn:
+    """
+    Represents lazy field values as (name, value) pairs, Missing values are None
+
+    :note: The lazy counterpart of GenerationContext.column.
+    """
+
+    def __init__(self, name: str, values: LazyValues):
+        self.name = name
+        self.values = values
+
+    def _cell(self, value: Any) -> Optional[Tuple[str, Any]]:
+        return None if isinstance(value, Missing) else (self.name, value)
+
+    def count(self) -> int:
+        return self.values.count()
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, index: int) -> Optional[Tuple[str, Any]]:
+        return self._cell(self.values[index])
+
+    def __iter__(self) -> Iterator[Optional[Tuple[str, Any]]]:
+        return map(self._cell, self.values)
+
+    def cumulative_costs(self) -> 'PrefixCosts':
+        """Returns the cumulative costs of the values, see Datasets._cumulative_cost"""
+
+        return PrefixCosts(self.values)
+
+    def compile(self) -> 'LazyColumn':
+        return LazyColumn(name=self.name, values=self.values.compile())
+
+    def __repr__(self):
+        return f"<LazyColumn {self.name}>"
+
+
+class LazyFragments:
+    """
+    Represents lazy field values as JSON fragments, Missing values are empty
+
+    :note: The lazy counterpart of a fragment column, see sgen.fragments.
+        Fragments of the nested datasets are composed on access.
+    """
+
+    def __init__(self, prefix: bytes, head: List[bytes], datasets, skipped: Sequence[int] = ()):
+        """
+        :param prefix: Fragment of the key: a comma, the encoded name and a colon.
+        :param head: Fragments of the special values.
+        :param datasets: Datasets of the nested schema.
+        :param skipped: Indexes of the skipped datasets, see LazyValues.
+        """
+
+        self.prefix = prefix
+        self.head = head
+        self.datasets = datasets
+        self.skipped = skipped
+
+    def count(self) -> int:
+        return len(self.head) + self.datasets.count() - len(self.skipped)
+
+    def __len__(self) -> int:
+        return len(self.head) + len(self.datasets) - len(self.skipped)
+
+    def __getitem__(self, index: int) -> bytes:
+        index = _normalize(index, self.count())
+        if index < len(self.head):
+            return self.head[index]
+        return self.prefix + self.datasets.json_at(_nested_index(index - len(self.head), self.skipped))
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self.head
+        prefix = self.prefix
+        for dataset in _without_skipped(self.datasets.iter_json(), self.skipped):
+            yield prefix + dataset
+
+    def __repr__(self):
+        return f"<LazyFragments {self.prefix!r}>"
+
+
+class PrefixCosts:
+    """Cumulative costs of lazy values: item v is the total cost of the first v values, -1 is the total"""
+
+    def __init__(self, values: LazyValues):
+        self.values = values
+
+    def __getitem__(self, stop: int) -> int:
+        if stop < 0:
+            stop += self.values.count() + 1
+        return self.values.cost(stop)
+
+
+class RepeatedSequence(Sequence):
+    """
+    Represents a list of length copies of the same value without storing them
+
+    :note: Compares equal to the list it represents. The list is built only
+        by materialize(), iteration streams the value.
+    """
+
+    def __init__(self, value: Any, length: int, memory_limit: Optional[int] = None):
+        """
+        :param value: Repeated value.
+        :param length: Number of copies.
+        :param memory_limit: Maximum length of the materialized list, MEMORY_LIMIT if None.
+        """
+
+        if length < 0:
+            raise ValueError("The length cannot be negative")
+
+        self.value = value
+        self.length = length
+        self.memory_limit = memory_limit
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RepeatedSequence(self.value, len(range(*index.indices(self.length))), self.memory_limit)
+        _normalize(index, self.length)
+        return self.value
+
+    def __iter__(self) -> Iterator[Any]:
+        return repeat(self.value, self.length)
+
+    def __contains__(self, item) -> bool:
+        return bool(self.length) and self.value == item
+
+    def __mul__(self, times: int) -> 'RepeatedSequence':
+        return RepeatedSequence(self.value, self.length * max(times, 0), self.memory_limit)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, RepeatedSequence):
+            return self.length == other.length and (not self.length or self.value == other.value)
+        if isinstance(other, (list, tuple)):
+            return len(other) == self.length and all(item == self.value for item in other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((RepeatedSequence, self.length, structural_hash(self.value)))
+
+    def materialize(self) -> List[Any]:
+        """
+        Returns the list represented by the sequence.
+
+        :raises ValueError: If the length exceeds the memory limit.
+        :return: List of values.
+        """
+
+        limit = MEMORY_LIMIT if self.memory_limit is None else self.memory_limit
+        if self.length > limit:
+            raise ValueError(f"The length {self.length} exceeds the memory limit {limit}")
+        return [self.value] * self.length
+
+    def __repr__(self):
+        return f"<RepeatedSequence {self.value!r} x {self.length}>"
+
+
+class ChainedSequence:
+    """
+    Represents a list followed by a lazy sequence, such as a range or a RepeatedSequence
+
+    :note: Items of the tail are taken by index, so the number of items may
+        exceed sys.maxsize, like the values of a Nested field.
+    """
+
+    def __init__(self, head: List[Any], tail: Sequence, tail_size: int):
+        """
+        :param head: Stored items.
+        :param tail: Items after the head.
+        :param tail_size: Number of items of the tail, len() of a huge range fails.
+        """
+
+        self.head = head
+        self.tail = tail
+        self.tail_size = tail_size
+
+    def count(self) -> int:
+        """Returns the number of items"""
+
+        return len(self.head) + self.tail_size
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __getitem__(self, index: int) -> Any:
+        index = _normalize(index, self.count())
+        if index < len(self.head):
+            return self.head[index]
+        return self.tail[index - len(self.head)]
+
+    def __iter__(self) -> Iterator[Any]:
+        yield from self.head
+        yield from self.tail
+
+    def __contains__(self, item) -> bool:
+        return item in self.head or (bool(self.tail_size) and item in self.tail)
+
+    def __repr__(self):
+        return f"<ChainedSequence head={self.head!r} tail={self.tail!r}>"
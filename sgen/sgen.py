@@ -1,17 +1,121 @@
+from datetime import datetime
 from inspect import getmembers
-from typing import List
+from os import PathLike
+from typing import Any, Callable, Iterator, List, Optional, Union
 
+from sgen.cache import DatasetCache
+from sgen.context import GenerationContext, ONE_FAULT, PRODUCT
+from sgen.covering import CoveringSuite
+from sgen.datasets import Datasets
 from sgen.fields import Field
-from sgen.dto import SchemaField
-from sgen.utils import Missing
+from sgen.columns import column_chunks, layout
+from sgen.dto import ColumnChunk, SchemaField, SchemaPlan
+from sgen.fingerprint import fingerprint, parse_dataset_id
+from sgen.records import RecordGenerator
 
 
 __all__ = ["SGen"]
 
 
+def _is_field(value: Any) -> bool:
+    return isinstance(value, Field)
+
+
+def _compile_plan(owner: Any) -> SchemaPlan:
+    """
+    Collects the fields of a schema class or instance into a plan.
+
+    :param owner: Schema class or instance.
+    :return: SchemaPlan.
+    """
+
+    members = getmembers(owner, _is_field)
+
+    return SchemaPlan(
+        positive=tuple(
+            SchemaField(attr_name=name, data_generator=field.positive, field=field, is_positive=True)
+            for name, field in members
+        ),
+        negative=tuple(
+            SchemaField(attr_name=name, data_generator=field.negative, field=field, is_positive=False)
+            for name, field in members
+        ),
+        kinds=tuple((name, type(field)) for name, field in members),
+    )
+
+
+def _field_snapshot(cls: type) -> tuple:
+    """
+    Returns the names and ids of the fields defined in the class and its bases.
+
+    The snapshot is compared with the one stored with the compiled plan, so fields
+    assigned to or deleted from a class after its creation are noticed without a metaclass.
+
+    :param cls: Schema class.
+    :return: Tuple of (name, id of the field) pairs.
+    """
+
+    return tuple(
+        (name, id(value))
+        for klass in cls.__mro__
+        for name, value in vars(klass).items()
+        if _is_field(value)
+    )
+
+
 class SGen:
     """Class for generating test data structures."""
 
+    _plan: Optional[SchemaPlan] = None
+    _plan_fields: tuple = ()  # _field_snapshot of the class the plan is compiled from
+    _fingerprint: Optional[str] = None
+    _codegen: bool = False
+
+    def __init_subclass__(cls, **kwargs):
+        """Compiles the schema fields once per class, so instances do not inspect themselves on every call"""
+
+        super().__init_subclass__(**kwargs)
+        cls._plan = _compile_plan(cls)
+        cls._plan_fields = _field_snapshot(cls)
+        cls._fingerprint = None  # Computed on first use
+
+    def compile(self) -> 'SGen':
+        """
+        Enables generated iteration functions for the data sets of the schema.
+
+        For every Cartesian product a generator function with an unrolled
+        loop per field and literal dictionary keys is generated with exec and
+        cached by the shape of the product, see sgen.codegen.
+
+        :return: The schema itself.
+        """
+
+        self._codegen = True
+        return self
+
+    def _get_plan(self) -> SchemaPlan:
+        """
+        Returns the compiled fields of the schema.
+
+        :note: Fields assigned to an instance are not a part of the class plan,
+            in this case the plan is compiled for the instance. Fields assigned to
+            the class or its bases after its creation drop the class plan and
+            fingerprint, the plan is compiled again.
+        """
+
+        if any(map(_is_field, vars(self).values())):
+            return _compile_plan(self)
+
+        owner = type(self)
+        plan = owner._plan
+        snapshot = _field_snapshot(owner)
+        if plan is None or owner._plan_fields != snapshot:
+            plan = _compile_plan(owner)
+            owner._plan = plan
+            owner._plan_fields = snapshot
+            owner._fingerprint = None
+        return plan
+
     def fields(self, is_positive: bool) -> List[SchemaField]:
         """
         Returns a list of schema fields and data generators for them.
@@ -20,66 +124,436 @@ class SGen:
         :return: List of SchemaField.
         """
 
-        method = 'positive' if is_positive else 'negative'
+        plan = self._get_plan()
+        return list(plan.positive if is_positive else plan.negative)
 
-        schema_fields = getmembers(
-            self,
-            lambda field: isinstance(field, Field)
-        )
+    def _blocks(self, is_positive: bool) -> List[List[SchemaField]]:
+        """
+        Returns the fields of every Cartesian product of the data set.
+
+        A positive data set is a single product of positive fields, a negative
+        data set has a product per negative field, combined with the positive
+        values of the other fields.
+
+        :param is_positive: True if the positive data set is needed.
+        :return: List of products.
+        """
+
+        positive_generators = self.fields(is_positive=True)
+        if is_positive:
+            return [positive_generators]
 
-        return [
-            SchemaField(attr_name=field[0], data_generator=getattr(field[1], method))
-            for field in schema_fields
-        ]
+        blocks = []
+        for n_gen in self.fields(is_positive=False):
+            fields = [n_gen]
+            for p_gen in positive_generators:
+                if p_gen.attr_name == n_gen.attr_name:
+                    continue
+                fields.append(p_gen)
+            blocks.append(fields)
+
+        return blocks
 
-    def _generate(self, fields: List[SchemaField]):
+    def _covering(
+        self,
+        is_positive: bool,
+        strength: int,
+        seed: Any = None,
+        clock: Union[datetime, Callable[[], datetime], None] = None,
+    ) -> CoveringSuite:
         """
-        Generates a Cartesian product of field values.
+        Returns a data set in which every combination of values of any strength fields is present.
 
-        :param fields: List of fields.
-        :return: Generator.
+        :param is_positive: True if the positive data set is needed.
+        :param strength: Number of fields whose value combinations must be covered.
+        :param seed: Seed of the generation, see positive.
+        :param clock: Current time, see positive.
+        :return: CoveringSuite.
         """
 
-        if len(fields) == 1:
-            for value in fields[0].data_generator():
-                yield [(fields[0].attr_name, value)]
-        else:
-            for value in fields[0].data_generator():
-                for rest in self._generate(fields=fields[1:]):
-                    yield [(fields[0].attr_name, value)] + rest
+        context = GenerationContext(seed=seed, clock=clock)
+
+        return CoveringSuite(
+            blocks=[
+                [context.column(field) for field in fields]
+                for fields in self._blocks(is_positive=is_positive)
+            ],
+            strength=strength,
+        )
 
-    def positive(self):
+    def _datasets(
+        self,
+        is_positive: bool,
+        strength: Optional[int] = None,
+        shard: Optional[int] = None,
+        num_shards: Optional[int] = None,
+        workers: Optional[int] = None,
+        ordered: bool = True,
+        mode: Optional[str] = None,
+        seed: Any = None,
+        clock: Union[datetime, Callable[[], datetime], None] = None,
+        cache_dir: Union[str, PathLike, DatasetCache, None] = None,
+    ) -> Union[Datasets, CoveringSuite, Iterator[dict]]:
+        """
+        Returns a positive or negative data set according to the generation parameters.
+
+        :param is_positive: True if the positive data set is needed.
+        :param strength: Strength of covering arrays, see positive.
+        :param shard: Index of the shard, see positive.
+        :param num_shards: Number of shards, see positive.
+        :param workers: Number of worker processes, see positive.
+        :param ordered: Merge order of parallel generation, see positive.
+        :param mode: Negative generation mode, see negative.
+        :param seed: Seed of the generation, see positive.
+        :param clock: Current time, see positive.
+        :param cache_dir: Cache directory, see positive.
+        :return: Iterable of dictionaries.
+        """
+
+        if (shard is None) != (num_shards is None):
+            raise ValueError("The shard and num_shards parameters must be passed together")
+
+        if strength is not None:
+            if shard is not None or workers is not None or mode is not None or cache_dir is not None:
+                raise ValueError(
+                    "The strength and shard/workers/mode/cache_dir parameters cannot be passed simultaneously"
+                )
+            return self._covering(is_positive=is_positive, strength=strength, seed=seed, clock=clock)
+
+        # In a negative data set positive values are shared by all negative fields
+        context = GenerationContext(mode=mode, seed=seed, clock=clock)
+        datasets = Datasets(
+            blocks=self._blocks(is_positive=is_positive),
+            context=context,
+            codegen=self._codegen,
+            mode=PRODUCT if is_positive else context.mode,
+            fingerprint=self.fingerprint(),
+            is_positive=is_positive,
+        )
+
+        if cache_dir is not None:
+            cache = cache_dir if isinstance(cache_dir, DatasetCache) else DatasetCache(cache_dir)
+            datasets = cache.compiled(self, datasets, frozen_clock=clock is not None)
+
+        if workers is not None:
+            start, stop = (0, None) if shard is None else datasets.shard_bounds(shard, num_shards)
+            return datasets.parallel(workers=workers, ordered=ordered, start=start, stop=stop)
+
+        if shard is not None:
+            return datasets.shard(shard=shard, num_shards=num_shards)
+
+        return datasets
+
+    def positive(
+        self,
+        strength: Optional[int] = None,
+        shard: Optional[int] = None,
+        num_shards: Optional[int] = None,
+        workers: Optional[int] = None,
+        ordered: bool = True,
+        seed: Any = None,
+        clock: Union[datetime, Callable[[], datetime], None] = None,
+        cache_dir: Union[str, PathLike, DatasetCache, None] = None,
+    ) -> Union[Datasets, CoveringSuite, Iterator[dict]]:
         """
         Generates a set of positive test data.
 
-        :return: Dictionary generator.
+        :param strength: If passed, a covering array of this strength is generated
+            instead of the full Cartesian product, 1 means that each value is used at least once.
+        :param shard: If passed, only datasets of this shard are generated, from 0 to num_shards - 1.
+            Shards are disjoint, balanced by estimated cost and together give the whole data set.
+        :param num_shards: Number of shards.
+        :param workers: If passed, datasets are generated in a pool of this many processes.
+        :param ordered: True if parallel datasets must be returned in the serial order,
+            otherwise they are returned as they are completed.
+        :param seed: If passed, the values are generated with private random number generators
+            derived from this seed per field, so the data set is the same on every call,
+            in every process and with any number of workers.
+        :param clock: Current time used by DateTime and Date, or a function returning it.
+            It is taken once per call, datetime.now() if not passed.
+        :param cache_dir: If passed, the field values are read from this directory or a DatasetCache
+            instead of being generated, and stored there on the first call, see sgen.cache.
+            Requires a seed. If clock is not passed, cached values keep the time of the first call.
+        :return: Iterable of dictionaries.
         """
 
-        for dataset in self._generate(fields=self.fields(is_positive=True)):
-            yield dict(filter(
-                lambda field_value: not isinstance(field_value[1], Missing),
-                dataset
-            ))
+        return self._datasets(
+            is_positive=True,
+            strength=strength,
+            shard=shard,
+            num_shards=num_shards,
+            workers=workers,
+            ordered=ordered,
+            seed=seed,
+            clock=clock,
+            cache_dir=cache_dir,
+        )
 
-    def negative(self):
+    def negative(
+        self,
+        strength: Optional[int] = None,
+        shard: Optional[int] = None,
+        num_shards: Optional[int] = None,
+        workers: Optional[int] = None,
+        ordered: bool = True,
+        mode: Optional[str] = None,
+        seed: Any = None,
+        clock: Union[datetime, Callable[[], datetime], None] = None,
+        cache_dir: Union[str, PathLike, DatasetCache, None] = None,
+    ) -> Union[Datasets, CoveringSuite, Iterator[dict]]:
         """
         Generates a set of negative test data.
 
+        :param strength: If passed, a covering array of this strength is generated
+            for every negative field instead of the full Cartesian product.
+        :param shard: If passed, only datasets of this shard are generated, from 0 to num_shards - 1.
+        :param num_shards: Number of shards.
+        :param workers: If passed, datasets are generated in a pool of this many processes.
+        :param ordered: True if parallel datasets must be returned in the serial order.
+        :param mode: "product" (default) combines every negative value with the Cartesian product
+            of the positive values of the other fields, "one_fault" places every negative value
+            into one baseline positive dataset, so the size is linear in the number of negative values.
+            Nested schemas follow the mode of the outer schema.
+        :param seed: Seed of the generation, see positive. Positive values of the other
+            fields are the same as in positive with the same seed.
+        :param clock: Current time, see positive.
+        :param cache_dir: Cache directory, see positive.
+        :return: Iterable of dictionaries.
+        """
+
+        return self._datasets(
+            is_positive=False,
+            strength=strength,
+            shard=shard,
+            num_shards=num_shards,
+            workers=workers,
+            ordered=ordered,
+            mode=mode,
+            seed=seed,
+            clock=clock,
+            cache_dir=cache_dir,
+        )
+
+    def positive_json(
+        self,
+        seed: Any = None,
+        clock: Union[datetime, Callable[[], datetime], None] = None,
+    ) -> Iterator[bytes]:
+        """
+        Generates a set of positive test data as compact JSON objects.
+
+        Every field value is encoded once, a dataset is a concatenation of the
+        encoded "key":value fragments of its values, so it is much faster than
+        json.dumps per dataset. Missing values are skipped, date and datetime
+        values are ISO 8601 strings, see sgen.fragments.
+
+        :param seed: Seed of the generation, see positive.
+        :param clock: Current time, see positive.
+        :return: Generator of UTF-8 bytes.
+        """
+
+        return self.positive(seed=seed, clock=clock).iter_json()
+
+    def negative_json(
+        self,
+        mode: Optional[str] = None,
+        seed: Any = None,
+        clock: Union[datetime, Callable[[], datetime], None] = None,
+    ) -> Iterator[bytes]:
+        """
+        Generates a set of negative test data as compact JSON objects, see positive_json.
+
+        :param mode: Negative generation mode, see negative.
+        :param seed: Seed of the generation, see positive.
+        :param clock: Current time, see positive.
+        :return: Generator of UTF-8 bytes.
+        """
+
+        return self.negative(mode=mode, seed=seed, clock=clock).iter_json()
+
+    def positive_columns(
+        self,
+        chunk_size: int = 10_000,
+        arrays: Optional[str] = None,
+        seed: Any = None,
+        clock: Union[datetime, Callable[[], datetime], None] = None,
+    ) -> Iterator[ColumnChunk]:
+        """
+        Generates the positive data set in columnar chunks instead of dictionaries.
+
+        Every chunk maps dotted field names to lists of values, fields of nested
+        schemas are flattened into "nested.field" columns. Missing values are
+        marked in the presence masks and None values in the validity masks,
+        absent values are None in the columns.
+
+        :param chunk_size: Maximum number of datasets in a chunk.
+        :param arrays: None for lists, "array" for array.array or "numpy" for NumPy arrays
+            of Integer, Float and Boolean columns and of the masks. Masked values are 0.
+        :param seed: Seed of the generation, see positive.
+        :param clock: Current time, see positive.
+        :return: Generator of ColumnChunk.
+        """
+
+        return column_chunks(
+            self.positive(seed=seed, clock=clock),
+            layout(self),
+            chunk_size=chunk_size,
+            arrays=arrays,
+        )
+
+    def records(
+        self,
+        n: int,
+        chunk_size: int = 10_000,
+        seed: Any = None,
+        clock: Union[datetime, Callable[[], datetime], None] = None,
+    ) -> Iterator[dict]:
+        """
+        Generates n random positive records for load tests and fixtures.
+
+        Values are drawn from the valid domain of every field (Range, Length,
+        OneOf and so on) instead of the boundary values, column by column in
+        chunks, see sgen.records.
+
+        :param n: Number of records.
+        :param chunk_size: Number of records generated at once.
+        :param seed: Seed of the generation, see positive.
+        :param clock: Current time, see positive.
+        :return: Dictionary generator.
+        """
+
+        if n < 0:
+            raise ValueError("The number of records cannot be negative")
+        if chunk_size < 1:
+            raise ValueError("The chunk size must be greater than or equal to 1")
+
+        generator = RecordGenerator(self, seed=seed, clock=clock)
+        for start in range(0, n, chunk_size):
+            yield from generator.rows(min(chunk_size, n - start))
+
+    def fingerprint(self) -> str:
+        """
+        Returns a short hash of the schema definition: field names, types, settings and validators.
+
+        The fingerprint is the same in every process and changes when a field definition changes.
+
+        :return: 12 hexadecimal digits.
+        """
+
+        if any(map(_is_field, vars(self).values())):
+            return fingerprint(self)
+
+        self._get_plan()  # Drops the fingerprint if the class fields were changed
+        owner = type(self)
+        if owner._fingerprint is None:
+            owner._fingerprint = fingerprint(self)
+        return owner._fingerprint
+
+    def replay(self, dataset_id: str, clock: Union[datetime, Callable[[], datetime], None] = None) -> dict:
+        """
+        Rebuilds the dataset with the id returned by Datasets.dataset_id.
+
+        Only the values of the fields are generated, the dataset is taken by its index.
+
+        :param dataset_id: Id in the form <fingerprint>:<seed>:<kind><index>.
+        :param clock: Current time of the original generation, needed if the schema has
+            DateTime or Date fields without data_from.
+        :raises ValueError: If the id is malformed or belongs to another schema definition.
+        :return: Dictionary.
+        """
+
+        schema_fingerprint, seed, kind, index = parse_dataset_id(dataset_id)
+        if schema_fingerprint != self.fingerprint():
+            raise ValueError(f"The dataset id {dataset_id!r} belongs to another schema definition")
+
+        if kind == 'p':
+            return self.positive(seed=seed, clock=clock)[index]
+        return self.negative(seed=seed, clock=clock, mode=ONE_FAULT if kind == 'o' else PRODUCT)[index]
+
+    def positive_at(
+        self,
+        index: int,
+        seed: Any = None,
+        clock: Union[datetime, Callable[[], datetime], None] = None,
+    ) -> dict:
+        """
+        Returns the positive dataset with the specified index without generating the previous ones.
+
+        :param index: Index of the dataset.
+        :param seed: Seed of the generation, see positive.
+        :param clock: Current time or a function returning it, see positive.
+        :return: Dictionary.
+        """
+
+        return self.positive(seed=seed, clock=clock)[index]
+
+    def negative_at(
+        self,
+        index: int,
+        seed: Any = None,
+        clock: Union[datetime, Callable[[], datetime], None] = None,
+    ) -> dict:
+        """
+        Returns the negative dataset with the specified index without generating the previous ones.
+
+        :param index: Index of the dataset.
+        :param seed: Seed of the generation, see negative.
+        :param clock: Current time or a function returning it, see negative.
+        :return: Dictionary.
+        """
+
+        return self.negative(seed=seed, clock=clock)[index]
+
+    def sample_positive(
+        self,
+        k: int,
+        seed: Any = None,
+        clock: Union[datetime, Callable[[], datetime], None] = None,
+    ) -> List[dict]:
+        """
+        Returns k distinct positive datasets chosen uniformly at random without generating the others.
+
+        :param k: Number of datasets.
+        :param seed: Seed of the generation of the values and of the choice of the datasets.
+        :param clock: Current time or a function returning it, see positive.
         :return: List of dictionaries.
         """
 
-        positive_generators = self.fields(is_positive=True)
-        negative_generators = self.fields(is_positive=False)
+        return self.positive(seed=seed, clock=clock).sample(k=k, seed=seed)
 
-        for n_gen in negative_generators:
-            fields = [n_gen]
-            for p_gen in positive_generators:
-                if p_gen.attr_name == n_gen.attr_name:
-                    continue
-                fields.append(p_gen)
+    def sample_negative(
+        self,
+        k: int,
+        seed: Any = None,
+        stratified: bool = False,
+        clock: Union[datetime, Callable[[], datetime], None] = None,
+    ) -> List[dict]:
+        """
+        Returns k distinct negative datasets chosen uniformly at random without generating the others.
+
+        :param k: Number of datasets.
+        :param seed: Seed of the generation of the values and of the choice of the datasets.
+        :param stratified: True if every negative field must be represented by at least one dataset.
+        :param clock: Current time or a function returning it, see negative.
+        :return: List of dictionaries.
+        """
+
+        return self.negative(seed=seed, clock=clock).sample(k=k, seed=seed, stratified=stratified)
+
+    def count_positive(self) -> int:
+        """
+        Returns the number of positive datasets without generating them.
+
+        :return: Number of datasets.
+        """
+
+        return self.positive().count()
+
+    def count_negative(self) -> int:
+        """
+        Returns the number of negative datasets without generating them.
+
+        :return: Number of datasets.
+        """
 
-            for dataset in self._generate(fields=fields):
-                yield dict(filter(
-                    lambda field_value: not isinstance(field_value[1], Missing),
-                    dataset
-                ))
+        return self.negative().count()
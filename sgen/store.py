@@ -0,0 +1,236 @@
+import mmap
+import sys
+from array import array
+from operator import index as as_index
+from os import PathLike
+from struct import Struct
+from typing import Any, Iterable, Iterator, List, Tuple, Union
+
+from sgen.binary import pack_into, unpack
+
+
+__all__ = ["DatasetStore", "write_store"]
+
+
+# Layout: header, records, index.
+# The header holds the magic, the number of datasets and the position of the
+# index. A record is the length of the dataset followed by the dataset encoded
+# with sgen.binary. The index holds the position of every record and the end
+# of the last one, so record i spans index[i]..index[i + 1].
+_MAGIC = b'SGENSTR1'
+_HEADER = Struct('<8sQQ')
+_LENGTH = Struct('<I')
+_OFFSET = Struct('<Q')
+
+
+def write_store(datasets: Iterable[dict], path: Union[str, PathLike], buffer_size: int = 1 << 20) -> int:
+    """
+    Writes datasets to a store file, see DatasetStore.
+
+    :param datasets: Datasets, for example schema.positive().
+    :param path: Path of the file.
+    :param buffer_size: Number of bytes collected before a write.
+    :return: Number of datasets.
+    """
+
+    offsets = array('Q')
+    position = _HEADER.size
+
+    with open(path, 'wb') as fh:
+        fh.write(_HEADER.pack(_MAGIC, 0, 0))
+
+        parts = []
+        buffered = 0
+        for dataset in datasets:
+            record = [b'']
+            pack_into(dataset, record)
+            size = sum(map(len, record))
+            if size >= 1 << 32:
+                raise ValueError("A dataset cannot be larger than 4 GiB")
+            record[0] = _LENGTH.pack(size)
+
+            offsets.append(position)
+            position += _LENGTH.size + size
+            parts += record
+            buffered += _LENGTH.size + size
+
+            if buffered >= buffer_size:
+                fh.write(b''.join(parts))
+                parts, buffered = [], 0
+
+        fh.write(b''.join(parts))
+
+        offsets.append(position)
+        if sys.byteorder == 'big':
+            offsets.byteswap()
+        fh.write(offsets.tobytes())
+
+        fh.seek(0)
+        fh.write(_HEADER.pack(_MAGIC, len(offsets) - 1, position))
+
+    return len(offsets) - 1
+
+
+class DatasetStore:
+    """
+    Reads datasets from a store file written by write_store
+
+    The file is memory-mapped and every record is located through the offset
+    index, so reading a dataset does not read the others, and processes
+    that open the same file share its pages.
+
+    :note: Values are decoded as by sgen.binary: dates and times are ISO 8601 strings,
+        sequences are lists. The store can be pickled, workers reopen the file.
+    """
+
+    def __init__(self, path: Union[str, PathLike]):
+        """
+        :param path: Path of the file.
+        :raises ValueError: If the file is not a store.
+        """
+
+        self.path = path
+
+        with open(path, 'rb') as fh:
+            try:
+                self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                raise ValueError(f"{path} is not a dataset store") from None
+
+        if len(self._mmap) < _HEADER.size:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a dataset store")
+
+        magic, self._count, self._index = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC or self._index + (self._count + 1) * _OFFSET.size != len(self._mmap):
+            self._mmap.close()
+            raise ValueError(f"{path} is not a dataset store")
+
+    def _offset(self, index: int) -> int:
+        """Returns the position of record index, or the end of the records for index == len(self)"""
+
+        return _OFFSET.unpack_from(self._mmap, self._index + index * _OFFSET.size)[0]
+
+    def _decode(self, offset: int) -> dict:
+        return unpack(self._mmap, offset + _LENGTH.size)[0]
+
+    def count(self) -> int:
+        """
+        Returns the number of datasets.
+
+        :return: Number of datasets.
+        """
+
+        return self._count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, item: Union[int, slice]) -> Union[dict, List[dict]]:
+        """Returns a dataset by index or a list of datasets by slice"""
+
+        if isinstance(item, slice):
+            indexes = range(self._count)[item]
+            if indexes.step == 1:
+                return list(self.iter_range(indexes.start, indexes.stop))
+            return [self[index] for index in indexes]
+
+        item = as_index(item)
+        if item < 0:
+            item += self._count
+        if not 0 <= item < self._count:
+            raise IndexError("Dataset index out of range")
+
+        return self._decode(self._offset(item))
+
+    def iter_range(self, start: int, stop: int) -> Iterator[dict]:
+        """
+        Decodes the datasets with indexes from start to stop.
+
+        Records are contiguous, so only the position of the first one is read from the index.
+
+        :param start: Index of the first dataset.
+        :param stop: Index of the dataset after the last one.
+        :return: Dictionary generator.
+        """
+
+        start, stop = max(start, 0), min(stop, self._count)
+        if start >= stop:
+            return
+
+        offset = self._offset(start)
+        for _ in range(stop - start):
+            size = _LENGTH.unpack_from(self._mmap, offset)[0]
+            yield self._decode(offset)
+            offset += _LENGTH.size + size
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.iter_range(0, self._count)
+
+    def shard_bounds(self, shard: int, num_shards: int) -> Tuple[int, int]:
+        """
+        Returns the range of dataset indexes of the shard.
+
+        Shards are contiguous, disjoint and balanced by the size of their records.
+
+        :param shard: Index of the shard, from 0 to num_shards - 1.
+        :param num_shards: Number of shards.
+        :return: Index of the first dataset and index of the dataset after the last one.
+        """
+
+        if num_shards < 1:
+            raise ValueError("The number of shards must be greater than or equal to 1")
+        if not 0 <= shard < num_shards:
+            raise ValueError("The shard index must be from 0 to num_shards - 1")
+
+        first = self._offset(0)
+        total = self._offset(self._count) - first
+
+        def bound(part: int) -> int:
+            """Returns the smallest index whose records reach part / num_shards of the total size"""
+
+            low, high = 0, self._count
+            while low < high:
+                middle = (low + high) // 2
+                if (self._offset(middle) - first) * num_shards >= total * part:
+                    high = middle
+                else:
+                    low = middle + 1
+            return low
+
+        start = 0 if shard == 0 else bound(shard)
+        stop = self._count if shard == num_shards - 1 else bound(shard + 1)
+
+        return start, stop
+
+    def shard(self, shard: int, num_shards: int) -> Iterator[dict]:
+        """
+        Decodes only the datasets of the shard, see shard_bounds.
+
+        :param shard: Index of the shard, from 0 to num_shards - 1.
+        :param num_shards: Number of shards.
+        :return: Dictionary generator.
+        """
+
+        return self.iter_range(*self.shard_bounds(shard, num_shards))
+
+    def close(self):
+        """Unmaps the file"""
+
+        self._mmap.close()
+
+    def __enter__(self) -> 'DatasetStore':
+        return self
+
+    def __exit__(self, *args: Any):
+        self.close()
+
+    def __getstate__(self):
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __repr__(self):
+        return f"<DatasetStore {self.path!r} datasets={self._count}>"
@@ -0,0 +1,118 @@
+import os
+import random
+import threading
+from string import ascii_letters
+from typing import Optional
+
+from sgen.rng import current
+
+
+__all__ = ["RandomText", "random_text"]
+
+
+# Bytes 0..207 map to the 52 letters four times each, so every letter is
+# equally likely; bytes 208..255 are dropped.
+_ACCEPTED = len(ascii_letters) * (256 // len(ascii_letters))
+_TABLE = bytes(ord(ascii_letters[byte % len(ascii_letters)]) if byte < _ACCEPTED else 0 for byte in range(256))
+_REJECTED = bytes(range(_ACCEPTED, 256))
+
+
+class RandomText:
+    """
+    Generates random strings of ASCII letters from a pool of random bytes
+
+    :note: The pool is refilled with getrandbits and mapped to letters with
+        bytes.translate, so a string costs one slice instead of a Python
+        loop per character. Pass a random.Random instance to make the
+        output reproducible.
+    """
+
+    POOL_SIZE = 1 << 14
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        """
+        :param rng: Source of random bits, the module random if None.
+        """
+
+        self.rng = rng
+        self._pool = ''
+        self._position = 0
+
+    def _letters(self, length: int) -> str:
+        """Returns at least length fresh random letters"""
+
+        chunks = []
+        produced = 0
+        getrandbits = (self.rng or random).getrandbits
+
+        while produced < length:
+            # About 19% of the bytes are dropped, a quarter more covers it in most cases
+            size = (length - produced) * 5 // 4 + 16
+            raw = getrandbits(size * 8).to_bytes(size, 'little')
+            chunk = raw.translate(_TABLE, _REJECTED).decode('ascii')
+            chunks.append(chunk)
+            produced += len(chunk)
+
+        return ''.join(chunks)
+
+    def text(self, length: int) -> str:
+        """
+        Returns a string of random ASCII letters.
+
+        :param length: String length.
+        :return: String.
+        """
+
+        if length >= self.POOL_SIZE:
+            return self._letters(length)[:length]
+
+        end = self._position + length
+        if end > len(self._pool):
+            self._pool = self._pool[self._position:] + self._letters(self.POOL_SIZE)
+            self._position, end = 0, length
+
+        text = self._pool[self._position:end]
+        self._position = end
+        return text
+
+
+_default = RandomText()
+_default_lock = threading.Lock()  # The pool and position of the shared engine are changed together
+
+
+def _reset_default():
+    """Drops the pool of the shared engine, a forked child would repeat the letters of its parent"""
+
+    global _default_lock
+
+    # The lock may be held by a thread of the parent that does not exist in the child
+    _default_lock = threading.Lock()
+    _default._pool = ''
+    _default._position = 0
+
+
+if hasattr(os, 'register_at_fork'):
+    # The module random is reseeded in the child, the pool is refilled from it
+    os.register_at_fork(after_in_child=_reset_default)
+
+
+def random_text(length: int) -> str:
+    """
+    Returns a string of random ASCII letters.
+
+    During seeded generation the engine is bound to the random number
+    generator of the current state, see sgen.rng, otherwise the shared
+    engine is used under a lock, so threads never get overlapping slices.
+
+    :param length: String length.
+    :return: String.
+    """
+
+    state = current()
+    if state is None or state.seed is None:
+        with _default_lock:
+            return _default.text(length)
+
+    if state.text is None:
+        state.text = RandomText(state.random)
+    return state.text.text(length)
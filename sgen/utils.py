@@ -1,4 +1,7 @@
 from inspect import isgeneratorfunction, isgenerator
+from collections.abc import Sequence
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Tuple
 
 
 class Missing:
@@ -14,16 +17,123 @@ class ValuesStorage(list):
     """
     Represents storage for field values
 
-    :note: Implemented because True in [1] -> True, but should be False
+    :note: Implemented because True in [1] -> True, but should be False.
+        Values are indexed by (type, structural_hash), so a membership test
+        compares only values of the same type with the same hash.
     """
 
+    def __init__(self, iterable=()):
+        super().__init__()
+        self._buckets: Dict[Tuple[type, int], List[Any]] = {}
+        self._unhashable: List[Any] = []  # Values without a structural hash
+        self.extend(iterable)
+
+    def _index(self, value: Any) -> None:
+        try:
+            key = (type(value), structural_hash(value))
+        except TypeError:
+            self._unhashable.append(value)
+        else:
+            self._buckets.setdefault(key, []).append(value)
+
+    def _reindex(self) -> None:
+        self._buckets = {}
+        self._unhashable = []
+        for value in self:
+            self._index(value)
+
     def __contains__(self, item):
-        present = list(filter(
-            lambda value: type(value) == type(item) and value == item,
-            self
-        ))
+        try:
+            key = (type(item), structural_hash(item))
+        except TypeError:
+            candidates = self
+        else:
+            candidates = chain(self._buckets.get(key, ()), self._unhashable)
+
+        return any(type(value) == type(item) and value == item for value in candidates)
+
+    def append(self, value: Any) -> None:
+        super().append(value)
+        self._index(value)
+
+    def extend(self, values: Iterable[Any]) -> None:
+        for value in values:
+            self.append(value)
+
+    def __iadd__(self, values: Iterable[Any]) -> 'ValuesStorage':
+        self.extend(values)
+        return self
+
+    def __reduce__(self):
+        return type(self), (list(self),)
+
+    def copy(self) -> 'ValuesStorage':
+        return type(self)(self)
+
+    def _mutator(name: str):
+        """Wraps a list method that changes values in an unpredictable way, the index is rebuilt"""
+
+        method = getattr(list, name)
+
+        def wrapper(self, *args, **kwargs):
+            result = method(self, *args, **kwargs)
+            self._reindex()
+            return result
+
+        wrapper.__name__ = name
+        return wrapper
+
+    insert = _mutator('insert')
+    remove = _mutator('remove')
+    pop = _mutator('pop')
+    clear = _mutator('clear')
+    __setitem__ = _mutator('__setitem__')
+    __delitem__ = _mutator('__delitem__')
+    __imul__ = _mutator('__imul__')
+
+    del _mutator
+
+
+def structural_hash(value: Any) -> int:
+    """
+    Returns a hash of value that is equal for equal values, including lists and dicts
+
+    :note: Lists are hashed by their length and first and last elements, so
+        huge lists are not traversed, equal lists still get equal hashes.
+    :raises TypeError: If value is unhashable and is not a dict, list, tuple, set or bytearray.
+    """
+
+    try:
+        return hash(value)
+    except TypeError:
+        pass
+
+    if isinstance(value, dict):
+        return hash((dict, frozenset((key, structural_hash(item)) for key, item in value.items())))
+    if isinstance(value, (list, tuple)):
+        head = tuple(structural_hash(item) for item in value[:8])
+        tail = structural_hash(value[-1]) if value else None
+        return hash((list, len(value), head, tail))
+    if isinstance(value, (set, frozenset)):
+        return hash(frozenset(value))
+    if isinstance(value, bytearray):
+        return hash(bytes(value))
+
+    raise TypeError(f"Cannot compute a structural hash of {type(value).__name__}")
+
+
+def estimate_cost(value) -> int:
+    """
+    Estimates the relative cost of building and consuming a value
+
+    :note: Lists are assumed to contain values similar to the first one.
+    """
 
-        return bool(present)
+    if isinstance(value, dict):
+        return 1 + sum(estimate_cost(item) for item in value.values())
+    if isinstance(value, Sequence) and not isinstance(value, (str, bytes)):
+        return 1 + (len(value) * estimate_cost(value[0]) if value else 0)
+    return 1
 
 
 def is_generator(obj) -> bool:
@@ -23,6 +23,8 @@ class Length(ValidatorABC):
             max: int = None,
             min_inclusive: bool = True,
             max_inclusive: bool = True,
+            memory_limit: int = None,
+            lazy: bool = False,
     ):
         """
         Initializes the validator
@@ -31,6 +33,8 @@ class Length(ValidatorABC):
         :param max: Maximum length.
         :param min_inclusive: True if min is a valid list length
         :param max_inclusive: True if max is a valid list length
+        :param memory_limit: Maximum length of a boundary value built in memory, no limit if None
+        :param lazy: True if collections longer than sgen.sequences.LAZY_LENGTH are generated as RepeatedSequence
         """
 
         if not min and not max:
@@ -45,11 +49,23 @@ class Length(ValidatorABC):
 
         self.min = min
         self.max = max
+        self.memory_limit = memory_limit
+        self.lazy = lazy
         if isinstance(min, int):
             self.min = min if min_inclusive else min + 1
         if isinstance(max, int):
             self.max = max if max_inclusive else max - 1
 
+    def _generate(self, data_type: Field, length: int) -> Any:
+        """Generates a value of the length, memory_limit and lazy are passed only if they are set, see Field.generate"""
+
+        kwargs = {}
+        if self.memory_limit is not None:
+            kwargs['memory_limit'] = self.memory_limit
+        if self.lazy:
+            kwargs['lazy'] = True
+        return data_type.generate(length, **kwargs)
+
     def positive(self, data_type: Field) -> List[Any]:
         """
         Generates a positive data set according to the validation parameters.
@@ -61,9 +77,9 @@ class Length(ValidatorABC):
         values = []
 
         if self.min is not None:
-            values.append(data_type.generate(self.min))
+            values.append(self._generate(data_type, self.min))
         if self.max is not None:
-            values.append(data_type.generate(self.max))
+            values.append(self._generate(data_type, self.max))
 
         return values
 
@@ -83,9 +99,9 @@ class Length(ValidatorABC):
         values = []
 
         if self.min is not None:
-            values.append(data_type.generate(self.min - 1))
+            values.append(self._generate(data_type, self.min - 1))
         if self.max is not None:
-            values.append(data_type.generate(self.max + 1))
+            values.append(self._generate(data_type, self.max + 1))
 
         return values
 
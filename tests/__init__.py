@@ -1,4 +1,4 @@
-from typing import Any, List
+from typing import Any, Callable, List, Tuple
 
 
 def has_data_type(values: List[Any], data_type: Any) -> bool:
@@ -14,6 +14,16 @@ def has_data_type(values: List[Any], data_type: Any) -> bool:
     )))
 
 
+def values(*items: Any) -> Callable[[], Tuple[Any, ...]]:
+    """
+    Возвращает функцию для positive_data_from и negative_data_from
+
+    :return: Функция, возвращающая items
+    """
+
+    return lambda: items
+
+
 class Unique:
     """Представляет уникальное значение для использования в тестах"""
 
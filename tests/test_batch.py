@@ -0,0 +1,97 @@
+from datetime import date, datetime, timedelta
+from random import Random
+
+import pytest
+
+from sgen import batch, rng
+from sgen.fields import Boolean, Collection, Date, DateTime, Field, Float, Integer, String
+from sgen.validate import Equal, Length, NoneOf, OneOf, Range
+
+
+CLOCK = datetime(2024, 3, 1, 10)
+
+
+def seeded(seed=1):
+    return rng.use(rng.RandomState(Random(seed), CLOCK, seed))
+
+
+def test_integer_range_and_step():
+    values = Integer(step=3, validate=Range(min=5, max=20, max_inclusive=False)).generate_batch(500)
+
+    assert len(values) == 500
+    assert set(values) == {5, 8, 11, 14, 17}
+
+
+def test_float_range():
+    values = Float(validate=Range(min=1, max=2)).generate_batch(500)
+
+    assert all(isinstance(value, float) and 1 <= value <= 2 for value in values)
+
+
+def test_boolean():
+    values = Boolean().generate_batch(200)
+
+    assert set(values) == {True, False}
+    assert Boolean().generate_batch(0) == []
+
+
+def test_string_length():
+    values = String(validate=Length(min=3, max=6)).generate_batch(300)
+
+    assert {len(value) for value in values} == {3, 4, 5, 6}
+    assert all(value.isalpha() for value in values)
+
+
+def test_dates():
+    with seeded():
+        dates = Date(validate=Range(min=date(2020, 1, 1), max=date(2020, 1, 31))).generate_batch(200)
+        times = DateTime(step=timedelta(hours=1)).generate_batch(200)
+
+    assert all(date(2020, 1, 1) <= value <= date(2020, 1, 31) for value in dates)
+    assert all(abs(value - CLOCK) <= timedelta(days=365) and value.minute == 0 for value in times)
+
+
+def test_validators():
+    assert Integer(validate=Equal(7)).generate_batch(3) == [7, 7, 7]
+    assert set(String(validate=OneOf(['a', 'b'])).generate_batch(100)) == {'a', 'b'}
+    assert 0 not in Integer(validate=NoneOf([0, 1, 2])).generate_batch(1000)
+
+
+def test_seeded_batches_are_reproducible():
+    with seeded(5):
+        first = Integer().generate_batch(100), String().generate_batch(10)
+    with seeded(5):
+        second = Integer().generate_batch(100), String().generate_batch(10)
+
+    assert first == second
+
+
+def test_custom_field_opts_in():
+    class Even(Field):
+        def random_batch(self, n):
+            return [value * 2 for value in batch.integers(0, 50, n)]
+
+    assert Even().supports_batch()
+    assert all(value % 2 == 0 for value in Even().generate_batch(50))
+
+    assert not Collection(data_type=Integer()).supports_batch()
+    with pytest.raises(NotImplementedError):
+        Collection(data_type=Integer()).generate_batch(1)
+
+
+def test_huge_integer_range():
+    values = Integer(validate=Range(min=0, max=10 ** 30)).generate_batch(10)
+
+    assert all(0 <= value <= 10 ** 30 for value in values)
+
+
+def test_numpy_path(monkeypatch):
+    pytest.importorskip('numpy')
+    monkeypatch.setattr(batch, 'NUMPY_THRESHOLD', 1)
+
+    with seeded(3):
+        values = Integer(validate=Range(min=-5, max=5)).generate_batch(100)
+        floats = Float(validate=Range(min=0, max=1)).generate_batch(100)
+
+    assert all(isinstance(value, int) and -5 <= value <= 5 for value in values)
+    assert all(isinstance(value, float) and 0 <= value <= 1 for value in floats)
@@ -0,0 +1,173 @@
+import os
+import pickle
+from datetime import datetime
+
+import pytest
+
+from sgen import SGen
+from sgen.cache import DatasetCache
+from sgen.datasets import CompiledDatasets
+from sgen.fields import DateTime, Integer, Nested, String
+
+
+CLOCK = datetime(2020, 1, 2, 3, 4, 5)
+
+calls = []
+
+
+def tracked():
+    calls.append(1)
+    return [1, 2, 3]
+
+
+class Inner(SGen):
+    x = Integer()
+
+
+class Test(SGen):
+    a = Integer(positive_data_from=tracked)
+    s = String()
+    created = DateTime()
+    inner = Nested(Inner())
+
+
+def entries(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith(DatasetCache.SUFFIX))
+
+
+def test_cache_hit(tmp_path):
+    calls.clear()
+    expected = list(Test().positive(seed=1, clock=CLOCK))
+
+    first = Test().positive(seed=1, clock=CLOCK, cache_dir=tmp_path)
+    assert isinstance(first, CompiledDatasets)
+    assert list(first) == expected
+    assert len(entries(tmp_path)) == 1
+
+    calls.clear()
+    second = Test().positive(seed=1, clock=CLOCK, cache_dir=tmp_path)
+    assert list(second) == expected
+    assert not calls
+
+
+def test_cache_keys(tmp_path):
+    Test().positive(seed=1, clock=CLOCK, cache_dir=tmp_path)
+    Test().positive(seed=2, clock=CLOCK, cache_dir=tmp_path)
+    Test().negative(seed=1, clock=CLOCK, cache_dir=tmp_path)
+    Test().negative(seed=1, clock=CLOCK, mode='one_fault', cache_dir=tmp_path)
+    Test().positive(seed=1, clock=datetime(2021, 1, 1), cache_dir=tmp_path)
+    Test().positive(seed=1, clock=CLOCK, cache_dir=tmp_path)
+
+    assert len(entries(tmp_path)) == 5
+
+    class Other(SGen):
+        a = Integer(positive_data_from=tracked)
+
+    Other().positive(seed=1, clock=CLOCK, cache_dir=tmp_path)
+    assert len(entries(tmp_path)) == 6
+
+
+SCHEMA_SOURCE = """
+from sgen import SGen
+from sgen.fields import Integer
+
+class Custom(Integer):
+    def set_positive_values(self):
+        self.values.append({value})
+
+class Edited(SGen):
+    a = Integer(positive_data_from=lambda: [{data}])
+    b = Custom()
+"""
+
+
+def load_schema(**source):
+    """Runs the source of a module defining Edited, as if the module was edited between runs"""
+
+    namespace = {'__name__': 'schemas'}
+    exec(SCHEMA_SOURCE.format(**source), namespace)
+    return namespace['Edited']()
+
+
+def test_cache_key_includes_code():
+    cache = DatasetCache('unused')
+
+    def key(schema):
+        return cache.key(schema, schema.positive(seed=1), frozen_clock=False)
+
+    original = key(load_schema(value=1, data=3))
+    assert key(load_schema(value=1, data=3)) == original
+    # Only the code of the lambda or of the method differs, the names are the same
+    assert key(load_schema(value=1, data=4)) != original
+    assert key(load_schema(value=2, data=3)) != original
+
+
+def test_cache_without_clock_keeps_the_first_time(tmp_path):
+    first = list(Test().positive(seed=1, cache_dir=tmp_path))
+    assert list(Test().positive(seed=1, cache_dir=tmp_path)) == first
+
+
+def test_cache_with_workers_and_shards(tmp_path):
+    expected = list(Test().negative(seed=1, clock=CLOCK))
+
+    Test().negative(seed=1, clock=CLOCK, cache_dir=tmp_path)
+    assert list(Test().negative(seed=1, clock=CLOCK, cache_dir=tmp_path, workers=2)) == expected
+    assert [
+        dataset
+        for shard in range(3)
+        for dataset in Test().negative(seed=1, clock=CLOCK, cache_dir=tmp_path, shard=shard, num_shards=3)
+    ] == expected
+
+
+def test_cached_dataset_ids(tmp_path):
+    for mode in ('product', 'one_fault'):
+        expected = Test().negative(seed=1, clock=CLOCK, mode=mode)
+        Test().negative(seed=1, clock=CLOCK, mode=mode, cache_dir=tmp_path)
+        cached = Test().negative(seed=1, clock=CLOCK, mode=mode, cache_dir=tmp_path)
+
+        assert cached.dataset_id(2) == expected.dataset_id(2)
+        assert Test().replay(cached.dataset_id(2), clock=CLOCK) == cached[2]
+
+    assert Test().positive(seed='a', cache_dir=tmp_path).dataset_id(0) == Test().positive(seed='a').dataset_id(0)
+    restored = pickle.loads(pickle.dumps(Test().positive(seed=2).compile()))
+    assert restored.dataset_id(1) == Test().positive(seed=2).dataset_id(1)
+
+
+def test_damaged_entry_is_replaced(tmp_path):
+    expected = list(Test().positive(seed=1, clock=CLOCK, cache_dir=tmp_path))
+    (path,) = entries(tmp_path)
+    (tmp_path / path).write_bytes(b'damaged')
+
+    assert list(Test().positive(seed=1, clock=CLOCK, cache_dir=tmp_path)) == expected
+    assert (tmp_path / path).read_bytes() != b'damaged'
+
+
+def test_eviction(tmp_path):
+    cache = DatasetCache(tmp_path)
+    for seed in range(3):
+        Test().positive(seed=seed, clock=CLOCK, cache_dir=cache)
+
+    sizes = {name: os.path.getsize(tmp_path / name) for name in entries(tmp_path)}
+    assert cache.size() == sum(sizes.values())
+
+    # Entry of seed 0 is used last, so the entry of seed 1 is the least recently used
+    least_recent = cache.key(Test(), Test().positive(seed=1, clock=CLOCK), frozen_clock=True) + DatasetCache.SUFFIX
+    for index, name in enumerate([least_recent] + [name for name in sizes if name != least_recent]):
+        os.utime(tmp_path / name, (index, index))
+
+    cache.max_size = cache.size() - 1
+    cache.evict()
+    assert least_recent not in entries(tmp_path)
+    assert len(entries(tmp_path)) == 2
+
+    cache.clear()
+    assert entries(tmp_path) == []
+
+
+def test_cache_errors(tmp_path):
+    with pytest.raises(ValueError):
+        Test().positive(cache_dir=tmp_path)
+    with pytest.raises(ValueError):
+        Test().positive(seed=1, strength=1, cache_dir=tmp_path)
+    with pytest.raises(ValueError):
+        DatasetCache(tmp_path, max_size=-1)
@@ -0,0 +1,55 @@
+import pickle
+
+from sgen import SGen
+from sgen.codegen import product_function
+from sgen.fields import Boolean, Collection, Integer, Nested, String
+from sgen.validate import Length, Range
+
+
+class Inner(SGen):
+    x = Integer(validate=Range(min=1, max=2))
+
+
+class Test(SGen):
+    a = String(validate=Length(min=1, max=3))
+    b = Integer(required=True)
+    c = Boolean()
+    d = Nested(Inner())
+    e = Collection(data_type=Integer())
+
+
+def test_compiled_matches_generic():
+    for method in ('positive', 'negative'):
+        datasets = getattr(Test().compile(), method)()
+        generic = Test()
+        generic_datasets = getattr(generic, method)()
+        generic_datasets.context = datasets.context  # Same values for both
+
+        actual = list(datasets)
+
+        assert actual == list(generic_datasets)
+        assert [list(dataset) for dataset in actual] == [list(dataset) for dataset in generic_datasets]
+
+
+def test_wide_schema():
+    attrs = {
+        f'field_{index:02}': Integer(positive_data_from=lambda: (1, 2))
+        for index in range(20)
+    }
+    Wide = type('Wide', (SGen,), attrs)
+
+    compiled = Wide().compile().positive()
+    generic = Wide().positive()
+
+    assert list(compiled) == list(generic)
+
+
+def test_function_is_cached():
+    assert product_function(('a', 'b'), (False, True)) is product_function(('a', 'b'), (False, True))
+
+
+def test_compiled_datasets_keep_codegen():
+    datasets = pickle.loads(pickle.dumps(Test().compile().positive().compile()))
+
+    assert datasets.codegen
+    assert len(list(datasets)) == datasets.count()
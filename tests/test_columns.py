@@ -0,0 +1,91 @@
+from array import array
+
+import pytest
+
+from sgen import SGen
+from sgen.fields import Boolean, Collection, Float, Integer, Nested, String
+from sgen.utils import Missing
+from tests import values
+
+
+class Inner(SGen):
+    x = Integer(positive_data_from=values(1, Missing()))
+    y = String(positive_data_from=values('a'))
+
+
+class Test(SGen):
+    a = Integer(positive_data_from=values(5, None, Missing()))
+    b = Float(positive_data_from=values(1.5, 2.5))
+    c = Boolean(positive_data_from=values(True))
+    d = Nested(Inner(), required=True)
+    e = Collection(data_type=Integer(), positive_data_from=values([1, 2]))
+
+
+def merge(chunks):
+    merged = {}
+    for chunk in chunks:
+        for kind in ('columns', 'present', 'valid'):
+            for name, column in getattr(chunk, kind).items():
+                merged.setdefault((kind, name), []).extend(column)
+    return merged
+
+
+def test_columns_match_datasets():
+    datasets = list(Test().positive())
+    chunks = list(Test().positive_columns(chunk_size=5))
+    merged = merge(chunks)
+
+    assert [chunk.size for chunk in chunks] == [5] * (len(datasets) // 5) + [len(datasets) % 5] * bool(len(datasets) % 5)
+    assert sorted({name for kind, name in merged if kind == 'columns'}) == ['a', 'b', 'c', 'd.x', 'd.y', 'e']
+
+    for index, dataset in enumerate(datasets):
+        nested = dataset.get('d')
+
+        assert merged['present', 'a'][index] == ('a' in dataset)
+        assert merged['valid', 'a'][index] == (dataset.get('a') is not None)
+        assert merged['columns', 'a'][index] == dataset.get('a')
+        assert merged['columns', 'b'][index] == dataset['b']
+        assert merged['columns', 'e'][index] == dataset['e']
+        assert merged['valid', 'd'][index] == (nested is not None)
+        assert merged['present', 'd.x'][index] == (isinstance(nested, dict) and 'x' in nested)
+        assert merged['columns', 'd.x'][index] == (nested or {}).get('x')
+
+
+def test_array_columns():
+    chunk = next(Test().positive_columns(chunk_size=1000, arrays='array'))
+
+    assert isinstance(chunk.columns['a'], array) and chunk.columns['a'].typecode == 'q'
+    assert isinstance(chunk.columns['b'], array) and chunk.columns['b'].typecode == 'd'
+    assert isinstance(chunk.valid['a'], array)
+    assert isinstance(chunk.columns['d.y'], list)
+    assert all(value == 0 for value, valid in zip(chunk.columns['a'], chunk.valid['a']) if not valid)
+
+
+def test_numpy_columns():
+    numpy = pytest.importorskip('numpy')
+    chunk = next(Test().positive_columns(arrays='numpy'))
+
+    assert chunk.columns['a'].dtype == numpy.int64
+    assert chunk.columns['c'].dtype == numpy.bool_
+    assert chunk.present['d.x'].dtype == numpy.bool_
+
+
+def test_parameters():
+    with pytest.raises(ValueError):
+        Test().positive_columns(chunk_size=0)
+
+    with pytest.raises(ValueError):
+        Test().positive_columns(arrays='pandas')
+
+
+def test_values_out_of_array_range():
+    class Wide(SGen):
+        a = Integer(positive_data_from=values(1, 2 ** 63))
+
+    chunks = Wide().positive_columns(chunk_size=1, arrays='array')
+
+    assert isinstance(next(chunks).columns['a'], array)
+    with pytest.raises(ValueError):
+        next(chunks)
+
+    assert [value for chunk in Wide().positive_columns(chunk_size=1) for value in chunk.columns['a']] == [1, 2 ** 63]
@@ -0,0 +1,55 @@
+from collections import Counter
+
+from sgen import SGen
+from sgen.fields import Integer, String
+
+
+def test_positive_values_generated_once():
+    calls = Counter()
+
+    def data_from(name, values):
+        def generator():
+            calls[name] += 1
+            return values
+        return generator
+
+    class Test(SGen):
+        a = Integer(positive_data_from=data_from('a', (1, 2, 3)))
+        b = Integer(positive_data_from=data_from('b', (4, 5)))
+        c = Integer(positive_data_from=data_from('c', (6, 7)))
+
+    datasets = list(Test().positive())
+
+    assert len(datasets) == 12
+    assert calls == {'a': 1, 'b': 1, 'c': 1}
+
+
+def test_negative_shares_positive_values():
+    calls = Counter()
+
+    def data_from(name, values):
+        def generator():
+            calls[name] += 1
+            return values
+        return generator
+
+    class Test(SGen):
+        a = Integer(positive_data_from=data_from('a', (1, 2)), negative_data_from=lambda: ('a',))
+        b = Integer(positive_data_from=data_from('b', (3, 4)), negative_data_from=lambda: ('b',))
+        c = Integer(positive_data_from=data_from('c', (5, 6)), negative_data_from=lambda: ('c',))
+
+    datasets = list(Test().negative())
+
+    assert len(datasets) == 12
+    assert calls == {'a': 1, 'b': 1, 'c': 1}
+
+
+def test_inner_values_are_stable():
+    class Test(SGen):
+        a = Integer(positive_data_from=lambda: (1, 2, 3))
+        z = String(required=True, allow_none=False)
+
+    datasets = list(Test().positive())
+
+    assert len(datasets) == 3
+    assert len({dataset['z'] for dataset in datasets}) == 1
@@ -0,0 +1,91 @@
+from itertools import islice
+
+from sgen import SGen
+from sgen.fields import Boolean, Collection, Float, Integer, Nested, String
+from sgen.validate import Equal, Length, NoneOf, OneOf, Range
+
+
+class Pet(SGen):
+    name = String(validate=Length(min=1, max=5))
+    age = Integer(validate=Range(min=0, max=30), required=True)
+
+
+class Owner(SGen):
+    name = String(allow_none=False, default='Aboba', validate=Length(min=10, max=40))
+    age = Integer(validate=Range(min=18, min_inclusive=False))
+    balance = Float(allow_none=False, required=True, validate=OneOf(choices=[1, 2, 3]))
+    is_admin = Boolean(required=True)
+    address = String(validate=NoneOf(invalid_values=['Pepega street']))
+    car = String(validate=Equal(comparable='Jaguar XF'))
+    pet = Nested(Pet())
+
+
+class Storage(SGen):
+    keys = Collection(data_type=Integer(), allow_none=False, required=True)
+    names = Collection(data_type=String(required=True), validate=Length(min=1, max=3))
+    pets = Collection(data_type=Nested(Pet()), validate=Length(min=1, max=2), required=True)
+    owners = Collection(data_type=Pet())
+    tags = Collection(data_type=Boolean(), validate=Length(max=2))
+
+
+def test_count_matches_generated():
+    for schema in (Pet(), Owner(), Storage()):
+        assert schema.count_positive() == len(list(schema.positive()))
+        assert schema.count_negative() == len(list(schema.negative()))
+
+
+def test_field_count_matches_generated():
+    for field in Storage().fields(is_positive=True):
+        assert field.field.count(True) == len(list(field.field.positive()))
+        assert field.field.count(False) == len(list(field.field.negative()))
+
+
+def test_len():
+    datasets = Owner().positive()
+
+    assert len(datasets) == datasets.count() == len(list(datasets))
+
+
+def test_next():
+    expected = list(Pet().positive(seed=1))
+    datasets = Pet().positive(seed=1)
+
+    assert next(Pet().positive(seed=1)) == expected[0]
+    assert [next(datasets), next(datasets)] == expected[:2]
+    assert list(islice(datasets, 1)) == expected[2:3]
+    assert list(islice(datasets, 1)) == expected[3:4]
+    assert [dataset for dataset in datasets] == expected[4:]
+    assert list(datasets) == []
+    # Without next() the data set can be iterated several times
+    assert list(Pet().positive(seed=1)) == expected
+
+    suite = Pet().positive(strength=2, seed=1)
+    covering = list(Pet().positive(strength=2, seed=1))
+    assert next(suite) == covering[0]
+    assert [dataset for dataset in suite] == covering[1:]
+
+
+def test_count_does_not_generate_nested_datasets():
+    calls = []
+
+    class Inner(SGen):
+        value = Integer(positive_data_from=lambda: calls.append(1) or range(10))
+
+    class Outer(SGen):
+        inner = Nested(Inner())
+        other = Nested(Inner(), required=True)
+
+    schema = Outer().positive()
+
+    assert schema.count() == 12 * 11
+    assert len(calls) == 2
+
+
+def test_arbitrary_precision():
+    attrs = {
+        f'field_{index}': Integer(positive_data_from=lambda: range(10))
+        for index in range(30)
+    }
+    Wide = type('Wide', (SGen,), attrs)
+
+    assert Wide().count_positive() == 10 ** 30
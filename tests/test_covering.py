@@ -0,0 +1,67 @@
+from itertools import combinations, product
+
+from sgen import SGen
+from sgen.covering import covering_array
+from sgen.fields import Integer
+from tests import values
+
+
+def assert_covers(sizes, rows, strength):
+    for columns in combinations(range(len(sizes)), strength):
+        expected = set(product(*(range(sizes[column]) for column in columns)))
+        actual = {tuple(row[column] for column in columns) for row in rows}
+        assert expected <= actual
+
+
+def test_strength_one():
+    sizes = [3, 5, 2]
+    rows = covering_array(sizes, strength=1)
+
+    assert len(rows) == 5
+    assert_covers(sizes, rows, strength=1)
+
+
+def test_pairwise():
+    sizes = [3, 3, 4, 2, 5, 3, 2]
+    rows = covering_array(sizes, strength=2)
+
+    assert len(rows) < len(list(product(*map(range, sizes))))
+    assert_covers(sizes, rows, strength=2)
+
+
+def test_three_wise():
+    sizes = [2, 3, 2, 2, 3, 2]
+    rows = covering_array(sizes, strength=3)
+
+    assert_covers(sizes, rows, strength=3)
+
+
+def test_strength_greater_than_columns():
+    assert len(covering_array([2, 3], strength=5)) == 6
+
+
+def test_schema_pairwise():
+    class Test(SGen):
+        a = Integer(positive_data_from=values(1, 2, 3), negative_data_from=values('a'))
+        b = Integer(positive_data_from=values(4, 5, 6), negative_data_from=values('b'))
+        c = Integer(positive_data_from=values(7, 8), negative_data_from=values('c'))
+        d = Integer(positive_data_from=values(9, 10, 11), negative_data_from=values('d'))
+
+    positive = Test().positive(strength=2)
+    datasets = list(positive)
+
+    assert len(datasets) == len(positive)
+    assert positive.total == 54
+    assert positive.saved == positive.total - len(datasets)
+    for first, second in combinations('abcd', 2):
+        pairs = {(dataset[first], dataset[second]) for dataset in datasets}
+        expected = {
+            (dataset[first], dataset[second]) for dataset in Test().positive()
+        }
+        assert pairs == expected
+
+    negative = Test().negative(strength=2)
+
+    assert negative.total == len(list(Test().negative()))
+    assert {dataset['a'] for dataset in negative if dataset['a'] == 'a'} == {'a'}
+    assert len(list(negative)) == len(negative)
@@ -0,0 +1,126 @@
+import pickle
+from datetime import datetime
+
+import pytest
+
+from sgen import SGen
+from sgen.encoded import EncodedDatasets, column_dictionary, typecode
+from sgen.fields import Collection, DateTime, Integer, Nested, String
+from sgen.utils import Missing
+from tests import values
+
+
+CLOCK = datetime(2020, 1, 2, 3, 4, 5)
+
+
+class Inner(SGen):
+    x = Integer(positive_data_from=values(1, Missing()))
+
+
+class Test(SGen):
+    a = Integer(positive_data_from=values(1, Missing(), 3))
+    s = String()
+    created = DateTime()
+    inner = Nested(Inner())
+    items = Collection(data_type=Integer())
+
+
+class Plain(SGen):
+    a = Integer()
+    b = Integer()
+
+
+class Wide(SGen):
+    a = Integer(positive_data_from=values(*range(100)))
+    b = String(positive_data_from=values(*map(str, range(100))))
+
+
+@pytest.mark.parametrize('generate', [
+    lambda: Test().positive(seed=1, clock=CLOCK),
+    lambda: Test().negative(seed=1, clock=CLOCK),
+    lambda: Test().negative(mode='one_fault', seed=1, clock=CLOCK),
+    lambda: Plain().negative(seed=1),
+])
+def test_encoded_matches_datasets(generate):
+    datasets = generate()
+    expected = list(datasets)
+    encoded = datasets.encode()
+
+    assert len(encoded) == encoded.count() == len(expected)
+    assert list(encoded) == expected
+    assert [list(dataset) for dataset in encoded] == [list(dataset) for dataset in expected]
+    assert encoded[0] == expected[0]
+    assert encoded[-1] == expected[-1]
+    assert encoded[3:30] == expected[3:30]
+    assert encoded[::7] == expected[::7]
+
+
+def test_encoded_range():
+    datasets = Test().negative(seed=1, clock=CLOCK)
+    expected = list(datasets)
+
+    for start, stop in ((0, 1), (5, 60), (len(expected) - 3, len(expected) + 10), (10, 5)):
+        assert list(datasets.encode(start, stop)) == expected[start:stop]
+
+
+def test_encoded_serialization(tmp_path):
+    datasets = Test().negative(seed=1, clock=CLOCK)
+    encoded = datasets.encode()
+
+    assert list(EncodedDatasets.from_bytes(encoded.to_bytes())) == list(datasets)
+    assert list(pickle.loads(pickle.dumps(encoded))) == list(datasets)
+
+    path = tmp_path / 'negative.sgen'
+    encoded.save(path)
+    assert list(EncodedDatasets.load(path)) == list(datasets)
+
+    with pytest.raises(ValueError):
+        EncodedDatasets.from_bytes(b'not encoded')
+
+
+def test_encoding_is_compact():
+    datasets = Wide().positive()
+    encoded = datasets.encode()
+
+    assert encoded.stride == 0
+    assert encoded.indexes.itemsize == 1
+    assert len(encoded.indexes) == 2 * len(datasets)
+    assert len(encoded.to_bytes()) < len(pickle.dumps(list(datasets))) / 20
+
+
+def test_encode_huge_nested_product():
+    attrs = {
+        f'field_{index:02}': Integer(positive_data_from=values(*range(10)), negative_data_from=values(*'abcdefghij'))
+        for index in range(20)
+    }
+    Huge = type('Huge', (SGen,), attrs)
+
+    class Outer(SGen):
+        a = Integer(positive_data_from=values(1, 2), negative_data_from=values('a'))
+        inner = Nested(Huge())
+
+    assert Outer().positive().count() > 1 << 64
+
+    # In the one_fault mode the positive nested values are huge, the negative ones are not
+    for datasets in (Outer().positive(), Outer().negative(), Outer().negative(mode='one_fault')):
+        assert list(datasets.encode(0, 10)) == list(datasets.iter_range(0, 10))
+        assert list(datasets.encode(5, 15)) == list(datasets.iter_range(5, 15))
+
+    datasets = Outer().positive()
+    with pytest.raises(ValueError):
+        # Dictionary indexes of the last datasets do not fit into 64 bits
+        datasets.encode(datasets.count() - 1)
+
+
+def test_column_dictionary():
+    dictionary, indexes, present = column_dictionary([('a', 1), None, ('a', 2)])
+
+    assert dictionary == [1, 2]
+    assert indexes == [0, 0, 1]
+    assert present == [True, False, True]
+
+
+def test_typecode():
+    assert typecode(256) == 'B'
+    assert typecode(257) == 'H'
+    assert typecode(1 << 40) == 'Q'
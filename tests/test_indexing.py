@@ -0,0 +1,78 @@
+from datetime import datetime
+
+import pytest
+
+from sgen import SGen
+from sgen.fields import DateTime, Integer, Nested, String
+from sgen.product import decode
+from tests import values
+
+
+class Inner(SGen):
+    x = Integer(positive_data_from=values(1, 2), negative_data_from=values('x'))
+
+
+class Test(SGen):
+    a = Integer(positive_data_from=values(1, 2, 3), negative_data_from=values('a', 'aa'))
+    b = Integer(required=True, positive_data_from=values(4, 5), negative_data_from=values('b'))
+    c = Nested(Inner(), required=True)
+
+
+def test_decode():
+    assert decode(0, [3, 2, 4]) == [0, 0, 0]
+    assert decode(5, [3, 2, 4]) == [0, 1, 1]
+    assert decode(23, [3, 2, 4]) == [2, 1, 3]
+
+    with pytest.raises(IndexError):
+        decode(24, [3, 2, 4])
+
+
+def test_getitem_matches_iteration():
+    for datasets in (Test().positive(), Test().negative()):
+        expected = list(datasets)
+
+        assert [datasets[index] for index in range(len(expected))] == expected
+        assert datasets[-1] == expected[-1]
+        assert datasets[3:11] == expected[3:11]
+        assert datasets[1::3] == expected[1::3]
+        assert datasets[len(expected) - 2:] == expected[-2:]
+
+        with pytest.raises(IndexError):
+            datasets[len(expected)]
+
+
+def test_positive_at():
+    schema = Test()
+
+    assert schema.positive_at(0) == {'a': 1, 'b': 4, 'c': None}
+    assert schema.negative_at(0) == {'a': 'a', 'b': 4, 'c': None}
+
+
+def test_seeded_positive_at():
+    class Generated(SGen):
+        a = Integer()
+        b = String()
+        created = DateTime()
+
+    clock = datetime(2024, 1, 2)
+    positive = Generated().positive(seed=3, clock=clock)
+    negative = Generated().negative(seed=3, clock=clock)
+
+    assert Generated().positive_at(5, seed=3, clock=clock) == positive[5]
+    assert Generated().negative_at(5, seed=3, clock=clock) == negative[5]
+
+
+def test_huge_index():
+    attrs = {
+        f'field_{index:02}': Integer(positive_data_from=values(*range(10)))
+        for index in range(30)
+    }
+    Wide = type('Wide', (SGen,), attrs)
+    datasets = Wide().positive()
+
+    last = datasets[10 ** 30 - 1]
+    assert set(last.values()) == {9}
+    assert datasets[10 ** 29:10 ** 29 + 2] == [
+        {**{name: 0 for name in attrs}, 'field_00': 1},
+        {**{name: 0 for name in attrs}, 'field_00': 1, 'field_29': 1},
+    ]
@@ -0,0 +1,162 @@
+import csv
+import gzip
+import io
+import json
+from datetime import date, datetime
+
+import pytest
+
+from sgen import SGen
+from sgen.binary import iter_unpack, pack, unpack
+from sgen.fields import Boolean, Collection, Date, Integer, Nested, String
+from sgen.io import write
+from sgen.sequences import RepeatedSequence
+from sgen.utils import Missing
+from tests import values
+
+
+class Inner(SGen):
+    x = Integer(positive_data_from=values(1, 2))
+
+
+class Test(SGen):
+    a = Integer(positive_data_from=values(5, None, Missing()))
+    b = String(positive_data_from=values('é', 'a,b'))
+    c = Boolean(positive_data_from=values(True, False))
+    d = Date(positive_data_from=values(date(2020, 1, 2)))
+    e = Nested(Inner(), positive_data_from=values({'x': 1}))
+    f = Collection(data_type=Integer(), positive_data_from=values([1, 2]))
+
+
+def expected(datasets):
+    return [
+        {key: value.isoformat() if isinstance(value, date) else value for key, value in dataset.items()}
+        for dataset in datasets
+    ]
+
+
+@pytest.mark.parametrize('value', [
+    None, True, False, 0, 127, 128, -1, -32, -33, -129, 255, 256, 65536, 1 << 40, 1 << 63, (1 << 64) - 1,
+    -(1 << 63), 1.5, -0.0, '', 'é' * 40, 'a' * 300, 'a' * 70_000, b'\x00' * 300, [1, [2, 'x']],
+    list(range(20)), {'a': {'b': None}}, {str(i): i for i in range(20)},
+])
+def test_binary_roundtrip(value):
+    assert unpack(pack(value)) == (value, len(pack(value)))
+
+
+def test_binary_conversions():
+    assert unpack(pack(datetime(2020, 1, 2, 3, 4)))[0] == '2020-01-02T03:04:00'
+    assert unpack(pack(1 << 70))[0] == str(1 << 70)
+    assert unpack(pack(RepeatedSequence('a', 3)))[0] == ['a', 'a', 'a']
+    assert list(iter_unpack(pack(1) + pack('x'))) == [1, 'x']
+
+    with pytest.raises(ValueError):
+        unpack(pack('a' * 300)[:10])
+    with pytest.raises(ValueError):
+        unpack(b'\xcd\x01')
+    with pytest.raises(ValueError):
+        unpack(b'\xc1')
+
+
+@pytest.mark.parametrize('compress', [None, 'gzip'])
+def test_write_jsonl(tmp_path, compress):
+    path = tmp_path / 'out.jsonl'
+    stats = write(Test().positive(), path, compress=compress, buffer_size=10, chunk_size=3)
+
+    data = gzip.decompress(path.read_bytes()) if compress else path.read_bytes()
+    assert [json.loads(line) for line in data.decode().splitlines()] == expected(Test().positive())
+    assert stats.datasets == Test().positive().count()
+    assert stats.bytes == len(data)
+    assert stats.datasets_per_second > 0 and stats.bytes_per_second > 0
+
+
+def test_write_binary_to_file_object():
+    fh = io.BytesIO()
+    write(Test().negative(), fh, format='binary', chunk_size=7)
+
+    assert list(iter_unpack(fh.getvalue())) == expected(Test().negative())
+    assert not fh.closed
+
+
+def test_write_csv():
+    buffer = io.BytesIO()
+    write(Test().positive(), buffer, format='csv')
+
+    rows = list(csv.DictReader(io.StringIO(buffer.getvalue().decode())))
+    datasets = list(Test().positive())
+    assert list(rows[0]) == ['a', 'b', 'c', 'd', 'e', 'f']
+    assert len(rows) == len(datasets)
+
+    for row, dataset in zip(rows, datasets):
+        assert row['a'] == ('' if dataset.get('a') is None else str(dataset['a']))
+        assert row['b'] == dataset['b']
+        assert row['c'] == str(dataset['c']).lower()
+        assert row['d'] == '2020-01-02'
+        assert json.loads(row['e']) == dataset['e']
+        assert json.loads(row['f']) == dataset['f']
+
+
+def test_write_csv_iterable(tmp_path):
+    path = tmp_path / 'out.csv'
+    write(iter([{'a': 1, 'b': None}, {'a': 2}]), path, format='csv', chunk_size=1)
+    assert path.read_text() == 'a,b\n1,\n2,\n'
+
+    with pytest.raises(ValueError):
+        write(iter([{'a': 1}, {'b': 2}]), tmp_path / 'other.csv', format='csv', chunk_size=1)
+
+    write([{'a': 1, 'b': 2}], path, format='csv', fieldnames=['b', 'a'])
+    assert path.read_text() == 'b,a\n2,1\n'
+
+
+def test_write_text_file(tmp_path):
+    path = tmp_path / 'out.jsonl'
+    with open(path, 'w') as fh:
+        fh.write('# header\n')
+        write([{'a': 1}], fh)
+    assert path.read_text() == '# header\n{"a":1}\n'
+
+
+def test_write_string_io():
+    buffer = io.StringIO()
+    stats = write(Test().positive(), buffer, chunk_size=3)
+    assert [json.loads(line) for line in buffer.getvalue().splitlines()] == expected(Test().positive())
+    assert stats.bytes == len(buffer.getvalue().encode())
+
+    buffer = io.StringIO()
+    write([{'a': 'ä', 'b': None}], buffer, format='csv')
+    assert buffer.getvalue() == 'a,b\nä,\n'
+
+    with pytest.raises(ValueError):
+        write([{'a': 1}], io.StringIO(), format='binary')
+    with pytest.raises(ValueError):
+        write([{'a': 1}], io.StringIO(), compress='gzip')
+
+
+@pytest.mark.parametrize('format', ['jsonl', 'csv', 'binary'])
+def test_write_workers(format):
+    serial, parallel = io.BytesIO(), io.BytesIO()
+    write(Test().negative(), serial, format=format, chunk_size=5)
+    stats = write(Test().negative(), parallel, format=format, chunk_size=5, workers=2)
+
+    assert parallel.getvalue() == serial.getvalue()
+    assert stats.datasets == Test().negative().count()
+
+
+def test_write_workers_iterable():
+    serial, parallel = io.BytesIO(), io.BytesIO()
+    datasets = [{'a': index} for index in range(100)]
+    write(datasets, serial, chunk_size=7)
+    write(iter(datasets), parallel, chunk_size=7, workers=2)
+
+    assert parallel.getvalue() == serial.getvalue()
+
+
+def test_write_errors(tmp_path):
+    with pytest.raises(ValueError):
+        write([], tmp_path / 'out', format='xml')
+    with pytest.raises(ValueError):
+        write([], tmp_path / 'out', compress='zip')
+    with pytest.raises(ValueError):
+        write([], tmp_path / 'out', chunk_size=0)
+    with pytest.raises(ValueError):
+        write([], tmp_path / 'out', workers=0)
@@ -0,0 +1,78 @@
+import json
+from datetime import date, datetime
+
+import pytest
+
+from sgen import SGen
+from sgen.fields import Boolean, Collection, Date, DateTime, Float, Integer, Nested, String
+from sgen.fragments import compose, encode, fragment_column
+from sgen.utils import Missing
+from tests import values
+
+
+CLOCK = datetime(2020, 1, 2, 3, 4, 5)
+
+
+class Inner(SGen):
+    x = Integer(positive_data_from=values(1, Missing()))
+    born = Date()
+
+
+class Test(SGen):
+    a = Integer()
+    b = Float()
+    c = Boolean()
+    s = String()
+    created = DateTime()
+    inner = Nested(Inner())
+    items = Collection(data_type=Integer())
+    listed = Nested(Inner(), positive_data_from=values({'x': 1}, Missing()))
+
+
+def test_fragments():
+    column = [('a', 1), None, ('a', 'é')]
+    fragments = fragment_column(column)
+
+    assert fragments == [b',"a":1', b'', ',"a":"é"'.encode()]
+    assert compose([b'', fragments[0], b',"b":null']) == b'{"a":1,"b":null}'
+    assert compose([b'', b'']) == b'{}'
+    assert encode({'d': date(2020, 1, 2)}) == b'{"d":"2020-01-02"}'
+
+
+@pytest.mark.parametrize('generate, datasets', [
+    (lambda: Test().positive_json(seed=1, clock=CLOCK), lambda: Test().positive(seed=1, clock=CLOCK)),
+    (lambda: Test().negative_json(seed=1, clock=CLOCK), lambda: Test().negative(seed=1, clock=CLOCK)),
+    (
+        lambda: Test().negative_json(mode='one_fault', seed=1, clock=CLOCK),
+        lambda: Test().negative(mode='one_fault', seed=1, clock=CLOCK),
+    ),
+])
+def test_json_matches_datasets(generate, datasets):
+    expected = [encode(dataset) for dataset in datasets()]
+
+    assert list(generate()) == expected
+    assert [json.loads(item) for item in generate()] == [json.loads(item) for item in expected]
+
+
+def test_missing_fields_are_skipped():
+    class Partial(SGen):
+        a = Integer(positive_data_from=values(Missing(), 1))
+        b = Integer(positive_data_from=values(Missing(), 2))
+
+    assert list(Partial().positive_json()) == [b'{}', b'{"b":2}', b'{"a":1}', b'{"a":1,"b":2}']
+
+
+def test_json_at():
+    datasets = Test().negative(seed=1, clock=CLOCK)
+    expected = [encode(dataset) for dataset in datasets]
+
+    for index in (0, 1, len(expected) // 2, len(expected) - 1, -1):
+        assert datasets.json_at(index) == expected[index]
+
+    with pytest.raises(IndexError):
+        datasets.json_at(len(expected))
+
+
+def test_compiled_json():
+    datasets = Test().positive(seed=1, clock=CLOCK)
+    assert list(datasets.compile().iter_json()) == list(datasets.iter_json())
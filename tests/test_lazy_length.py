@@ -0,0 +1,142 @@
+import json
+
+import pytest
+
+from sgen import SGen, Length
+from sgen.fields import Collection, Integer, String
+from sgen.sequences import RepeatedSequence, LAZY_LENGTH
+from sgen.utils import estimate_cost
+from tests import values
+
+
+def test_huge_string_boundaries():
+    field = String(validate=Length(min=1, max=10_000_000))
+
+    lengths = sorted(len(value) for value in field.positive() if isinstance(value, str))
+    assert lengths[0] == 1
+    assert lengths[-1] == 10_000_000
+
+    lengths = sorted(len(value) for value in field.negative() if isinstance(value, str))
+    assert lengths[-1] == 10_000_001
+
+
+def test_string_memory_limit():
+    field = String(validate=Length(max=1000, memory_limit=100))
+
+    with pytest.raises(ValueError):
+        list(field.positive())
+
+
+def test_string_without_memory_limit():
+    from sgen.sequences import MEMORY_LIMIT
+
+    field = String(validate=Length(max=MEMORY_LIMIT + 1))
+
+    assert MEMORY_LIMIT + 1 in {len(value) for value in field.positive() if isinstance(value, str)}
+
+
+def test_string_random_batch_memory_limit():
+    field = String(validate=Length(max=1000, memory_limit=100))
+
+    with pytest.raises(ValueError):
+        field.random_batch(1)
+
+
+def test_huge_collection_boundaries():
+    field = Collection(
+        data_type=Integer(positive_data_from=values(1, 2)),
+        validate=Length(min=1, max=10 ** 12, lazy=True),
+    )
+
+    lists = [value for value in field.positive() if isinstance(value, (list, RepeatedSequence))]
+    huge = [value for value in lists if len(value) == 10 ** 12]
+
+    assert [value.value for value in huge] == [1, 2]
+    assert all(isinstance(value, RepeatedSequence) for value in huge)
+    assert estimate_cost(huge[0]) == 1 + 10 ** 12
+
+    with pytest.raises(ValueError):
+        huge[0].materialize()
+
+
+def test_small_collection_boundaries_are_lists():
+    field = Collection(
+        data_type=Integer(positive_data_from=values(1)),
+        validate=Length(max=LAZY_LENGTH),
+    )
+
+    assert [1] * LAZY_LENGTH in list(field.positive())
+    assert all(not isinstance(value, RepeatedSequence) for value in field.positive())
+
+
+def test_long_collection_boundaries_are_lists_by_default():
+    field = Collection(
+        data_type=Integer(positive_data_from=values(1)),
+        validate=Length(max=LAZY_LENGTH + 1),
+    )
+
+    lists = [value for value in field.positive() if isinstance(value, list)]
+
+    assert [1] * (LAZY_LENGTH + 1) in lists
+    assert json.loads(json.dumps(lists)) == lists
+
+
+def test_collection_memory_limit():
+    field = Collection(
+        data_type=Integer(positive_data_from=values(1)),
+        validate=Length(max=1000, memory_limit=100),
+    )
+
+    with pytest.raises(ValueError):
+        list(field.positive())
+
+
+def test_repeated_sequence():
+    sequence = RepeatedSequence('a', 5)
+
+    assert sequence == ['a'] * 5
+    assert ['a'] * 5 == sequence
+    assert sequence != ['a'] * 4
+    assert list(sequence) == sequence.materialize() == ['a'] * 5
+    assert sequence[-1] == 'a'
+    assert sequence[1:3] == ['a', 'a']
+    assert sequence * 2 == ['a'] * 10
+    assert 'a' in sequence and 'b' not in sequence
+    assert hash(sequence) == hash(RepeatedSequence('a', 5))
+
+    with pytest.raises(IndexError):
+        sequence[5]
+
+
+def test_schema_with_huge_collection():
+    class Test(SGen):
+        items = Collection(
+            data_type=Integer(positive_data_from=values(7)),
+            validate=Length(max=10 ** 9, lazy=True),
+            required=True,
+        )
+
+    datasets = Test().positive()
+
+    assert len(datasets[0]['items']) == 10 ** 9
+    assert datasets.cost(1) == 1 + 1 + 10 ** 9
+
+
+def test_custom_type_without_memory_limit():
+    from sgen.fields import Field
+
+    class Letters(Field):
+        def set_positive_values(self):
+            pass
+
+        def set_negative_values(self):
+            self._register(1)
+
+        def generate(self, length):
+            return 'x' * length
+
+    class Test(SGen):
+        name = Letters(validate=Length(min=1, max=3))
+
+    assert sorted(dataset.get('name') for dataset in Test().positive() if dataset.get('name')) == ['x', 'xxx']
+    assert {'', 'xxxx'} <= {value for value in Letters(validate=Length(min=1, max=3)).negative()}
@@ -0,0 +1,129 @@
+import json
+import pickle
+
+from sgen import SGen
+from sgen.fields import Boolean, Field, Integer, Nested
+from sgen.sequences import LazyValues
+from sgen.utils import Missing, estimate_cost
+from tests import values
+
+
+class Inner(SGen):
+    x = Integer(positive_data_from=values(1, 2), negative_data_from=values('x'))
+    y = Integer(required=True, positive_data_from=values(3, 4, 5), negative_data_from=values('y'))
+
+
+class Outer(SGen):
+    a = Integer(positive_data_from=values(1, 2))
+    inner = Nested(Inner(), required=True, allow_none=True)
+
+
+def plain(value):
+    return Missing if isinstance(value, Missing) else value
+
+
+def wide(size):
+    attrs = {
+        f'field_{index:02}': Integer(positive_data_from=values(*range(10)))
+        for index in range(size)
+    }
+    return type('Wide', (SGen,), attrs)
+
+
+def test_value_sequence_matches_positive():
+    field = Nested(Inner(), required=True, allow_none=True)
+
+    for is_positive in (True, False):
+        sequence = field.value_sequence(is_positive)
+        expected = list(Field.positive(field) if is_positive else Field.negative(field))
+
+        assert isinstance(sequence, LazyValues)
+        assert list(map(plain, sequence)) == list(map(plain, expected))
+        assert [plain(sequence[index]) for index in range(len(sequence))] == list(map(plain, expected))
+        assert sequence[-1] == expected[-1]
+
+
+def test_data_from_is_not_lazy():
+    field = Nested(Inner(), positive_data_from=values({'x': 1}))
+
+    assert field.value_sequence(is_positive=True) == [{'x': 1}]
+
+
+def test_datasets_unchanged():
+    schema = Outer()
+
+    positive = list(schema.positive())
+    negative = list(schema.negative())
+
+    assert positive == [
+        {'a': a, 'inner': inner}
+        for a in (1, 2)
+        for inner in [None] + [{'x': x, 'y': y} for x in (1, 2) for y in (3, 4, 5)]
+    ]
+    assert len(negative) == schema.count_negative()
+
+
+def test_nested_product_is_not_materialized():
+    Huge = wide(30)
+
+    class Test(SGen):
+        a = Integer(positive_data_from=values(1, 2))
+        inner = Nested(Huge(), required=True)
+
+    schema = Test()
+
+    assert schema.count_positive() == 2 * (10 ** 30 + 1)
+    assert schema.positive_at(2 * (10 ** 30 + 1) - 1) == {'a': 2, 'inner': {f'field_{index:02}': 9 for index in range(30)}}
+
+    datasets = schema.positive()
+    assert next(iter(datasets)) == {'a': 1, 'inner': None}
+    assert datasets[1] == {'a': 1, 'inner': {f'field_{index:02}': 0 for index in range(30)}}
+    assert datasets.cost(2) == 3 + 33
+
+
+def test_cost_matches_materialized():
+    datasets = Outer().positive()
+
+    assert datasets.cost(len(datasets)) == sum(
+        1 + sum(map(estimate_cost, dataset.values()))
+        for dataset in datasets
+    )
+    assert [datasets.cost(index) for index in range(4)] == [0, 3, 8, 13]
+
+
+def test_compiled_pickle():
+    datasets = Outer().positive()
+    compiled = pickle.loads(pickle.dumps(datasets.compile()))
+
+    assert list(compiled) == list(datasets)
+
+
+def test_codegen_with_lazy_column():
+    schema = Outer().compile()
+
+    assert list(schema.positive()) == list(Outer().positive())
+
+
+def test_default_equal_to_a_nested_dataset():
+    class Flag(SGen):
+        x = Boolean(allow_none=False, required=True)
+
+    class Flagged(SGen):
+        n = Nested(Flag(), default={'x': True}, allow_none=False)
+        a = Integer(positive_data_from=values(1, 2))
+
+    schema = Flagged()
+    datasets = schema.positive()
+    expected = [
+        {'a': 1, 'n': {'x': True}}, {'a': 1}, {'a': 1, 'n': {'x': False}},
+        {'a': 2, 'n': {'x': True}}, {'a': 2}, {'a': 2, 'n': {'x': False}},
+    ]
+
+    assert list(datasets) == expected
+    assert schema.count_positive() == len(datasets) == 6
+    assert [datasets[index] for index in range(6)] == expected
+    assert [json.loads(line) for line in datasets.iter_json()] == expected
+    assert [json.loads(datasets.json_at(index)) for index in range(6)] == expected
+    assert list(datasets.encode()) == expected
+    assert list(datasets.compile()) == expected
+    assert list(Flag().positive().find({'x': False})) == [1]
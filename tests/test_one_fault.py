@@ -0,0 +1,70 @@
+import pytest
+
+from sgen import SGen
+from sgen.fields import Collection, Integer, Nested, String
+from sgen.validate import Length, OneOf, Range
+from tests import values
+
+
+class Simple(SGen):
+    a = Integer(positive_data_from=values(1, 2, 3), negative_data_from=values('a1', 'a2'))
+    b = Integer(positive_data_from=values(4, 5), negative_data_from=values('b1'))
+    c = Integer(positive_data_from=values(6, 7, 8, 9), negative_data_from=values('c1', 'c2', 'c3'))
+
+
+class Pet(SGen):
+    name = String(required=True, allow_none=False, validate=OneOf(choices=['Rex', 'Tom']))
+    age = Integer(validate=Range(min=0, max=30))
+
+
+class Owner(SGen):
+    name = String(validate=Length(min=1, max=10))
+    age = Integer(validate=Range(min=18))
+    pet = Nested(Pet())
+    pets = Collection(data_type=Nested(Pet(), required=True))
+
+
+def test_every_negative_value_once():
+    datasets = list(Simple().negative(mode='one_fault'))
+
+    assert len(datasets) == 6
+    invalid = [
+        [value for value in dataset.values() if isinstance(value, str)]
+        for dataset in datasets
+    ]
+    assert invalid == [['a1'], ['a2'], ['b1'], ['c1'], ['c2'], ['c3']]
+    assert datasets[0] == {'a': 'a1', 'b': 4, 'c': 6}
+    assert datasets[4] == {'a': 2, 'b': 5, 'c': 'c2'}
+
+
+def test_linear_size():
+    product = Owner().count_negative()
+    one_fault = Owner().negative(mode='one_fault')
+    datasets = list(one_fault)
+
+    assert len(datasets) == one_fault.count() < product / 100
+
+
+def test_nested_follow_mode():
+    datasets = Owner().negative(mode='one_fault')
+    pet = next(fields[0] for fields in datasets.blocks if fields[0].attr_name == 'pet')
+    expected = Pet().negative(mode='one_fault').count()
+
+    assert expected < Pet().count_negative()
+    assert datasets.context.count(pet) == expected
+    assert len(datasets.context.values(pet)) == expected
+    assert len(list(datasets)) == datasets.count()
+
+
+def test_random_access():
+    datasets = Owner().negative(mode='one_fault')
+    expected = list(datasets)
+
+    assert [datasets[index] for index in range(len(expected))] == expected
+    assert datasets[5:40] == expected[5:40]
+    assert sum((list(datasets.shard(shard, 3)) for shard in range(3)), []) == expected
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        Simple().negative(mode='pairwise')
@@ -0,0 +1,47 @@
+import pickle
+
+from sgen import SGen
+from sgen.fields import Collection, Integer, Nested, String
+from sgen.validate import Length, OneOf
+
+
+class Inner(SGen):
+    x = Integer(positive_data_from=lambda: (1, 2), negative_data_from=lambda: ('x',))
+    y = String(validate=OneOf(choices=['a', 'b']))
+
+
+class Test(SGen):
+    a = Integer(positive_data_from=lambda: range(7), negative_data_from=lambda: ('a', 'aa'))
+    b = Collection(data_type=Integer(), validate=Length(min=1, max=3))
+    c = Nested(Inner())
+
+
+def test_compiled_datasets_are_picklable():
+    datasets = Test().negative()
+    compiled = pickle.loads(pickle.dumps(datasets.compile()))
+
+    assert list(compiled) == list(datasets)
+    assert compiled.count() == datasets.count()
+    assert compiled[17] == datasets[17]
+
+
+def test_parallel_ordered():
+    datasets = Test().positive()
+
+    assert list(datasets.parallel(workers=2, chunk_size=50)) == list(datasets)
+
+
+def test_parallel_unordered():
+    datasets = Test().negative()
+    actual = list(datasets.parallel(workers=2, ordered=False, chunk_size=50))
+
+    assert sorted(map(repr, actual)) == sorted(map(repr, datasets))
+
+
+def test_schema_workers():
+    schema = Test()
+
+    assert len(list(schema.negative(workers=2))) == schema.count_negative()
+    assert len(list(schema.positive(workers=2, shard=1, num_shards=3))) == len(
+        list(schema.positive(shard=1, num_shards=3))
+    )
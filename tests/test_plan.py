@@ -0,0 +1,84 @@
+import sgen.sgen
+from sgen import SGen
+from sgen.fields import Integer, String
+
+
+class Base(SGen):
+    name = String()
+
+
+class Test(Base):
+    age = Integer()
+
+
+def test_plan_is_compiled_per_class(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("getmembers must not be called")
+
+    monkeypatch.setattr(sgen.sgen, 'getmembers', fail)
+
+    first, second = Test(), Test()
+    fields = first.fields(is_positive=True)
+
+    assert [field.attr_name for field in fields] == ['age', 'name']
+    assert [field.field for field in fields] == [Test.age, Test.name]
+    assert all(field.is_positive for field in fields)
+    assert first.fields(is_positive=False)[0].data_generator == Test.age.negative
+    assert second.fields(is_positive=True) == fields
+    assert len(list(second.positive())) == 9
+
+
+def test_plan_is_inherited():
+    assert [name for name, _ in Base._plan.kinds] == ['name']
+    assert Test._plan.kinds == (('age', Integer), ('name', String))
+
+
+def test_instance_fields():
+    schema = Base()
+    schema.extra = Integer(positive_data_from=lambda: (1, 2))
+
+    assert [field.attr_name for field in schema.fields(is_positive=True)] == ['extra', 'name']
+    assert [field.attr_name for field in Base().fields(is_positive=True)] == ['name']
+
+
+def test_fields_assigned_to_the_class():
+    class Changed(SGen):
+        a = Integer(positive_data_from=lambda: (1, 2))
+
+    class Child(Changed):
+        pass
+
+    fingerprint = Changed().fingerprint()
+    assert len(list(Child().positive())) == 2
+
+    Changed.b = Integer(positive_data_from=lambda: (3, 4, 5))
+    assert [field.attr_name for field in Changed().fields(is_positive=True)] == ['a', 'b']
+    assert len(list(Changed().positive())) == 6
+    assert len(list(Child().positive())) == 6
+    assert Changed().fingerprint() != fingerprint
+
+    del Changed.b
+    assert len(list(Child().positive())) == 2
+    assert Changed().fingerprint() == fingerprint
+
+
+def test_abc_mixin():
+    from abc import ABC, abstractmethod
+
+    class Named(SGen, ABC):
+        name = String()
+
+        @abstractmethod
+        def title(self) -> str:
+            pass
+
+    class Person(Named):
+        age = Integer(positive_data_from=lambda: (1, 2))
+
+        def title(self) -> str:
+            return 'person'
+
+    assert [field.attr_name for field in Person().fields(is_positive=True)] == ['age', 'name']
+
+    Person.extra = Integer(positive_data_from=lambda: (3,))
+    assert [field.attr_name for field in Person().fields(is_positive=True)] == ['age', 'extra', 'name']
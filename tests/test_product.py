@@ -0,0 +1,47 @@
+from itertools import islice, product
+
+from sgen import SGen
+from sgen.fields import Integer, String
+from sgen.product import odometer
+
+
+def test_odometer_matches_product():
+    columns = [[1, 2, 3], ['a'], [True, False], [None, 0]]
+
+    assert [list(combination) for combination in odometer(columns)] == [
+        list(combination) for combination in product(*columns)
+    ]
+
+
+def test_odometer_empty_column():
+    assert list(odometer([[1, 2], []])) == []
+
+
+def test_odometer_no_columns():
+    assert [list(combination) for combination in odometer([])] == [[]]
+
+
+def test_wide_schema():
+    attrs = {
+        f'field_{index:04}': Integer(positive_data_from=lambda: (1, 2))
+        for index in range(1000)
+    }
+    Wide = type('Wide', (SGen,), attrs)
+
+    datasets = list(islice(Wide().positive(), 3))
+
+    assert len(datasets[0]) == 1000
+    assert datasets[0]['field_0999'] == 1
+    assert datasets[1]['field_0999'] == 2
+    assert datasets[2]['field_0998'] == 2
+    assert datasets[2]['field_0999'] == 1
+
+
+def test_missing_fields_are_dropped():
+    class Test(SGen):
+        name = String(required=True, allow_none=False)
+        age = Integer(allow_none=False)
+
+    for dataset in Test().positive():
+        assert 'name' in dataset
+        assert list(dataset) in (['age', 'name'], ['name'])
@@ -0,0 +1,69 @@
+from datetime import datetime
+
+import pytest
+
+from sgen import SGen, Length, OneOf, Range
+from sgen.fields import Boolean, Collection, DateTime, Integer, Nested, String
+
+
+CLOCK = datetime(2024, 6, 1)
+
+
+class Inner(SGen):
+    x = Integer(validate=Range(min=0, max=3))
+    y = String(positive_data_from=lambda: ['a', 'b'])
+
+
+class Test(SGen):
+    a = Integer(validate=Range(min=10, max=20))
+    b = String(validate=Length(min=2, max=4))
+    c = String(validate=OneOf(choices=['x', 'y']))
+    d = Nested(Inner())
+    e = Collection(data_type=Integer(validate=Range(min=0, max=9)), validate=Length(min=1, max=3))
+    f = Collection(data_type=Inner())
+    g = Boolean()
+    h = DateTime()
+
+
+def test_records_are_valid():
+    records = list(Test().records(500, chunk_size=64, clock=CLOCK))
+
+    assert len(records) == 500
+    for record in records:
+        assert 10 <= record['a'] <= 20
+        assert 2 <= len(record['b']) <= 4
+        assert record['c'] in ('x', 'y')
+        assert 0 <= record['d']['x'] <= 3 and record['d']['y'] in ('a', 'b')
+        assert 1 <= len(record['e']) <= 3 and all(0 <= item <= 9 for item in record['e'])
+        assert 1 <= len(record['f']) <= 5 and all(set(item) == {'x', 'y'} for item in record['f'])
+        assert isinstance(record['g'], bool)
+        assert isinstance(record['h'], datetime)
+
+
+def test_records_are_reproducible():
+    first = list(Test().records(200, chunk_size=50, seed=4, clock=CLOCK))
+
+    assert first == list(Test().records(200, chunk_size=50, seed=4, clock=CLOCK))
+    assert first != list(Test().records(200, chunk_size=50, seed=5, clock=CLOCK))
+
+
+def test_missing_from_data_from():
+    from sgen.utils import Missing
+
+    class Optional(SGen):
+        a = Integer(positive_data_from=lambda: [1, Missing()])
+
+    records = list(Optional().records(200, seed=1))
+
+    assert {len(record) for record in records} == {0, 1}
+    assert all(record.get('a', 1) == 1 for record in records)
+
+
+def test_records_parameters():
+    assert list(Test().records(0)) == []
+
+    with pytest.raises(ValueError):
+        list(Test().records(10, chunk_size=0))
+
+    with pytest.raises(ValueError):
+        list(Test().records(-1))
@@ -0,0 +1,86 @@
+import subprocess
+import sys
+from datetime import datetime
+
+import pytest
+
+from sgen import SGen
+from sgen.fields import Collection, DateTime, Integer, Nested, String
+from sgen.fingerprint import format_dataset_id, parse_dataset_id
+from sgen.validate import Length, Range
+
+
+CLOCK = datetime(2024, 1, 2, 3, 4, 5)
+
+
+class Inner(SGen):
+    x = Integer(validate=Range(min=1, max=10))
+    y = String()
+
+
+class Test(SGen):
+    a = Integer()
+    b = String(validate=Length(min=1, max=5), required=True)
+    c = Collection(data_type=Integer())
+    d = Nested(Inner())
+    e = DateTime()
+
+
+class Changed(SGen):
+    a = Integer()
+    b = String(validate=Length(min=1, max=6), required=True)
+    c = Collection(data_type=Integer())
+    d = Nested(Inner())
+    e = DateTime()
+
+
+def test_replay_positive_and_negative():
+    for datasets in (
+        Test().positive(seed=11, clock=CLOCK),
+        Test().negative(seed=11, clock=CLOCK),
+        Test().negative(seed='nightly', clock=CLOCK, mode='one_fault'),
+    ):
+        for index in (0, 7, datasets.count() - 1):
+            dataset_id = datasets.dataset_id(index)
+
+            assert repr(Test().replay(dataset_id, clock=CLOCK)) == repr(datasets[index])
+
+
+def test_fingerprint():
+    assert Test().fingerprint() == Test().fingerprint()
+    assert Test().fingerprint() != Changed().fingerprint()
+
+
+def test_fingerprint_is_stable_across_processes():
+    code = "from tests.test_replay import Test; print(Test().fingerprint())"
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+
+    assert output.strip() == Test().fingerprint()
+
+
+def test_replay_other_schema():
+    dataset_id = Test().positive(seed=1).dataset_id(0)
+
+    with pytest.raises(ValueError):
+        Changed().replay(dataset_id)
+
+
+def test_dataset_id_requires_seed():
+    with pytest.raises(ValueError):
+        Test().positive().dataset_id(0)
+
+    with pytest.raises(IndexError):
+        Test().positive(seed=1).dataset_id(10 ** 9)
+
+
+def test_dataset_id_format():
+    assert format_dataset_id('abc', 5, 'n', 12) == 'abc:5:n12'
+    assert parse_dataset_id('abc:5:n12') == ('abc', 5, 'n', 12)
+    assert parse_dataset_id('abc:a:b:p0') == ('abc', 'a:b', 'p', 0)
+
+    with pytest.raises(ValueError):
+        format_dataset_id('abc', '5', 'n', 12)
+
+    for malformed in ('abc', 'abc:5', 'abc:5:x1', 'abc:5:n', 'abc::p1'):
+        with pytest.raises(ValueError):
+            parse_dataset_id(malformed)
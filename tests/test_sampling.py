@@ -0,0 +1,83 @@
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+from sgen import SGen
+from sgen.datasets import _stratify
+from sgen.fields import DateTime, Integer, String
+from tests import values
+
+
+class Test(SGen):
+    a = Integer(positive_data_from=values(*range(10)), negative_data_from=values(*'abcdefgh'))
+    b = Integer(positive_data_from=values(*range(10)), negative_data_from=values('b'))
+    c = Integer(positive_data_from=values(*range(10)), negative_data_from=values('c'))
+
+
+def test_sample_is_distinct_and_valid():
+    datasets = Test().positive()
+    sample = datasets.sample(50, seed=1)
+
+    assert len(sample) == 50
+    assert len({tuple(dataset.items()) for dataset in sample}) == 50
+    assert all(dataset in list(datasets) for dataset in sample[:5])
+
+
+def test_sample_is_reproducible():
+    schema = Test()
+
+    assert schema.sample_positive(20, seed=7) == schema.sample_positive(20, seed=7)
+    assert schema.sample_positive(20, seed=7) != schema.sample_positive(20, seed=8)
+
+
+def test_sampled_values_are_reproducible():
+    class Generated(SGen):
+        a = Integer()
+        b = String()
+        created = DateTime()
+
+    clock = datetime(2024, 1, 2)
+
+    assert Generated().sample_positive(5, seed=1, clock=clock) == Generated().sample_positive(5, seed=1, clock=clock)
+    assert Generated().sample_negative(5, seed=1, clock=clock) == Generated().sample_negative(5, seed=1, clock=clock)
+    assert Generated().sample_positive(5, seed=1, clock=clock) == Generated().positive(seed=1, clock=clock).sample(5, seed=1)
+
+
+def test_sample_whole_population():
+    datasets = Test().positive()
+
+    assert datasets.sample(1000, seed=0) == list(datasets)
+
+    with pytest.raises(ValueError):
+        datasets.sample(1001)
+
+
+def test_sample_huge_population():
+    attrs = {
+        f'field_{index:02}': Integer(positive_data_from=values(*range(10)))
+        for index in range(30)
+    }
+    Wide = type('Wide', (SGen,), attrs)
+
+    assert len(Wide().sample_positive(100, seed=3)) == 100
+
+
+def test_stratified_negative():
+    sample = Test().sample_negative(3, seed=5, stratified=True)
+    invalid = Counter(
+        name for dataset in sample for name, value in dataset.items() if isinstance(value, str)
+    )
+
+    assert invalid == {'a': 1, 'b': 1, 'c': 1}
+
+    with pytest.raises(ValueError):
+        Test().sample_negative(2, stratified=True)
+
+
+def test_stratify():
+    assert _stratify(3, [800, 100, 100]) == [1, 1, 1]
+    assert _stratify(10, [800, 100, 100]) == [8, 1, 1]
+    assert _stratify(10, [0, 5, 100]) == [0, 1, 9]
+    assert _stratify(6, [2, 2, 2]) == [2, 2, 2]
+    assert sum(_stratify(7, [3, 3, 3])) == 7
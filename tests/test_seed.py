@@ -0,0 +1,108 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from threading import Barrier
+
+from sgen import SGen
+from sgen.fields import Collection, Date, DateTime, Field, Float, Integer, Nested, String
+from sgen.rng import get_random
+from sgen.validate import Length, OneOf
+
+
+CLOCK = datetime(2024, 5, 17, 12, 30)
+
+
+class Inner(SGen):
+    x = Integer()
+    y = String(validate=Length(min=2, max=5))
+
+
+class Test(SGen):
+    a = Integer()
+    b = String()
+    c = Float(validate=OneOf(choices=[1.5, 2.5]))
+    d = Collection(data_type=Integer(), validate=Length(min=1, max=3))
+    e = Nested(Inner())
+    f = DateTime()
+    g = Date()
+
+
+class Smaller(SGen):
+    a = Integer()
+    b = String()
+
+
+def dump(datasets):
+    return [repr(dataset) for dataset in datasets]
+
+
+def test_same_seed_same_data():
+    assert dump(Test().positive(seed=1, clock=CLOCK)) == dump(Test().positive(seed=1, clock=CLOCK))
+    assert dump(Test().negative(seed=1, clock=CLOCK)) == dump(Test().negative(seed=1, clock=CLOCK))
+
+
+def test_different_seeds():
+    assert dump(Test().positive(seed=1, clock=CLOCK)) != dump(Test().positive(seed=2, clock=CLOCK))
+
+
+def test_frozen_clock():
+    datasets = Test().positive(seed=1, clock=lambda: CLOCK)
+
+    assert {dataset.get('f') for dataset in datasets} == {CLOCK, None}
+    assert {dataset.get('g') for dataset in datasets} == {CLOCK.date(), None}
+
+
+def test_values_do_not_depend_on_other_fields():
+    small = Smaller().positive(seed=5)
+    big = Test().positive(seed=5)
+
+    assert {(dataset.get('a'), dataset.get('b')) for dataset in small} == {
+        (dataset.get('a'), dataset.get('b')) for dataset in big
+    }
+
+
+def test_negative_uses_positive_values():
+    positive = {dataset.get('a') for dataset in Smaller().positive(seed=9)}
+    negative = {dataset.get('a') for dataset in Smaller().negative(seed=9)}
+
+    assert {value for value in negative if not isinstance(value, str)} == positive
+
+
+def test_parallel_matches_serial():
+    serial = dump(Test().negative(seed=3, clock=CLOCK))
+    parallel = dump(Test().negative(seed=3, clock=CLOCK, workers=2))
+
+    assert parallel == serial
+
+
+def test_concurrent_generation_of_one_schema():
+    schema = Test()
+    expected = {seed: dump(Test().negative(seed=seed, clock=CLOCK)) for seed in range(4)}
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = executor.map(lambda seed: dump(schema.negative(seed=seed, clock=CLOCK)), range(4))
+
+    assert dict(zip(range(4), results)) == expected
+
+
+def test_calls_do_not_share_values():
+    barriers = []
+
+    class Paused(Field):
+        def set_positive_values(self):
+            self.values.append(get_random().random())
+            for barrier in barriers:
+                # Both calls register their values at the same time
+                barrier.wait()
+            self.values.append(get_random().random())
+
+    class Schema(SGen):
+        a = Paused(allow_none=False, required=True)
+
+    expected = [list(Schema().positive(seed=seed)) for seed in (1, 2)]
+
+    schema = Schema()
+    barriers.append(Barrier(2, timeout=5))
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(lambda seed: list(schema.positive(seed=seed)), (1, 2)))
+
+    assert results == expected
@@ -0,0 +1,70 @@
+from itertools import product
+
+import pytest
+
+from sgen import SGen
+from sgen.fields import Collection, Integer, Nested, String
+from sgen.product import prefix_cost
+from sgen.validate import Length
+from tests import values
+
+
+class Inner(SGen):
+    x = Integer(positive_data_from=values(1, 2), negative_data_from=values('x'))
+    y = String(validate=Length(min=1, max=3))
+
+
+class Test(SGen):
+    a = Integer(positive_data_from=values(1, 2, 3), negative_data_from=values('a', 'aa'))
+    b = Collection(data_type=Integer(), validate=Length(min=1, max=20))
+    c = Nested(Inner())
+
+
+def test_prefix_cost():
+    columns = [[1, 0, 2], [5, 1], [0, 3, 1, 1]]
+    cumulative = [[0, 1, 1, 3], [0, 5, 6], [0, 0, 3, 4, 5]]
+    sizes = [3, 2, 4]
+    costs = [sum(combination) for combination in product(*columns)]
+
+    for index in range(len(costs) + 1):
+        assert prefix_cost(index, sizes, cumulative) == sum(costs[:index])
+
+
+@pytest.mark.parametrize('num_shards', [1, 2, 3, 7, 50])
+def test_shards_union_is_serial_output(num_shards):
+    for method in ('positive', 'negative'):
+        schema = Test()
+        datasets = getattr(schema, method)()
+        expected = list(datasets)
+
+        bounds = [datasets.shard_bounds(shard, num_shards) for shard in range(num_shards)]
+        assert bounds[0][0] == 0
+        assert bounds[-1][1] == len(expected)
+        assert all(left[1] == right[0] for left, right in zip(bounds, bounds[1:]))
+
+        actual = []
+        for shard in range(num_shards):
+            actual += list(datasets.shard(shard, num_shards))
+        assert actual == expected
+
+
+def test_shards_are_balanced_by_cost():
+    datasets = Test().negative()
+    count = len(datasets)
+    total = datasets.cost(count)
+
+    for shard in range(4):
+        start, stop = datasets.shard_bounds(shard, 4)
+        assert abs(datasets.cost(stop) - datasets.cost(start) - total / 4) <= total / count * 50
+
+
+def test_schema_shard_parameters():
+    class Simple(SGen):
+        a = Integer(positive_data_from=values(*range(10)))
+
+    assert list(Simple().positive(shard=1, num_shards=2)) == [{'a': value} for value in range(5, 10)]
+
+    with pytest.raises(ValueError):
+        Simple().positive(shard=2, num_shards=2)
+    with pytest.raises(ValueError):
+        Simple().positive(shard=0)
@@ -0,0 +1,92 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pytest
+
+from sgen import SGen
+from sgen.fields import Collection, DateTime, Float, Integer, Nested, String
+from sgen.store import DatasetStore, write_store
+
+
+CLOCK = datetime(2020, 1, 2, 3, 4, 5)
+
+
+class Inner(SGen):
+    x = Integer()
+
+
+class Test(SGen):
+    a = Integer()
+    b = Float()
+    s = String()
+    created = DateTime()
+    inner = Nested(Inner())
+    items = Collection(data_type=Integer())
+
+
+def expected(datasets):
+    return [
+        {key: value.isoformat() if isinstance(value, datetime) else value for key, value in dataset.items()}
+        for dataset in datasets
+    ]
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = tmp_path / 'negative.store'
+    assert write_store(Test().negative(seed=1, clock=CLOCK), path, buffer_size=100) == Test().negative().count()
+    with DatasetStore(path) as store:
+        yield store
+
+
+def test_store_roundtrip(store):
+    datasets = expected(Test().negative(seed=1, clock=CLOCK))
+
+    assert len(store) == store.count() == len(datasets)
+    assert list(store) == datasets
+    assert store[0] == datasets[0]
+    assert store[-1] == datasets[-1]
+    assert store[10:20] == datasets[10:20]
+    assert store[::50] == datasets[::50]
+
+    with pytest.raises(IndexError):
+        store[len(datasets)]
+
+
+def test_store_shards(store):
+    shards = [list(store.shard(shard, 4)) for shard in range(4)]
+
+    assert [dataset for shard in shards for dataset in shard] == list(store)
+    assert all(shards)
+
+    with pytest.raises(ValueError):
+        store.shard_bounds(4, 4)
+
+
+def _first(store):
+    return store[0]
+
+
+def test_store_pickle(store):
+    assert pickle.loads(pickle.dumps(store))[5] == store[5]
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        assert executor.submit(_first, store).result() == store[0]
+
+
+def test_empty_store(tmp_path):
+    path = tmp_path / 'empty.store'
+    assert write_store([], path) == 0
+
+    with DatasetStore(path) as store:
+        assert list(store) == []
+        assert list(store.shard(0, 2)) == []
+
+
+def test_not_a_store(tmp_path):
+    for content in (b'', b'short', b'x' * 100):
+        path = tmp_path / 'other'
+        path.write_bytes(content)
+        with pytest.raises(ValueError):
+            DatasetStore(path)
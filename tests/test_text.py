@@ -0,0 +1,73 @@
+import os
+from collections import Counter
+from random import Random
+from string import ascii_letters
+
+import pytest
+
+from sgen.text import RandomText, random_text
+
+
+def test_random_text_lengths():
+    for length in (0, 1, 64, 65, RandomText.POOL_SIZE - 1, RandomText.POOL_SIZE, (3 << 16) + 5):
+        text = random_text(length)
+        assert len(text) == length
+        assert set(text) <= set(ascii_letters)
+
+
+def test_pool_is_consumed_without_repeats():
+    engine = RandomText(Random(1))
+    texts = [engine.text(1000) for _ in range(50)]
+
+    assert len(set(texts)) == 50
+
+
+def test_same_seed_same_text():
+    assert RandomText(Random(3)).text(500) == RandomText(Random(3)).text(500)
+    assert RandomText(Random(3)).text(500) != RandomText(Random(4)).text(500)
+
+
+def test_alphabet_is_uniform():
+    counts = Counter(RandomText(Random(0)).text(52 * 2000))
+
+    assert set(counts) == set(ascii_letters)
+    assert all(1700 < count < 2300 for count in counts.values())
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="fork is not available")
+def test_forked_child_does_not_repeat_the_pool():
+    random_text(1)  # Fills the shared pool
+
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.write(write, random_text(100).encode())
+        finally:
+            os._exit(0)
+
+    os.close(write)
+    with os.fdopen(read, 'rb') as fh:
+        child = fh.read().decode()
+    os.waitpid(pid, 0)
+
+    assert len(child) == 100
+    assert child != random_text(100)
+
+
+def test_threads_do_not_share_slices():
+    import sys
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Switch threads as often as possible to interleave the pool updates
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(8) as executor:
+            texts = [text for chunk in executor.map(lambda _: [random_text(64) for _ in range(500)], range(8))
+                     for text in chunk]
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert all(len(text) == 64 for text in texts)
+    assert len(set(texts)) == len(texts)
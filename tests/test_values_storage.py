@@ -0,0 +1,71 @@
+import pickle
+from timeit import default_timer
+
+from sgen.fields import String
+from sgen.utils import ValuesStorage, structural_hash
+from sgen.validate import OneOf
+
+
+def test_type_semantics():
+    values = ValuesStorage([1, 'a', None])
+
+    assert 1 in values
+    assert True not in values
+    assert 1.0 not in values
+    assert 'a' in values
+    assert None in values
+    assert float('nan') not in ValuesStorage([float('nan')])
+
+
+def test_unhashable_values():
+    values = ValuesStorage([{'a': [1, 2]}, [1, [2, 3]], {1, 2}])
+
+    assert {'a': [1, 2]} in values
+    assert {'a': [1, 3]} not in values
+    assert [1, [2, 3]] in values
+    assert [1, [2]] not in values
+    assert (1, [2, 3]) not in values
+    assert {1, 2} in values
+    assert [True, [2, 3]] in values  # Equal lists, as with list.__contains__
+
+
+def test_structural_hash_is_consistent_with_equality():
+    pairs = [
+        ({'a': [1, 2], 'b': {'c': 1}}, {'b': {'c': 1.0}, 'a': [True, 2]}),
+        (list(range(100)), list(range(100))),
+        ([{'a': 1}] * 20, [{'a': 1}] * 20),
+    ]
+
+    for left, right in pairs:
+        assert left == right
+        assert structural_hash(left) == structural_hash(right)
+
+
+def test_mutations_update_index():
+    values = ValuesStorage([1, 2, 3])
+    values.remove(2)
+    values[0] = 'x'
+    values += [[4]]
+
+    assert 2 not in values
+    assert 1 not in values
+    assert 'x' in values
+    assert [4] in values
+
+
+def test_pickle():
+    values = pickle.loads(pickle.dumps(ValuesStorage([1, [2], {'a': 3}])))
+
+    assert [2] in values
+    assert values == [1, [2], {'a': 3}]
+
+
+def test_register_many_choices():
+    choices = [f'choice_{index}' for index in range(20000)]
+    field = String(validate=OneOf(choices=choices), allow_none=False, required=True)
+
+    start = default_timer()
+    values = list(field.positive())
+
+    assert values == choices
+    assert default_timer() - start < 1